@@ -0,0 +1,386 @@
+"""Batch search queries.
+
+A module that answers many search queries against one state space that is
+loaded only once. Queries are read as JSON lines and results are written as
+JSON lines in the same order, optionally computed by a pool of processes.
+
+A query is a JSON object with optional keys start (name of the starting
+state), goals (list of goal state names), algorithm (search algorithm name as
+in main.py -a), depth (depth limit of ldfs) and id (any value that is copied
+to the result). Missing keys are taken from the state space and from the
+command line. A result is a JSON object with keys id, start, goals,
+algorithm, found, path, cost, visited, metrics (values measured only by some
+algorithms, see search.SearchResult) and latency_ms, or id and error if the
+query could not be answered.
+
+"""
+
+import json
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from time import perf_counter
+
+from data_loader import get_state_space, get_heuristic, get_grid_map, \
+    print_state_space
+from heuristic import Memoized
+from landmarks import landmarks
+from contraction import CH, contraction_hierarchy
+from result_cache import ResultCache, query_key, source_digest
+from pattern_database import pattern_database
+from puzzle_heuristic import manhattan_distance
+from grid_heuristic import octile_distance
+from external_search import ExternalBFS
+from search import (BFS, UCS, DFS, lDFS, IDS, GBFS, HCS, AStar, ARAStar,
+                    JPS, IDAStar, bibfs, biastar)
+from successors import SlidingPuzzle, GridMap
+from util import path_cost
+
+
+class BatchSolver():
+    """Answers search queries on one loaded state space.
+
+    Heuristics are built for each distinct set of goal states on first use
+    and kept for later queries. Landmark tables, contraction hierarchy and
+    grid map detected in the state space are built only once.
+
+    Attributes:
+        s0: String representing the name of the default starting state.
+        trans: A dictionary, Graph or SuccessorProvider of transitions.
+        goal: A set of default goal state names.
+        algorithm: String representing the default search algorithm, or None.
+        depth: An integer representing the default ldfs depth limit, or None.
+        spec: String selecting the heuristic as main.py -e, or None.
+        queue: String 'heap' or 'bucket' selecting the priority queue, or None.
+        memoize: An integer representing the number of heuristic values kept
+            by heuristic.Memoized, or None.
+        cache: A boolean indicating whether binary snapshots are used.
+        results: A ResultCache of answered queries.
+        digest: String identifying the state space and heuristic in keys of
+            results.
+    """
+
+    def __init__(self, s0, trans, goal, algorithm=None, depth=None,
+                 heuristic=None, queue=None, memoize=None, cache=True,
+                 results=None, digest=None):
+        """Inits BatchSolver with a loaded state space.
+
+        Answered queries are cached only if digest is given, in memory and
+        also in directory results if it is not None.
+
+        """
+        self.s0 = s0
+        self.trans = trans
+        self.goal = set(goal)
+        self.algorithm = algorithm
+        self.depth = depth
+        self.spec = heuristic
+        self.queue = queue
+        self.memoize = memoize
+        self.cache = cache
+        self.heuristics = {}
+        self.landmarks = None
+        self.hierarchy = None
+        self.grid = trans if isinstance(trans, GridMap) else None
+        self.results = ResultCache(directory=results) if digest else None
+        self.digest = digest
+
+    @classmethod
+    def load(cls, ss, puzzle=False, grid=False, compact=False, **kwargs):
+        """Loads a state space and returns a BatchSolver for it.
+
+        Args:
+            ss: String representing path to a state space, or a start state
+                of a generated sliding puzzle if puzzle is True.
+            puzzle: A boolean indicating whether ss is a puzzle state.
+            grid: A boolean indicating whether ss is a path to a grid map.
+            compact: A boolean indicating whether the state space is stored
+                as a compact Graph.
+            kwargs: Other arguments of BatchSolver.
+
+        Returns:
+            A BatchSolver for the loaded state space.
+
+        """
+        if puzzle:
+            trans = SlidingPuzzle.from_state(ss)
+            s0, goal = ss, {trans.goal()}
+            print_state_space(s0, goal, trans.states(), trans.transitions())
+        elif grid:
+            s0, trans, goal = get_grid_map(ss)
+        else:
+            s0, trans, goal = get_state_space(ss, compact,
+                                              kwargs.get('cache', True))
+
+        digest = query_key('puzzle' if puzzle else source_digest(ss),
+                           source_digest(kwargs.get('heuristic')), compact)
+
+        return cls(s0, trans, goal, digest=digest, **kwargs)
+
+    def heuristic(self, goals):
+        """Returns the heuristic for given goal states, or None."""
+        key = tuple(sorted(goals))
+
+        if key not in self.heuristics:
+            spec = self.spec
+
+            if spec is None:
+                h = None
+            elif spec == 'l1':
+                h = manhattan_distance(key)
+            elif spec == 'octile':
+                h = octile_distance(key, getattr(self.trans, 'diagonal', True))
+            elif spec == 'pdb' or spec.startswith('pdb:'):
+                h = pattern_database(key, spec[4:] or None)
+            elif spec == 'alt' or spec.startswith('alt:'):
+                if self.landmarks is None:
+                    self.landmarks = landmarks(self.trans, spec[4:] or None,
+                                               start=self.s0)
+                h = self.landmarks.heuristic(key)
+            else:
+                h = get_heuristic(spec, self.cache)
+
+            if h is not None and self.memoize:
+                h = Memoized(h, self.memoize)
+
+            self.heuristics[key] = h
+
+        return self.heuristics[key]
+
+    def search(self, algorithm, start, goals, depth=None, reporter=None,
+               counters=True):
+        """Runs a search algorithm and reports its output to reporter.
+
+        Returns:
+            A SearchResult of the search.
+
+        Raises:
+            ValueError: If the algorithm is unknown or misses a heuristic or
+                depth limit.
+
+        """
+        trans, queue = self.trans, self.queue
+
+        if algorithm == 'bfs':
+            return BFS(start, trans, goals, reporter, counters)
+        elif algorithm == 'ebfs':
+            return ExternalBFS(start, trans, goals, reporter=reporter,
+                               counters=counters)
+        elif algorithm == 'ucs':
+            return UCS(start, trans, goals, queue, reporter, counters)
+        elif algorithm == 'dfs':
+            return DFS(start, trans, goals, reporter, counters)
+        elif algorithm == 'ldfs':
+            if depth is None:
+                raise ValueError('Maximum depth not provided.')
+            return lDFS(start, trans, goals, depth, reporter, counters)
+        elif algorithm == 'ids':
+            return IDS(start, trans, goals, reporter, counters)
+        elif algorithm == 'bibfs':
+            return bibfs(start, trans, goals, reporter, counters)
+        elif algorithm == 'jps':
+            if self.grid is None:
+                self.grid = GridMap.from_transitions(trans)
+            if self.grid is None:
+                raise ValueError('Jump point search needs a grid map.')
+            return JPS(start, self.grid, goals, self.heuristic(goals), queue,
+                       reporter, counters)
+        elif algorithm == 'ch':
+            if isinstance(trans, (SlidingPuzzle, GridMap)):
+                raise ValueError('Contraction hierarchies need a state space '
+                                 'loaded from a file.')
+            if self.hierarchy is None:
+                self.hierarchy = contraction_hierarchy(trans)
+            return CH(start, trans, goals, self.hierarchy, reporter, counters)
+
+        if algorithm not in ('gbfs', 'hcs', 'astar', 'arastar', 'idastar',
+                             'biastar'):
+            raise ValueError('Invalid algorithm {}.'.format(algorithm))
+
+        h = self.heuristic(goals)
+        if h is None:
+            raise ValueError('No heuristic provided.')
+
+        if algorithm == 'gbfs':
+            return GBFS(start, trans, goals, h, reporter, counters)
+        elif algorithm == 'hcs':
+            return HCS(start, trans, h, reporter, counters)
+        elif algorithm == 'astar':
+            return AStar(start, trans, goals, h, queue, reporter, counters)
+        elif algorithm == 'arastar':
+            return ARAStar(start, trans, goals, h, reporter=reporter,
+                           counters=counters)
+        elif algorithm == 'idastar':
+            return IDAStar(start, trans, goals, h, reporter, counters)
+
+        h_back = None
+        if self.spec == 'l1':
+            h_back = self.heuristic([start])
+        elif self.landmarks is not None:
+            h_back = self.landmarks.heuristic_from([start])
+
+        return biastar(start, trans, goals, h, h_back, queue, reporter,
+                       counters)
+
+    def solve(self, query):
+        """Answers a query given as a dictionary.
+
+        Returns:
+            A dictionary with the result of the query.
+
+        Raises:
+            ValueError: If the query is invalid.
+
+        """
+        start = query.get('start', self.s0)
+        goals = set(query.get('goals') or self.goal)
+        algorithm = query.get('algorithm', self.algorithm)
+        depth = query.get('depth', self.depth)
+
+        if algorithm is None:
+            raise ValueError('Algorithm not provided.')
+
+        trans = self.trans
+        reachable = goals
+        if isinstance(trans, SlidingPuzzle):
+            reachable = {g for g in goals
+                         if trans.solvable(g) == trans.solvable(start)}
+
+        result = None
+
+        begin = perf_counter()
+        if reachable and self.results is not None:
+            key = query_key(self.digest, algorithm, start, sorted(reachable),
+                            depth, self.queue)
+            result = self.results.search(key, self.search, algorithm, start,
+                                         reachable, depth, counters=False)
+        elif reachable:
+            result = self.search(algorithm, start, reachable, depth,
+                                 counters=False)
+        latency = perf_counter() - begin
+
+        path = result.path if result else None
+        cost = result.cost if result else None
+        if path is not None and cost is None:
+            cost = path_cost(trans, path)
+
+        return {'id': query.get('id'), 'start': start, 'goals': sorted(goals),
+                'algorithm': algorithm, 'found': path is not None,
+                'path': path, 'cost': cost,
+                'visited': result.expanded if result is not None else 0,
+                'metrics': result.metrics if result is not None else {},
+                'latency_ms': round(latency * 1000, 3)}
+
+    def answer(self, query):
+        """Answers a query given as a dictionary.
+
+        Returns:
+            A dictionary with the result of the query, or with its id and an
+            error message if the query is invalid.
+
+        """
+        try:
+            return self.solve(query)
+        except (ValueError, KeyError, TypeError) as e:
+            return {'id': query.get('id'), 'error': str(e)}
+
+    def solve_line(self, line):
+        """Answers a query given as a JSON line and returns a JSON line."""
+        try:
+            query = parse_query(line)
+        except ValueError as e:
+            return json.dumps({'id': None, 'error': str(e)})
+
+        return json.dumps(self.answer(query))
+
+
+def parse_query(line):
+    """Parses a JSON line query into a dictionary.
+
+    Raises:
+        ValueError: If the line is not a JSON object.
+
+    """
+    query = json.loads(line)
+
+    if not isinstance(query, dict):
+        raise ValueError('Query is not a JSON object.')
+
+    return query
+
+
+_solver = None
+
+
+def _init_worker(settings):
+    """Loads the state space in a worker process."""
+    global _solver
+
+    with redirect_stdout(sys.stderr):
+        _solver = BatchSolver.load(**settings)
+
+
+def _solve_line(line):
+    """Answers a query in a worker process."""
+    return _solver.solve_line(line)
+
+
+def run_batch(fname, jobs=1, **settings):
+    """Answers search queries from a file and prints results as JSON lines.
+
+    Results are printed in the order of queries as soon as they and all
+    queries before them are answered. Progress and summary are printed to
+    standard error.
+
+    Args:
+        fname: String representing path to a file with one JSON query per
+            line, or '-' to read queries from standard input.
+        jobs: An integer representing the number of processes answering
+            queries.
+        settings: Arguments of BatchSolver.load.
+
+    """
+    out = sys.stdout
+    f = sys.stdin if fname == '-' else open(fname)
+
+    queries = (l for l in f if l.strip())
+    answered = 0
+
+    def write(result):
+        nonlocal answered
+        answered += 1
+        out.write(result + '\n')
+        out.flush()
+
+    begin = perf_counter()
+
+    try:
+        if jobs > 1:
+            with ProcessPoolExecutor(jobs, initializer=_init_worker,
+                                     initargs=(settings,)) as pool:
+                pending = deque()
+
+                for line in queries:
+                    pending.append(pool.submit(_solve_line, line))
+
+                    if len(pending) >= jobs * 4:
+                        write(pending.popleft().result())
+
+                while pending:
+                    write(pending.popleft().result())
+        else:
+            with redirect_stdout(sys.stderr):
+                solver = BatchSolver.load(**settings)
+
+            for line in queries:
+                write(solver.solve_line(line))
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+    elapsed = perf_counter() - begin
+
+    print('Answered {} queries in {:.3f} s ({:.1f} queries/s).'.format(
+        answered, elapsed, answered / elapsed if elapsed else 0.),
+        file=sys.stderr)
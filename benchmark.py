@@ -0,0 +1,727 @@
+"""Benchmarks of search algorithms.
+
+A module that measures running times of search algorithms and data
+structures they use. It can be run as a program to print the measurements of
+one comparison given as a subcommand, for example:
+
+    python3 benchmark.py queues
+
+It also provides a reproducible benchmark suite. The suite generates state
+spaces of increasing size from fixed seeds, writes them in the configuration
+read by data_loader, and records load time, throughput and peak memory of
+every search algorithm and heuristic check to JSON, which can be compared
+with a stored baseline to catch regressions:
+
+    python3 benchmark.py suite -o bench.json --save-baseline baseline.json
+    python3 benchmark.py suite -o bench.json --baseline baseline.json
+
+"""
+
+import json
+import os
+import sys
+import tracemalloc
+from contextlib import redirect_stdout
+from io import StringIO
+from random import Random
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+from generators import road_graph, random_graph, puzzle_space, open_grid, \
+    maze_grid, far_query, scaled_distances, puzzle_distances
+from util import path_cost
+
+
+SUITE_VERSION = 1
+SUITE_HASH_SEED = '0'
+TREE_SEARCH_LIMIT = 5000
+MIN_SECONDS = 0.01
+MIN_BYTES = 65536
+
+
+def timed(f, *args, repeat=3):
+    """Runs f with given arguments and measures the best running time.
+
+    Output printed by f is discarded.
+
+    Returns:
+        A tuple (result, seconds) where result is the value returned by the
+        last run of f and seconds is the shortest running time.
+    
+    """
+    best = float('inf')
+    
+    for _ in range(repeat):
+        with redirect_stdout(StringIO()):
+            start = perf_counter()
+            result = f(*args)
+            best = min(best, perf_counter() - start)
+    
+    return result, best
+
+
+def random_case(states):
+    """Returns a suite case generator of a random graph."""
+    def generate():
+        trans = random_graph(states)
+        s0, goal = far_query(trans)
+        return s0, trans, goal, scaled_distances(trans, goal)
+    
+    return generate
+
+
+def road_case(width, height):
+    """Returns a suite case generator of a road-like grid map."""
+    def generate():
+        trans = road_graph(width, height)
+        s0, goal = far_query(trans)
+        return s0, trans, goal, scaled_distances(trans, goal)
+    
+    return generate
+
+
+def grid_case(generate_grid, *args):
+    """Returns a suite case generator of a grid map state space."""
+    def generate():
+        from grid_heuristic import octile_distance
+        
+        trans = generate_grid(*args).to_transitions()
+        s0, goal = far_query(trans)
+        h = octile_distance(goal)
+        return s0, trans, goal, {s: h(s) for s in trans}
+    
+    return generate
+
+
+def puzzle_case(n, depth):
+    """Returns a suite case generator of a partial sliding puzzle."""
+    def generate():
+        s0, trans, goal = puzzle_space(n, depth)
+        return s0, trans, goal, puzzle_distances(trans, goal)
+    
+    return generate
+
+
+SUITE = [
+    ('random-1k', random_case(1000)),
+    ('random-10k', random_case(10000)),
+    ('random-50k', random_case(50000)),
+    ('road-30x30', road_case(30, 30)),
+    ('road-100x100', road_case(100, 100)),
+    ('road-200x200', road_case(200, 200)),
+    ('grid-open-128', grid_case(open_grid, 128, 128)),
+    ('grid-maze-127', grid_case(maze_grid, 127, 127)),
+    ('puzzle-3x3-d12', puzzle_case(3, 12)),
+    ('puzzle-3x3-d20', puzzle_case(3, 20)),
+    ('puzzle-4x4-d14', puzzle_case(4, 14)),
+]
+
+
+def measure(f, *args, repeat=3):
+    """Runs f with given arguments and measures its time and memory.
+
+    Running time is the best of repeat runs, peak memory is measured by
+    tracemalloc in one additional run, because tracing slows the run down.
+
+    Returns:
+        A tuple (result, seconds, peak) where result is the value returned
+        by f, seconds is the shortest running time and peak is the largest
+        number of bytes allocated at the same time.
+    
+    """
+    result, seconds = timed(f, *args, repeat=repeat)
+    
+    tracemalloc.start()
+    try:
+        with redirect_stdout(StringIO()):
+            f(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    
+    return result, seconds, peak
+
+
+def suite_searches(s0, trans, goal, h, depth):
+    """Returns the searches run on each suite case.
+
+    Returns:
+        A list of (name, function, arguments) tuples, one for every algorithm
+        in search.py. Iterative deepening searches, which do not remember
+        visited states across iterations, are marked with a None function
+        on state spaces larger than TREE_SEARCH_LIMIT, and jump point search
+        on state spaces that are not grid maps.
+
+    """
+    from search import (BFS, UCS, DFS, lDFS, IDS, GBFS, HCS, AStar, JPS,
+                        IDAStar, bibfs, biastar)
+    from successors import GridMap
+    
+    small = len(trans) <= TREE_SEARCH_LIMIT
+    grid = GridMap.from_transitions(trans)
+    
+    return [
+        ('bfs', BFS, (s0, trans, goal)),
+        ('ucs', UCS, (s0, trans, goal)),
+        ('dfs', DFS, (s0, trans, goal)),
+        ('ldfs', lDFS, (s0, trans, goal, depth)),
+        ('ids', IDS if small else None, (s0, trans, goal)),
+        ('gbfs', GBFS, (s0, trans, goal, h)),
+        ('hcs', HCS, (s0, trans, h)),
+        ('astar', AStar, (s0, trans, goal, h)),
+        ('jps', JPS if grid else None, (s0, grid, goal, h)),
+        ('idastar', IDAStar if small else None, (s0, trans, goal, h)),
+        ('bibfs', bibfs, (s0, trans, goal)),
+        ('biastar', biastar, (s0, trans, goal, h)),
+    ]
+
+
+def run_case(directory, name, generate, repeat=3):
+    """Generates, writes, loads and searches one suite case.
+
+    Args:
+        directory: String representing path to a directory where the state
+            space and heuristic files are written.
+        name: String representing the name of the case.
+        generate: A function returning (s0, transitions, goal, heuristic
+            values) of the case.
+        repeat: An integer representing the number of timed runs.
+
+    Returns:
+        A JSON serializable dictionary of measurements of the case.
+    
+    """
+    from data_loader import (get_state_space, get_heuristic,
+                             write_state_space, write_heuristic)
+    from heuristic_check import is_optimistic, is_consistent
+    
+    s0, trans, goal, values = generate()
+    
+    fname = os.path.join(directory, name + '.txt')
+    hname = os.path.join(directory, name + '_heuristic.txt')
+    write_state_space(fname, s0, trans, goal)
+    write_heuristic(hname, values)
+    
+    (s0, trans, goal), t_parse, m_parse = measure(
+        get_state_space, fname, False, False, repeat=1)
+    _, t_snapshot, _ = measure(get_state_space, fname, False, True,
+                               repeat=repeat)
+    h = get_heuristic(hname, False)
+    
+    bfs_depth = len(timed(suite_searches(s0, trans, goal, h, 0)[0][1],
+                          s0, trans, goal, repeat=1)[0].path) - 1
+    
+    case = {
+        'states': len(trans),
+        'transitions': sum(len(trans[s]) for s in trans),
+        'load': {'parse_s': t_parse, 'snapshot_s': t_snapshot,
+                 'peak_bytes': m_parse},
+        'searches': {},
+        'checks': {},
+    }
+    
+    for algorithm, f, args in suite_searches(s0, trans, goal, h, bfs_depth):
+        if f is None:
+            case['searches'][algorithm] = {'skipped': True}
+            continue
+        
+        result, seconds, peak = measure(f, *args, repeat=repeat)
+        
+        case['searches'][algorithm] = {
+            'found': bool(result),
+            'cost': path_cost(trans, result.path) if result else None,
+            'expanded': result.expanded,
+            'generated': result.generated,
+            'seconds': seconds,
+            'expansions_per_s': result.expanded / seconds if seconds else None,
+            'peak_bytes': peak,
+        }
+    
+    for check, args in (('optimistic', (h, trans, goal)),
+                        ('consistent', (h, trans))):
+        f = is_optimistic if check == 'optimistic' else is_consistent
+        report, seconds, peak = measure(f, *args, repeat=repeat)
+        
+        case['checks'][check] = {
+            'passed': bool(report),
+            'seconds': seconds,
+            'states_per_s': len(trans) / seconds if seconds else None,
+            'peak_bytes': peak,
+        }
+    
+    return case
+
+
+def run_suite(names=None, directory=None, repeat=3):
+    """Runs the benchmark suite.
+
+    Args:
+        names: A list of names of SUITE cases to run, or None to run all.
+        directory: String representing path to a directory where generated
+            files are kept, or None to use a temporary directory.
+        repeat: An integer representing the number of timed runs.
+
+    Returns:
+        A JSON serializable dictionary with the suite version, Python
+        version and measurements of each case.
+    
+    """
+    report = {'version': SUITE_VERSION, 'python': sys.version.split()[0],
+              'hash_seed': os.environ.get('PYTHONHASHSEED'), 'cases': {}}
+    
+    with TemporaryDirectory() as tmp:
+        directory = directory or tmp
+        os.makedirs(directory, exist_ok=True)
+        
+        for name, generate in SUITE:
+            if names and name not in names:
+                continue
+            
+            print('Running {}'.format(name), file=sys.stderr)
+            report['cases'][name] = run_case(directory, name, generate, repeat)
+    
+    return report
+
+
+def compare_reports(report, baseline, tolerance=0.2):
+    """Compares a suite report with a baseline report.
+
+    Expanded states and found costs are deterministic for a fixed hash seed,
+    so any change of them is reported. Throughput is a regression if it drops
+    by more than tolerance, time and peak memory if they grow by more than
+    tolerance. Times shorter than MIN_SECONDS and memory smaller than
+    MIN_BYTES in the baseline are too noisy to compare. Cases and searches
+    missing from either report are ignored.
+
+    Args:
+        report: A dictionary returned by run_suite.
+        baseline: A dictionary returned by run_suite earlier.
+        tolerance: A float representing the allowed relative change.
+
+    Returns:
+        A list of strings describing the regressions.
+    
+    """
+    regressions = []
+    
+    def grown(where, key, new, old, least):
+        if new is not None and old and old >= least and \
+                new > old * (1 + tolerance):
+            regressions.append('{}: {} grew from {:.4g} to {:.4g}'.format(
+                where, key, old, new))
+    
+    for name, case in report['cases'].items():
+        base = baseline['cases'].get(name)
+        if base is None:
+            continue
+        
+        grown(name, 'load parse_s', case['load']['parse_s'],
+              base['load']['parse_s'], MIN_SECONDS)
+        grown(name, 'load snapshot_s', case['load']['snapshot_s'],
+              base['load']['snapshot_s'], MIN_SECONDS)
+        grown(name, 'load peak_bytes', case['load']['peak_bytes'],
+              base['load']['peak_bytes'], MIN_BYTES)
+        
+        for group, speed in (('searches', 'expansions_per_s'),
+                             ('checks', 'states_per_s')):
+            for algorithm, new in case[group].items():
+                old = base[group].get(algorithm)
+                where = '{} {}'.format(name, algorithm)
+                
+                if old is None or new.get('skipped') or old.get('skipped'):
+                    continue
+                
+                for key in ('found', 'cost', 'expanded', 'passed'):
+                    if key in new and new[key] != old.get(key):
+                        regressions.append('{}: {} changed from {} to {}'.format(
+                            where, key, old.get(key), new[key]))
+                
+                if old['seconds'] >= MIN_SECONDS and new[speed] is not None \
+                        and new[speed] < old[speed] * (1 - tolerance):
+                    regressions.append('{}: {} dropped from {:.4g} to {:.4g}'.format(
+                        where, speed, old[speed], new[speed]))
+                
+                grown(where, 'peak_bytes', new['peak_bytes'], old['peak_bytes'],
+                      MIN_BYTES)
+    
+    return regressions
+
+
+def print_report(report):
+    """Prints a table of search throughput of a suite report."""
+    print('{:<16} {:<9} {:>9} {:>10} {:>12} {:>10}'.format(
+        'case', 'search', 'expanded', 'time [ms]', 'exp/s', 'peak [kB]'))
+    
+    for name, case in report['cases'].items():
+        print('{:<16} {:<9} {:>9} {:>10.3f} {:>12} {:>10}'.format(
+            name, 'load', case['states'], 1000 * case['load']['parse_s'], '',
+            case['load']['peak_bytes'] // 1024))
+        
+        for algorithm, s in case['searches'].items():
+            if s.get('skipped'):
+                print('{:<16} {:<9} {:>9}'.format(name, algorithm, 'skipped'))
+            else:
+                print('{:<16} {:<9} {:>9} {:>10.3f} {:>12.0f} {:>10}'.format(
+                    name, algorithm, s['expanded'], 1000 * s['seconds'],
+                    s['expansions_per_s'] or 0, s['peak_bytes'] // 1024))
+        
+        for check, s in case['checks'].items():
+            print('{:<16} {:<9} {:>9} {:>10.3f} {:>12.0f} {:>10}'.format(
+                name, check[:9], case['states'], 1000 * s['seconds'],
+                s['states_per_s'] or 0, s['peak_bytes'] // 1024))
+
+
+def suite_main(argv):
+    """Runs the benchmark suite from command line arguments.
+
+    Returns:
+        An integer exit status, 1 if regressions against the baseline were
+        found.
+    
+    """
+    from argparse import ArgumentParser
+    
+    parser = ArgumentParser('benchmark.py suite', description='run the reproducible benchmark suite')
+    parser.add_argument('-c', '--case', action='append', choices=[name for name, _ in SUITE], help='case to run, all by default, may be repeated')
+    parser.add_argument('-o', '--output', type=str, help='path to a JSON file where the report is written')
+    parser.add_argument('-d', '--directory', type=str, help='directory where generated state spaces are kept')
+    parser.add_argument('-n', '--repeat', type=int, default=3, help='number of timed runs of each measurement')
+    parser.add_argument('--baseline', type=str, help='path to a JSON report to compare with')
+    parser.add_argument('--save-baseline', type=str, help='path where the report is also stored as a baseline')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed relative change of time, throughput and memory')
+    
+    args = parser.parse_args(argv)
+    
+    report = run_suite(args.case, args.directory, args.repeat)
+    print_report(report)
+    
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w') as f:
+                json.dump(report, f, indent=1)
+    
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        
+        if baseline.get('version') != SUITE_VERSION or \
+                baseline.get('hash_seed') != report['hash_seed']:
+            print('Baseline was made by a different suite version or hash seed.')
+            return 1
+        
+        regressions = compare_reports(report, baseline, args.tolerance)
+        
+        for r in regressions:
+            print('  [REG] ' + r)
+        
+        print('{} regressions against {}.'.format(len(regressions), args.baseline))
+        
+        return 1 if regressions else 0
+    
+    return 0
+
+
+def compare_jps():
+    """Compares jump point search with A*.
+
+    Runs A* and jump point search with the octile distance heuristic between
+    opposite corners of open grids with randomly blocked cells and of mazes,
+    with and without diagonal moves. Checks that they find equally expensive
+    paths and prints expanded states and running times.
+    
+    """
+    from math import isclose
+    from grid_heuristic import octile_distance
+    from search import AStar, JPS
+    
+    cases = [('open 256x256', open_grid, (256, 256)),
+             ('open 1024x1024', open_grid, (1024, 1024)),
+             ('maze 255x255', maze_grid, (255, 255)),
+             ('maze 1023x1023', maze_grid, (1023, 1023))]
+    
+    print('{:<20} {:>10} {:>10} {:>10} {:>10} {:>8}'.format(
+        'case', 'astar exp', 'jps exp', 'astar [s]', 'jps [s]', 'speedup'))
+    
+    for name, generate, args in cases:
+        for diagonal in (True, False):
+            grid = generate(*args, diagonal=diagonal)
+            rows = grid.rows()
+            
+            s0 = '{}_{}'.format(0, rows[0].index('.'))
+            g = '{}_{}'.format(grid.height - 1, rows[-1].rindex('.'))
+            h = octile_distance([g], diagonal)
+            
+            astar, t_astar = timed(AStar, s0, grid, [g], h, repeat=1)
+            jps, t_jps = timed(JPS, s0, grid, [g], h, repeat=1)
+            
+            if bool(astar) != bool(jps) or astar and not isclose(astar.cost, jps.cost):
+                raise AssertionError('{}: jps found a different cost'.format(name))
+            
+            print('{:<20} {:>10} {:>10} {:>10.3f} {:>10.3f} {:>7.2f}x'.format(
+                name + (' 8' if diagonal else ' 4'), astar.expanded,
+                jps.expanded, t_astar, t_jps, t_astar / t_jps))
+
+
+def compare_hda(workers=(1, 2, 4, 8, 16)):
+    """Compares hash distributed A* with A*.
+
+    Runs A* and hash distributed A* with increasing numbers of worker
+    processes on the 3 x 3 sliding puzzle and on a generated road map,
+    checks that they find equally expensive paths and prints expanded states
+    and running times.
+    
+    """
+    from heuristic import TableHeuristic
+    from parallel_search import HDAStar
+    from puzzle_heuristic import manhattan_distance
+    from search import AStar
+    from successors import SlidingPuzzle
+    
+    puzzle = SlidingPuzzle(3)
+    p_goal = [puzzle.goal()]
+    
+    road = road_graph(200, 200)
+    r_s0, r_goal = far_query(road)
+    
+    cases = [('puzzle', '867_254_3x1', puzzle, p_goal, manhattan_distance(p_goal)),
+             ('road 200x200', r_s0, road, r_goal,
+              TableHeuristic(scaled_distances(road, r_goal)))]
+    
+    print('{:<14} {:>8} {:>10} {:>10} {:>8}'.format(
+        'case', 'workers', 'expanded', 'time [s]', 'speedup'))
+    
+    for name, s0, trans, goal, h in cases:
+        astar, t_astar = timed(AStar, s0, trans, goal, h, repeat=1)
+        
+        print('{:<14} {:>8} {:>10} {:>10.3f} {:>8}'.format(
+            name, 'astar', astar.expanded, t_astar, ''))
+        
+        for n in workers:
+            hda, t = timed(HDAStar, s0, trans, goal, h, n, repeat=1)
+            
+            if hda.cost != astar.cost:
+                raise AssertionError('{}: hdastar found a different cost'.format(name))
+            
+            print('{:<14} {:>8} {:>10} {:>10.3f} {:>7.2f}x'.format(
+                name, n, hda.expanded, t, t_astar / t))
+
+
+def compare_arastar(weight=3.):
+    """Compares anytime repairing A* with A*.
+
+    Runs A* and anytime repairing A* with given initial weight on a 4 x 4
+    sliding puzzle and on a generated road map, checks that the last path of
+    ARA* is as expensive as the path of A* and prints when each improved
+    path was found together with its suboptimality bound.
+    
+    """
+    from heuristic import TableHeuristic
+    from puzzle_heuristic import manhattan_distance
+    from search import AStar, ARAStar
+    from successors import SlidingPuzzle
+    
+    puzzle = SlidingPuzzle(4)
+    p_goal = [puzzle.goal()]
+    
+    road = road_graph(200, 200)
+    r_s0, r_goal = far_query(road)
+    
+    cases = [('puzzle 4x4', '689C_1FB4_72x3_D5AE', puzzle, p_goal,
+              manhattan_distance(p_goal)),
+             ('road 200x200', r_s0, road, r_goal,
+              TableHeuristic(scaled_distances(road, r_goal)))]
+    
+    print('{:<14} {:>8} {:>8} {:>10} {:>10} {:>8}'.format(
+        'case', 'search', 'cost', 'expanded', 'time [s]', 'bound'))
+    
+    for name, s0, trans, goal, h in cases:
+        astar, t_astar = timed(AStar, s0, trans, goal, h, repeat=1)
+        ara, _ = timed(ARAStar, s0, trans, goal, h, weight, repeat=1)
+        
+        if ara.cost != astar.cost:
+            raise AssertionError('{}: arastar found a different cost'.format(name))
+        
+        print('{:<14} {:>8} {:>8g} {:>10} {:>10.3f} {:>8}'.format(
+            name, 'astar', astar.cost, astar.expanded, t_astar, ''))
+        
+        for cost, bound, expanded, t in ara.metrics['solutions']:
+            print('{:<14} {:>8} {:>8g} {:>10} {:>10.3f} {:>8.3f}'.format(
+                name, 'arastar', cost, expanded, t, bound))
+
+
+def compare_external(buffers=(1000, 10000, 100000)):
+    """Compares external-memory breadth-first search with BFS.
+
+    Runs BFS and external-memory BFS with buffers of increasing size between
+    the farthest states of the 3 x 3 sliding puzzle and on a generated road
+    map, checks that they find equally long paths and prints running times,
+    peak memory and disk input and output.
+    
+    """
+    from external_search import ExternalBFS
+    from search import BFS
+    from successors import SlidingPuzzle
+    
+    puzzle = SlidingPuzzle(3)
+    road = road_graph(200, 200)
+    r_s0, r_goal = far_query(road)
+    
+    cases = [('puzzle', '867_254_3x1', puzzle, [puzzle.goal()], 2),
+             ('road 200x200', r_s0, road, r_goal, None)]
+    
+    print('{:<14} {:>8} {:>10} {:>10} {:>10} {:>10}'.format(
+        'case', 'buffer', 'time [s]', 'peak [kB]', 'read [kB]', 'write [kB]'))
+    
+    for name, s0, trans, goal, locality in cases:
+        bfs, t, peak = measure(BFS, s0, trans, goal, repeat=1)
+        
+        print('{:<14} {:>8} {:>10.3f} {:>10} {:>10} {:>10}'.format(
+            name, 'bfs', t, peak // 1024, '', ''))
+        
+        for buffer in buffers:
+            ebfs, t, peak = measure(ExternalBFS, s0, trans, goal, None, buffer,
+                                    locality, repeat=1)
+            
+            if len(ebfs.path) != len(bfs.path):
+                raise AssertionError('{}: ebfs found a different path length'.format(name))
+            
+            print('{:<14} {:>8} {:>10.3f} {:>10} {:>10} {:>10}'.format(
+                name, buffer, t, peak // 1024, ebfs.metrics['bytes_read'] // 1024,
+                ebfs.metrics['bytes_written'] // 1024))
+
+
+def compare_contraction(queries=50):
+    """Compares contraction hierarchy queries with UCS and A*.
+
+    Builds contraction hierarchies of the istra map and of generated road
+    graphs, runs the same random queries with UCS and with the hierarchy,
+    checks that they find equally expensive paths and prints preprocessing
+    time and query speedup. The istra map is also searched with A* and its
+    heuristic from the file, which only works for its own goal.
+    
+    """
+    from data_loader import get_state_space, get_heuristic
+    from contraction import ContractionHierarchy
+    from search import UCS, AStar
+    
+    with redirect_stdout(StringIO()):
+        m_s0, m_trans, m_goal = get_state_space('maps/istra.txt')
+        m_h = get_heuristic('maps/istra_heuristic.txt')
+    
+    cases = [('istra', m_trans), ('road 50x50', road_graph(50, 50)),
+             ('road 100x100', road_graph(100, 100))]
+    
+    print('{:<14} {:>8} {:>10} {:>10} {:>10} {:>8}'.format(
+        'case', 'states', 'build [s]', 'ucs [ms]', 'ch [ms]', 'speedup'))
+    
+    for name, trans in cases:
+        hierarchy, t_build = timed(ContractionHierarchy.build, trans, repeat=1)
+        
+        random = Random(1)
+        states = list(trans)
+        t_ucs = t_ch = 0.
+        
+        for _ in range(queries):
+            s0, g = random.sample(states, 2)
+            
+            ucs, t = timed(UCS, s0, trans, [g], None, None, False, repeat=1)
+            t_ucs += t
+            
+            (path, cost, _), t = timed(hierarchy.query, s0, [g], repeat=1)
+            t_ch += t
+            
+            if cost != (ucs.cost if ucs.path else float('inf')):
+                raise AssertionError('{}: ch found a different cost'.format(name))
+        
+        print('{:<14} {:>8} {:>10.3f} {:>10.3f} {:>10.3f} {:>7.2f}x'.format(
+            name, len(trans), t_build, 1000 * t_ucs / queries,
+            1000 * t_ch / queries, t_ucs / t_ch))
+    
+    hierarchy = ContractionHierarchy.build(m_trans)
+    _, t_astar = timed(AStar, m_s0, m_trans, m_goal, m_h)
+    _, t_ch = timed(hierarchy.query, m_s0, m_goal)
+    
+    print('istra astar with heuristic file: {:.3f} ms, ch: {:.3f} ms'.format(
+        1000 * t_astar, 1000 * t_ch))
+
+
+def compare_queues():
+    """Compares heap and bucket priority queues.
+
+    Runs dijkstra, UCS and A* on the 3 x 3 sliding puzzle, on a generated
+    road map and on the istra map with both priority queues, checks that
+    they find equally good solutions and prints running times.
+    
+    """
+    from data_loader import get_state_space, get_heuristic
+    from puzzle_heuristic import manhattan_distance
+    from search import dijkstra, UCS, AStar
+    from successors import SlidingPuzzle
+    
+    puzzle = SlidingPuzzle(3)
+    p_goal = {puzzle.goal()}
+    p_s0 = '867_254_3x1'
+    
+    with redirect_stdout(StringIO()):
+        m_s0, m_trans, m_goal = get_state_space('maps/istra.txt')
+        m_h = get_heuristic('maps/istra_heuristic.txt')
+    
+    road = road_graph(200, 200)
+    r_s0, r_goal = far_query(road)
+    
+    p_cost = lambda result: path_cost(puzzle, result.path)
+    r_cost = lambda result: path_cost(road, result.path)
+    m_cost = lambda result: path_cost(m_trans, result.path)
+    
+    cases = [
+        ('dijkstra puzzle', lambda q: dijkstra(p_goal, puzzle, q), dict),
+        ('ucs puzzle', lambda q: UCS(p_s0, puzzle, p_goal, q, None, False), p_cost),
+        ('astar puzzle', lambda q: AStar(p_s0, puzzle, p_goal, manhattan_distance(p_goal), q, None, False), p_cost),
+        ('dijkstra road', lambda q: dijkstra(r_goal, road, q), dict),
+        ('ucs road', lambda q: UCS(r_s0, road, r_goal, q, None, False), r_cost),
+        ('ucs istra', lambda q: UCS(m_s0, m_trans, m_goal, q, None, False), m_cost),
+        ('astar istra', lambda q: AStar(m_s0, m_trans, m_goal, m_h, q, None, False), m_cost),
+    ]
+    
+    print('{:<16} {:>10} {:>10} {:>8}'.format('case', 'heap [s]', 'bucket [s]', 'speedup'))
+    
+    for name, f, value in cases:
+        heap, t_heap = timed(f, 'heap')
+        bucket, t_bucket = timed(f, 'bucket')
+        
+        if value(heap) != value(bucket):
+            raise AssertionError('{}: queues found different solutions'.format(name))
+        
+        print('{:<16} {:>10.4f} {:>10.4f} {:>7.2f}x'.format(name, t_heap, t_bucket, t_heap / t_bucket))
+
+
+COMPARISONS = {
+    'queues': compare_queues,
+    'contraction': compare_contraction,
+    'jps': compare_jps,
+    'hda': compare_hda,
+    'arastar': compare_arastar,
+    'external': compare_external,
+}
+
+
+# run if program is called as main program
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['suite']:
+        # transitions are sets of strings, whose order depends on the hash seed
+        if os.environ.get('PYTHONHASHSEED') is None:
+            os.environ['PYTHONHASHSEED'] = SUITE_HASH_SEED
+            os.execv(sys.executable, [sys.executable] + sys.argv)
+        
+        sys.exit(suite_main(sys.argv[2:]))
+    
+    if sys.argv[1:] and sys.argv[1] in COMPARISONS:
+        COMPARISONS[sys.argv[1]]()
+    else:
+        print('usage: benchmark.py {{suite,{}}} ...'.format(','.join(COMPARISONS)))
+        print('  suite: Runs the reproducible benchmark suite, see suite -h.')
+        
+        for name, compare in COMPARISONS.items():
+            print('  {}: {}'.format(name, compare.__doc__.split('\n')[0]))
+        
+        sys.exit(2 if sys.argv[1:] else 0)
@@ -0,0 +1,407 @@
+"""Contraction hierarchies.
+
+Module that provides contraction hierarchies for state spaces that are
+searched many times. States are contracted one by one in order of importance.
+Contracting a state removes it and adds shortcut transitions between its
+neighbors wherever the path through it is the only cheapest one. A query then
+runs two dijkstra searches, forward from the start and backward from the
+goals, which both only move to states contracted later, and meet at the
+cheapest path. Shortcuts on the path are unpacked into original transitions.
+
+"""
+
+import heapq
+import struct
+from array import array
+from time import perf_counter
+
+from graph import Graph
+from search import SearchResult
+from util import IndexedPriorityQueue
+
+
+WITNESS_LIMIT = 500
+
+_MAGIC = b'CH01'
+
+INF = float('inf')
+
+
+class ContractionHierarchy():
+    """Contraction hierarchy of a state space.
+
+    Attributes:
+        names: A list of state names indexed by state id.
+        index: A dictionary mapping state names to their ids.
+        rank: An array of integers representing the position of each state
+            in contraction order.
+        edges: A dictionary mapping (source, target) state id pairs to
+            (cost, middle) pairs for the cheapest original transitions and for
+            shortcuts, where middle is the id of the contracted state the
+            shortcut goes through, or -1 for original transitions.
+        up: A pair of lists with a list of (state id, cost) pairs for each
+            state. The first holds transitions to states of higher rank, the
+            second reversed transitions to states of higher rank.
+        checksum: An integer checksum of the state space, see Graph.checksum.
+    """
+
+    def __init__(self, names, rank, edges, checksum=0):
+        """Inits ContractionHierarchy with contraction order and edges."""
+        self.names = names
+        self.index = {s: i for i, s in enumerate(names)}
+        self.rank = rank
+        self.edges = edges
+        self.checksum = checksum
+
+        self.up = ([[] for _ in names], [[] for _ in names])
+
+        for (u, w), (c, _) in edges.items():
+            if rank[w] > rank[u]:
+                self.up[0][u].append((w, c))
+            else:
+                self.up[1][w].append((u, c))
+
+    @classmethod
+    def build(cls, trans, witness_limit=WITNESS_LIMIT):
+        """Contracts all states of a state space.
+
+        States are contracted in order of edge difference, the number of
+        shortcuts a contraction adds minus the number of transitions it
+        removes, plus the number of already contracted neighbors, which keeps
+        contraction spread evenly. Priorities are updated lazily. A shortcut
+        is not added if a witness search finds a path that is not more
+        expensive without the contracted state.
+
+        Args:
+            trans: A dictionary containing list of possible transitions and
+                their costs for each key that represents the state name, or a
+                Graph.
+            witness_limit: An integer representing the largest number of
+                states a witness search settles.
+
+        Returns:
+            A ContractionHierarchy of the state space.
+
+        """
+        graph = trans if isinstance(trans, Graph) else Graph.from_transitions(trans)
+        n = len(graph.names)
+
+        edges = {}
+        for u in range(n):
+            for w, c in graph.get(u):
+                if u != w and c < edges.get((u, w), (INF,))[0]:
+                    edges[u, w] = (c, -1)
+
+        out = [{} for _ in range(n)]
+        inc = [{} for _ in range(n)]
+        for (u, w), (c, _) in edges.items():
+            out[u][w] = c
+            inc[w][u] = c
+
+        neighbors = [0] * n
+
+        def shortcuts(v):
+            """Returns (source, target, cost) shortcuts contracting v adds."""
+            found = []
+
+            for u, cu in inc[v].items():
+                targets = {w: cu + cw for w, cw in out[v].items() if w != u}
+                if not targets:
+                    continue
+
+                dist = _witness(out, u, v, max(targets.values()), witness_limit)
+
+                for w, c in targets.items():
+                    if dist.get(w, INF) > c:
+                        found.append((u, w, c))
+
+            return found
+
+        def priority(v):
+            """Returns the contraction priority of v, lowest first."""
+            return (len(shortcuts(v)) - len(inc[v]) - len(out[v]) +
+                    neighbors[v])
+
+        queue = [(priority(v), v) for v in range(n)]
+        heapq.heapify(queue)
+
+        rank = array('q', bytes(8 * n))
+        order = 0
+
+        while queue:
+            _, v = heapq.heappop(queue)
+
+            p = priority(v)
+            if queue and p > queue[0][0]:
+                heapq.heappush(queue, (p, v))
+                continue
+
+            for u, w, c in shortcuts(v):
+                if c < out[u].get(w, INF):
+                    edges[u, w] = (c, v)
+                    out[u][w] = c
+                    inc[w][u] = c
+
+            for u in inc[v]:
+                del out[u][v]
+                neighbors[u] += 1
+
+            for w in out[v]:
+                del inc[w][v]
+                neighbors[w] += 1
+
+            out[v], inc[v] = {}, {}
+
+            rank[v] = order
+            order += 1
+
+        return cls(graph.names, rank, edges, graph.checksum())
+
+    def query(self, s0, goal):
+        """Finds the cheapest path from s0 to one of the goal states.
+
+        Args:
+            s0: String representing the name of the starting state.
+            goal: A list of goal state names.
+
+        Returns:
+            A tuple (path, cost, settled) where path is a list of state names
+            of the found path or None, cost is its cost and settled is the
+            number of states settled by both searches.
+
+        """
+        index = self.index
+
+        dists = ({}, {})
+        parents = ({}, {})
+        opens = (IndexedPriorityQueue(), IndexedPriorityQueue())
+
+        if s0 in index:
+            s = index[s0]
+            dists[0][s] = 0.
+            opens[0].push(s, 0.)
+
+        for g in goal:
+            if g in index:
+                dists[1][index[g]] = 0.
+                opens[1].push(index[g], 0.)
+
+        best = INF
+        meet = None
+        settled = 0
+
+        while opens[0] or opens[1]:
+            tops = [o.peek()[1] if o else INF for o in opens]
+            i = 0 if tops[0] <= tops[1] else 1
+
+            if tops[i] >= best:
+                break
+
+            x, d = opens[i].pop()
+            settled += 1
+
+            if x in dists[1 - i] and d + dists[1 - i][x] < best:
+                best = d + dists[1 - i][x]
+                meet = x
+
+            dist, parent = dists[i], parents[i]
+
+            for y, c in self.up[i][x]:
+                if d + c < dist.get(y, INF):
+                    dist[y] = d + c
+                    parent[y] = x
+                    opens[i].push(y, d + c)
+
+        if meet is None:
+            return None, INF, settled
+
+        forward = [meet]
+        while forward[-1] in parents[0]:
+            forward.append(parents[0][forward[-1]])
+        forward.reverse()
+
+        backward = [meet]
+        while backward[-1] in parents[1]:
+            backward.append(parents[1][backward[-1]])
+
+        ids = forward + backward[1:]
+
+        path = [ids[0]]
+        for u, w in zip(ids, ids[1:]):
+            path += self.unpack(u, w)[1:]
+
+        return [self.names[i] for i in path], best, settled
+
+    def unpack(self, u, w):
+        """Returns the path of original transitions a transition stands for."""
+        path = []
+        stack = [(u, w)]
+
+        while stack:
+            u, w = stack.pop()
+            m = self.edges[u, w][1]
+
+            if m < 0:
+                if not path:
+                    path.append(u)
+                path.append(w)
+            else:
+                stack.append((m, w))
+                stack.append((u, m))
+
+        return path
+
+    def shortcuts(self):
+        """Returns the number of shortcuts in the hierarchy."""
+        return sum(1 for _, m in self.edges.values() if m >= 0)
+
+    def write(self, f):
+        """Writes the hierarchy to a binary file object."""
+        f.write(struct.pack('<4sQQQ', _MAGIC, len(self.names),
+                            len(self.edges), self.checksum))
+        f.write(self.rank.tobytes())
+
+        pairs = array('q', (x for pair in self.edges for x in pair))
+        costs = array('d', (c for c, _ in self.edges.values()))
+        middles = array('q', (m for _, m in self.edges.values()))
+
+        for a in (pairs, costs, middles):
+            f.write(a.tobytes())
+
+    @classmethod
+    def read(cls, f, graph):
+        """Reads a hierarchy written by write from a binary file object.
+
+        Args:
+            f: A binary file object.
+            graph: A Graph of the state space, which must be the same as when
+                the hierarchy was written.
+
+        Raises:
+            ValueError: If the file is not a hierarchy file or was written
+                for a different state space.
+
+        """
+        magic, n, e, checksum = struct.unpack('<4sQQQ', f.read(28))
+
+        if magic != _MAGIC:
+            raise ValueError('Not a contraction hierarchy file.')
+
+        if n != len(graph.names) or checksum != graph.checksum():
+            raise ValueError('Contraction hierarchy file is for a different '
+                             'state space.')
+
+        arrays = []
+        for typecode, size in (('q', n), ('q', 2 * e), ('d', e), ('q', e)):
+            a = array(typecode)
+            a.frombytes(f.read(8 * size))
+            arrays.append(a)
+
+        rank, pairs, costs, middles = arrays
+
+        edges = {(pairs[2 * j], pairs[2 * j + 1]): (costs[j], middles[j])
+                 for j in range(e)}
+
+        return cls(graph.names, rank, edges, checksum)
+
+
+def _witness(out, u, v, limit, settle):
+    """Returns costs from u found by dijkstra search that avoids state v.
+
+    Search stops after costs above limit are reached or after settling
+    settle states.
+
+    """
+    dist = {u: 0.}
+    heap = [(0., u)]
+    settled = 0
+
+    while heap and settled < settle:
+        d, x = heapq.heappop(heap)
+
+        if d > dist[x]:
+            continue
+        if d > limit:
+            break
+
+        settled += 1
+
+        for y, c in out[x].items():
+            if y != v and d + c < dist.get(y, INF):
+                dist[y] = d + c
+                heapq.heappush(heap, (d + c, y))
+
+    return dist
+
+
+def contraction_hierarchy(trans, fname=None):
+    """Contraction hierarchy of a state space
+
+    Function that returns a contraction hierarchy of a state space. If a file
+    is given, the hierarchy is loaded from it when it exists and was written
+    for the same state space, and saved to it after it is built otherwise.
+
+    Args:
+        trans: A dictionary containing list of possible transitions and their
+            costs for each key that represents the state name, or a Graph.
+        fname: String representing path to a hierarchy file, or None.
+
+    Returns:
+        A ContractionHierarchy of the state space.
+
+    """
+    graph = trans if isinstance(trans, Graph) else Graph.from_transitions(trans)
+
+    if fname:
+        try:
+            with open(fname, 'rb') as f:
+                return ContractionHierarchy.read(f, graph)
+        except (FileNotFoundError, ValueError, struct.error):
+            pass
+
+    hierarchy = ContractionHierarchy.build(graph)
+
+    if fname:
+        with open(fname, 'wb') as f:
+            hierarchy.write(f)
+
+    return hierarchy
+
+
+def CH(s0, trans, goal, hierarchy=None, reporter=None, counters=True):
+    """Performs a contraction hierarchy query.
+
+    Finds the cheapest path from state s0 to one of the goal states using a
+    contraction hierarchy of the state space, which is built first if it is
+    not given. Search also reports the results to reporter.
+
+    Args:
+        s0: String representing the name of the starting state.
+        trans: A dictionary containing list of possible transitions and their
+            costs for each key that represents the state name, or a Graph.
+        goal: A list of goal state names.
+        hierarchy: A ContractionHierarchy of trans, or None to build it.
+        reporter: A Reporter that receives the search output, such as PRINT,
+            or None to discard it.
+        counters: A boolean indicating whether counters are collected.
+
+    Returns:
+        A SearchResult with the path from s0 to one of the goal states, or
+        with path None if the path is not found. Expanded states are the
+        states settled by both searches, generated states and frontier size
+        are not measured. Building the hierarchy is timed as the setup phase.
+
+    """
+    result, reporter = SearchResult.start('ch', reporter, counters)
+
+    if hierarchy is None:
+        begin = perf_counter()
+        hierarchy = ContractionHierarchy.build(trans)
+        reporter.info('Hierarchy built in {:.3f} s with {} shortcuts.'.format(
+            perf_counter() - begin, hierarchy.shortcuts()))
+
+    result.phase('setup')
+
+    path, cost, settled = hierarchy.query(s0, goal)
+
+    return result.finish(reporter, path, settled, cost, None, None)
@@ -1,34 +1,65 @@
 """Support for loading state spaces and heuristics from files.
     
 A module that provides functions that handle loading of state space and
-heuristic functions from files in specific configuration.
+heuristic functions from files in specific configuration, and of writing
+them in the same configuration.
     
 """
 
+from graph import Graph, GraphTransitions
+from util import Transitions, integer_cost_bound
+from heuristic import TableHeuristic
+from snapshot import load_state_space, save_state_space, load_heuristic, \
+    save_heuristic
+from successors import GridMap
 
-def get_state_space(fname):
+
+def get_state_space(fname, compact=False, cache=True):
     """Loads state space from a file.
 
-    Function that loads state space from a file.
+    Function that loads state space from a file. Parsed state space is stored
+    in a binary snapshot next to the file, which is used instead of parsing
+    the file again until the file changes.
+
+    Transitions loaded from a snapshot are a read-only GraphTransitions view
+    of the memory-mapped graph, which builds transitions of a state when it
+    is first looked up. Loading is then almost free, but a search that visits
+    most states is slower than on a dictionary. Callers that change the
+    transitions must copy them with dict(transitions) first.
     
 
     Args:
         fname: String representing path to a file containing state space.
+        compact: A boolean indicating whether transitions should be returned
+            as a compact Graph instead of a dictionary.
+        cache: A boolean indicating whether a snapshot of the file is used
+            and written.
 
     Returns:
         A tuple (s0, transitions, goal).
         s0: Starting state name as string.
-        transitions: A dictionary containing list of possible transitions and
-            their costs for each key that represents the state name.
+        transitions: A Transitions dictionary containing list of possible
+            transitions and their costs for each key that represents the state
+            name, a read-only GraphTransitions over the memory-mapped snapshot
+            if it was used, or a Graph if compact is True. All record whether
+            costs are small non-negative integers in their cost_bound
+            attribute.
         goal: A list of goal state names.
     
     """
+    snapshot = load_state_space(fname) if cache else None
+    
+    if snapshot:
+        s0, graph, goal = snapshot
+        
+        print_state_space(s0, goal, len(graph), len(graph.targets))
+        
+        return s0, graph if compact else GraphTransitions(graph), goal
+    
     s0 = None
-    transitions = dict()
+    transitions = Transitions()
     goal = set()
     
-    total_transitions = 0
-    
     with open(fname) as f:
         for l in f:
             l = l.strip()
@@ -56,10 +87,22 @@ def get_state_space(fname):
             for i in range(1, len(l_spl)):
                 t = l_spl[i].split(',')
                 transitions[s].add((t[0].strip(), float(t[1].strip())))
-                
-                total_transitions += 1
     
-    print_state_space(s0, goal, len(transitions), total_transitions)
+    # repeated transitions are counted once, as in the snapshot
+    print_state_space(s0, goal, len(transitions),
+                      sum(len(transitions[s]) for s in transitions))
+    
+    transitions.cost_bound = integer_cost_bound(
+        c for s in transitions for _, c in transitions[s])
+    
+    if compact or cache:
+        graph = Graph.from_transitions(transitions)
+        
+        if cache:
+            save_state_space(fname, s0, graph, goal)
+        
+        if compact:
+            transitions = graph
     
     return s0, transitions, goal
 
@@ -91,33 +134,155 @@ def print_state_space(s0, goal, states, transitions):
     print('Total transitions: {}'.format(transitions))
 
 
-def get_heuristic(fname):
+def get_heuristic(fname, cache=True):
     """Loads heuristic function from a file.
 
-    Function that loads heuristic function from a file.
+    Function that loads heuristic function from a file. Parsed heuristic is
+    stored in a binary snapshot next to the file, which is used instead of
+    parsing the file again until the file changes.
     
 
     Args:
         fname: String representing path to a file containing heuristic
         function.
+        cache: A boolean indicating whether the binary snapshot should be
+            used.
+
+    Returns:
+        A TableHeuristic that takes state name and returns heuristic value of
+        that state as provided in the heuristic file.
+    
+    """
+    heuristic = load_heuristic(fname) if cache else None
+    
+    if heuristic is None:
+        heuristic = dict()
+        
+        with open(fname) as f:
+            for l in f:
+                l = l.strip()
+                
+                if l[0] == '#':
+                    continue
+                
+                l_spl = l.split()
+                
+                heuristic[l_spl[0][:-1]] = float(l_spl[1])
+        
+        if cache:
+            save_heuristic(fname, heuristic)
+    
+    return TableHeuristic(heuristic)
+
+
+def get_grid_map(fname):
+    """Loads grid map from a file.
+
+    Function that loads grid map from a file. Like a state space file, it
+    starts with the starting state and goal states, which are named
+    'row_column' after their cell. They are followed by a line with 4 for
+    grids with only orthogonal moves or 8 for grids with diagonal moves too,
+    and by rows of the grid. Cells marked by '.' are passable, cells marked
+    by '@' are blocked. Lines starting with '#' are skipped before the rows.
+
+    Args:
+        fname: String representing path to a file containing grid map.
 
     Returns:
-        A function that takes state name and returns heuristic value of that
-        state as provided in the heuristic file.
+        A tuple (s0, grid, goal).
+        s0: Starting state name as string.
+        grid: A GridMap generating transitions between passable cells.
+        goal: A list of goal state names.
     
     """
-    heuristic = dict()
+    header = []
+    rows = []
     
     with open(fname) as f:
         for l in f:
             l = l.strip()
             
-            if l[0] == '#':
-                continue
-            
-            l_spl = l.split()
-            
-            heuristic[l_spl[0][:-1]] = float(l_spl[1])
+            if len(header) < 3:
+                if l and l[0] != '#':
+                    header.append(l)
+            elif l:
+                rows.append(l)
+    
+    s0, goal, connectivity = header
+    goal = set(goal.split())
     
-    return lambda s: heuristic[s]
+    if connectivity not in ('4', '8'):
+        raise ValueError('Unknown grid connectivity {}.'.format(connectivity))
+    
+    grid = GridMap(rows, connectivity == '8')
+    
+    print_state_space(s0, goal, grid.states(), grid.transitions())
+    
+    return s0, grid, goal
+
+
+def write_grid_map(fname, s0, grid, goal):
+    """Writes grid map to a file.
+
+    Function that writes grid map to a file in the configuration read by
+    get_grid_map.
+
+    Args:
+        fname: String representing path to the written file.
+        s0: Starting state name as string.
+        grid: A GridMap.
+        goal: A list of goal state names.
+    
+    """
+    with open(fname, 'w') as f:
+        f.write('{}\n{}\n{}\n'.format(s0, ' '.join(goal),
+                                       8 if grid.diagonal else 4))
+        
+        for row in grid.rows():
+            f.write(row + '\n')
+
+
+def write_state_space(fname, s0, transitions, goal):
+    """Writes state space to a file.
+
+    Function that writes state space to a file in the configuration read by
+    get_state_space.
+
+    Args:
+        fname: String representing path to the written file.
+        s0: Starting state name as string.
+        transitions: A dictionary containing list of possible transitions and
+            their costs for each key that represents the state name.
+        goal: A list of goal state names.
+    
+    """
+    with open(fname, 'w') as f:
+        f.write('{}\n{}\n'.format(s0, ' '.join(goal)))
+        
+        for s in transitions:
+            moves = ' '.join('{},{}'.format(m, _number(c))
+                             for m, c in sorted(transitions[s]))
+            f.write('{}: {}\n'.format(s, moves))
+
 
+def write_heuristic(fname, values):
+    """Writes heuristic function to a file.
+
+    Function that writes heuristic values to a file in the configuration read
+    by get_heuristic.
+
+    Args:
+        fname: String representing path to the written file.
+        values: A dictionary mapping state names to heuristic values.
+    
+    """
+    with open(fname, 'w') as f:
+        for s, v in values.items():
+            f.write('{}: {}\n'.format(s, _number(v)))
+
+
+def _number(x):
+    """Returns x as an integer if it is whole, so files stay readable."""
+    x = float(x)
+    
+    return int(x) if x.is_integer() else x
@@ -0,0 +1,233 @@
+"""External-memory path-finding algorithms.
+
+A module that provides a breadth-first search whose visited states are kept
+on disk instead of in memory. Each depth layer is a file of sorted state
+names, one per line. Successors of a layer are collected in a buffer of
+bounded size, which is written to a sorted run file whenever it fills up,
+and the runs are then merged into the next layer while states that are
+already in earlier layers are removed. Memory use grows with the buffer, not
+with the size of the state space.
+
+"""
+
+import heapq
+import os
+from itertools import groupby
+from tempfile import TemporaryDirectory
+
+from graph import Graph
+from search import SearchResult, _intern, _names
+
+
+BUFFER_STATES = 100000
+
+
+class LayerFiles():
+    """Files of sorted state names in a directory.
+
+    A class that writes and reads files with one encoded state name per line
+    and counts the bytes that went to and from the disk.
+
+    Attributes:
+        directory: String representing the directory of the files.
+        bytes_read: An integer representing the number of bytes read.
+        bytes_written: An integer representing the number of bytes written.
+    """
+
+    def __init__(self, directory):
+        """Inits LayerFiles in an existing directory."""
+        self.directory = directory
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.files = 0
+
+    def write(self, lines):
+        """Writes lines to a new file.
+
+        Returns:
+            A tuple (path, count) with path of the file and the number of
+            written lines.
+
+        """
+        path = os.path.join(self.directory, '{}.txt'.format(self.files))
+        self.files += 1
+
+        count = 0
+        with open(path, 'wb') as f:
+            for line in lines:
+                f.write(line + b'\n')
+                count += 1
+
+            self.bytes_written += f.tell()
+
+        return path, count
+
+    def lines(self, path):
+        """Yields lines of a file without line ends."""
+        with open(path, 'rb') as f:
+            for line in f:
+                self.bytes_read += len(line)
+                yield line[:-1]
+
+    def remove(self, path):
+        """Removes a file."""
+        os.remove(path)
+
+
+def ExternalBFS(s0, trans, goal, directory=None, buffer=BUFFER_STATES,
+                locality=None, reporter=None, counters=True):
+    """Performs an external-memory breadth-first search.
+
+    Performs a breadth-first search starting from state s0 and trying to
+    reach goal state, if it exists, one depth layer at a time. Successors of
+    a layer are sorted in runs of about buffer states, and the runs are
+    merged into the next layer, from which states already seen in earlier
+    layers are removed by merging it with them. The path is found backwards:
+    each state on it gets as predecessor the first state of the layer before
+    that has a transition to it. Search also reports the amount of disk
+    input and output and the results to reporter.
+
+    Args:
+        s0: String representing the name of the starting state.
+        trans: A dictionary containing list of possible transitions and their
+            costs for each key that represents the state name, a Graph or a
+            SuccessorProvider.
+        goal: A list of goal state names.
+        directory: String representing the directory where layer files are
+            kept while searching, or None to use the default temporary one.
+        buffer: An integer representing the number of successors kept in
+            memory before they are written to disk, which is exceeded at most
+            by the successors of one state.
+        locality: An integer representing how many of the last layers can
+            contain successors of a layer, for example 2 if every transition
+            can be reversed, or None to check all earlier layers. With a
+            locality too low, states are expanded again and the search may
+            not end if there is no path.
+        reporter: A Reporter that receives the search output, such as PRINT,
+            or None to discard it.
+        counters: A boolean indicating whether counters are collected.
+
+    Returns:
+        A SearchResult with the path from s0 to one of the goal states, or
+        with path None if the path is not found. Its frontier is the largest
+        layer, and its metrics bytes_read and bytes_written hold the disk
+        input and output.
+
+    """
+    result, reporter = SearchResult.start('ebfs', reporter, counters)
+
+    s0, goal, _ = _intern(s0, trans, goal)
+
+    if isinstance(trans, Graph):
+        decode, encode = int, lambda s: str(s).encode()
+    else:
+        decode, encode = bytes.decode, str.encode
+
+    goals = {encode(g) for g in goal}
+
+    with TemporaryDirectory(dir=directory) as tmp:
+        files = LayerFiles(tmp)
+
+        layers = [files.write([encode(s0)])[0]]
+        seen = layers[0]
+
+        found = encode(s0) if encode(s0) in goals else None
+        expanded = generated = 0
+        frontier = 1
+
+        result.phase('setup')
+
+        while found is None:
+            runs, run = [], set()
+
+            for line in files.lines(layers[-1]):
+                successors = [encode(m) for m, _ in trans.get(decode(line), [])]
+
+                expanded += 1
+                generated += len(successors)
+                run.update(successors)
+
+                if len(run) >= buffer:
+                    runs.append(files.write(sorted(run))[0])
+                    run = set()
+
+            if run:
+                runs.append(files.write(sorted(run))[0])
+
+            previous = [seen] if locality is None else layers[-locality:]
+
+            hits = []
+            layer, count = files.write(_marked(
+                _subtract(_unique(heapq.merge(*map(files.lines, runs))),
+                          heapq.merge(*map(files.lines, previous))),
+                goals, hits))
+
+            for run in runs:
+                files.remove(run)
+
+            if not count:
+                break
+
+            layers.append(layer)
+            frontier = max(frontier, count)
+
+            if locality is None:
+                merged = files.write(heapq.merge(files.lines(seen),
+                                                 files.lines(layer)))[0]
+                if seen not in layers:
+                    files.remove(seen)
+                seen = merged
+
+            if hits:
+                found = min(hits)
+
+        path = None
+        if found is not None:
+            path = [found]
+
+            for layer in reversed(layers[:-1]):
+                target = decode(path[-1])
+
+                for line in files.lines(layer):
+                    if any(m == target for m, _ in trans.get(decode(line), [])):
+                        path.append(line)
+                        break
+
+            path = _names(trans, [decode(s) for s in reversed(path)])
+
+        reporter.info('Layers = {}, disk read = {} B, written = {} B'.format(
+            len(layers), files.bytes_read, files.bytes_written))
+
+    result.finish(reporter, path, expanded, None, generated, frontier)
+
+    result.metrics['bytes_read'] = files.bytes_read
+    result.metrics['bytes_written'] = files.bytes_written
+
+    return result
+
+
+def _unique(lines):
+    """Yields sorted lines without repeated ones."""
+    return (line for line, _ in groupby(lines))
+
+
+def _subtract(lines, removed):
+    """Yields sorted lines that are not in sorted lines removed."""
+    removed = iter(removed)
+    r = next(removed, None)
+
+    for line in lines:
+        while r is not None and r < line:
+            r = next(removed, None)
+
+        if line != r:
+            yield line
+
+
+def _marked(lines, goals, hits):
+    """Yields lines and appends the ones that are in goals to hits."""
+    for line in lines:
+        if line in goals:
+            hits.append(line)
+
+        yield line
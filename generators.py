@@ -0,0 +1,213 @@
+"""Generated state spaces.
+
+A module that generates state spaces of any size from fixed seeds: random
+graphs, road-like maps, grid maps, mazes and parts of sliding puzzles,
+together with queries and heuristics for them. They are used by benchmarks
+and tests.
+
+"""
+
+from random import Random
+
+from util import Transitions, integer_cost_bound, flip_transitions
+
+
+def road_graph(width, height, seed=0):
+    """Generates a road-like state space.
+
+    States are cells of a width x height grid named 'row_column'. Roads
+    connect neighboring cells, about one in ten is missing, some are one-way
+    and the way back may be more expensive. Costs are integers from 1 to 11.
+
+    Returns:
+        A Transitions dictionary.
+
+    """
+    random = Random(seed)
+    trans = Transitions()
+    
+    for r in range(height):
+        for c in range(width):
+            trans['{}_{}'.format(r, c)] = set()
+    
+    for r in range(height):
+        for c in range(width):
+            for nr, nc in ((r, c + 1), (r + 1, c)):
+                if nr >= height or nc >= width or random.random() < 0.1:
+                    continue
+                
+                s, t = '{}_{}'.format(r, c), '{}_{}'.format(nr, nc)
+                cost = float(random.randint(1, 9))
+                
+                trans[s].add((t, cost))
+                if random.random() > 0.05:
+                    trans[t].add((s, cost + random.randint(0, 2)))
+    
+    trans.cost_bound = integer_cost_bound(
+        c for s in trans for _, c in trans[s])
+    
+    return trans
+
+
+def random_graph(states, degree=3, seed=0):
+    """Generates a random weighted state space.
+
+    States are named 's0' to 's<states - 1>' and joined in a ring, so every
+    state can reach every other one. Each state also gets degree transitions
+    to random states. Costs are integers from 1 to 20.
+
+    Returns:
+        A Transitions dictionary.
+
+    """
+    random = Random(seed)
+    trans = Transitions()
+    
+    names = ['s{}'.format(i) for i in range(states)]
+    
+    for i, s in enumerate(names):
+        trans[s] = {(names[(i + 1) % states], float(random.randint(1, 20)))}
+        
+        for _ in range(degree):
+            t = names[random.randrange(states)]
+            if t != s:
+                trans[s].add((t, float(random.randint(1, 20))))
+    
+    trans.cost_bound = integer_cost_bound(
+        c for s in trans for _, c in trans[s])
+    
+    return trans
+
+
+def puzzle_space(n, depth, seed=0):
+    """Generates the part of an n x n sliding puzzle near its solved state.
+
+    Contains states that are at most depth moves away from the solved state
+    and transitions between them.
+
+    Returns:
+        A tuple (s0, transitions, goal) where s0 is a random state depth
+        moves away from the solved state, transitions is a Transitions
+        dictionary and goal is a list with the solved state.
+
+    """
+    from successors import SlidingPuzzle
+    
+    puzzle = SlidingPuzzle(n)
+    goal = puzzle.goal()
+    
+    depths = {goal: 0}
+    layer = [goal]
+    
+    for d in range(1, depth + 1):
+        next_layer = []
+        
+        for s in layer:
+            for m, _ in puzzle.successors(s):
+                if m not in depths:
+                    depths[m] = d
+                    next_layer.append(m)
+        
+        layer = next_layer
+    
+    trans = Transitions()
+    for s in depths:
+        trans[s] = {(m, c) for m, c in puzzle.successors(s) if m in depths}
+    trans.cost_bound = puzzle.cost_bound
+    
+    return Random(seed).choice(layer), trans, [goal]
+
+
+def open_grid(width, height, density=0.05, seed=0, diagonal=True):
+    """Generates a grid map with randomly blocked cells.
+
+    Each cell is blocked with probability density.
+
+    Returns:
+        A GridMap.
+
+    """
+    from successors import GridMap
+    
+    random = Random(seed)
+    
+    return GridMap([''.join('@' if random.random() < density else '.'
+                            for _ in range(width)) for _ in range(height)],
+                   diagonal)
+
+
+def maze_grid(width, height, seed=0, diagonal=True):
+    """Generates a grid map of a maze with corridors one cell wide.
+
+    The maze is a random spanning tree of cells with even coordinates, carved
+    by a randomized depth-first search, so there is exactly one path between
+    any two of its cells.
+
+    Returns:
+        A GridMap.
+
+    """
+    from successors import GridMap
+    
+    random = Random(seed)
+    rows = [['@'] * width for _ in range(height)]
+    
+    rows[0][0] = '.'
+    stack = [(0, 0)]
+    
+    while stack:
+        r, c = stack[-1]
+        moves = [(dr, dc) for dr, dc in ((-2, 0), (2, 0), (0, -2), (0, 2))
+                 if 0 <= r + dr < height and 0 <= c + dc < width
+                 and rows[r + dr][c + dc] == '@']
+        
+        if not moves:
+            stack.pop()
+            continue
+        
+        dr, dc = random.choice(moves)
+        rows[r + dr // 2][c + dc // 2] = rows[r + dr][c + dc] = '.'
+        stack.append((r + dr, c + dc))
+    
+    return GridMap([''.join(row) for row in rows], diagonal)
+
+
+def far_query(trans, seed=0):
+    """Chooses a query with an expensive solution in a state space.
+
+    Returns:
+        A tuple (s0, goal) where s0 is a random state and goal is a list with
+        the state most expensive to reach from it.
+
+    """
+    from search import dijkstra
+    
+    s0 = Random(seed).choice(sorted(trans))
+    costs = dijkstra([s0], trans)
+    
+    return s0, [max(sorted(costs), key=costs.get)]
+
+
+def scaled_distances(trans, goal, scale=0.8):
+    """Returns a heuristic table of scaled real costs to the goal states.
+
+    Real costs are rounded down after scaling, which keeps the heuristic
+    optimistic and consistent for integer costs while leaving A* some work.
+    States that cannot reach the goal states get an infinite value.
+
+    """
+    from search import dijkstra
+    
+    costs = dijkstra(goal, flip_transitions(trans))
+    
+    return {s: float(int(scale * costs[s])) if s in costs else float('inf')
+            for s in trans}
+
+
+def puzzle_distances(trans, goal):
+    """Returns a heuristic table of manhattan distances to the goal states."""
+    from puzzle_heuristic import manhattan_distance
+    
+    h = manhattan_distance(goal)
+    
+    return {s: h(s) for s in trans}
@@ -0,0 +1,308 @@
+"""Compact state space graph.
+
+A module that provides a compact representation of a loaded state space.
+State names are interned to integers and transitions are stored in
+contiguous arrays in compressed sparse row (CSR) form.
+
+"""
+
+import zlib
+from array import array
+from collections.abc import Mapping
+
+from util import integer_cost_bound
+from heuristic import evaluate
+
+
+class Graph():
+    """Compact state space graph.
+
+    A class that stores a state space with states interned to integer ids.
+    Outgoing transitions of state i are stored in targets[offsets[i]:
+    offsets[i + 1]] with their costs in the same slice of costs. It can be
+    used in place of a transitions dictionary, in which case search
+    algorithms work on state ids and map them back to names only when the
+    path is reported.
+
+    Attributes:
+        names: A list of state names indexed by state id.
+        index: A dictionary mapping state names to their ids.
+        sources: An integer representing the number of states that have their
+            transitions defined. Those states have ids below this number.
+        offsets: An array of integers of length len(names) + 1 representing
+            where transitions of each state begin in targets and costs.
+        targets: An array of integers representing target state ids.
+        costs: An array of floats representing transition costs.
+        cost_bound: The largest transition cost if all costs are small
+            non-negative integers, else None. See util.Transitions.
+    """
+
+    def __init__(self, names, sources, offsets, targets, costs):
+        """Inits Graph with given arrays."""
+        self.names = names
+        self.index = {s: i for i, s in enumerate(names)}
+        self.sources = sources
+        self.offsets = offsets
+        self.targets = targets
+        self.costs = costs
+
+    @classmethod
+    def from_transitions(cls, trans):
+        """Builds a graph from a transitions dictionary.
+
+        Args:
+            trans: A dictionary containing list of possible transitions and
+                their costs for each key that represents the state name.
+
+        Returns:
+            A Graph representing the same state space, which is the graph
+            of trans itself if it is a GraphTransitions.
+
+        """
+        if isinstance(trans, GraphTransitions):
+            return trans.graph
+
+        names = list(trans)
+        index = {s: i for i, s in enumerate(names)}
+
+        for s in trans:
+            for m, _ in trans[s]:
+                if m not in index:
+                    index[m] = len(names)
+                    names.append(m)
+
+        offsets = array('q', [0])
+        targets = array('q')
+        costs = array('d')
+
+        for s in names:
+            for m, c in trans.get(s, ()):
+                targets.append(index[m])
+                costs.append(c)
+
+            offsets.append(len(targets))
+
+        return cls(names, len(trans), offsets, targets, costs)
+
+    @property
+    def cost_bound(self):
+        """The largest cost if all costs are small non-negative integers.
+
+        Computed on first access, see util.integer_cost_bound.
+
+        """
+        try:
+            return self._cost_bound
+        except AttributeError:
+            self._cost_bound = integer_cost_bound(self.costs)
+            return self._cost_bound
+
+    def get(self, i, default=()):
+        """Returns transitions of state i as (target id, cost) pairs.
+
+        Mirrors dict.get so that a graph can be used in place of a
+        transitions dictionary.
+
+        """
+        if not 0 <= i < len(self.names):
+            return default
+
+        start, end = self.offsets[i], self.offsets[i + 1]
+
+        return zip(self.targets[start:end], self.costs[start:end])
+
+    def __getitem__(self, i):
+        """Returns transitions of state i as (target id, cost) pairs."""
+        if not 0 <= i < self.sources:
+            raise KeyError(i)
+
+        return self.get(i)
+
+    def __iter__(self):
+        """Iterates over ids of states that have their transitions defined."""
+        return iter(range(self.sources))
+
+    def __len__(self):
+        """Returns the number of states that have their transitions defined."""
+        return self.sources
+
+    def __contains__(self, i):
+        """Returns whether state i has its transitions defined."""
+        return 0 <= i < self.sources
+
+    def edge_sources(self):
+        """Returns an array of source state ids, one for each transition.
+
+        Together with targets and costs it lists every transition of the
+        graph as a (source, target, cost) triple.
+
+        """
+        sources = array('q')
+
+        for i in range(len(self.names)):
+            sources.extend([i] * (self.offsets[i + 1] - self.offsets[i]))
+
+        return sources
+
+    def checksum(self):
+        """Returns a checksum of state names and transitions.
+
+        It is used to tell whether data computed for a state space, such as
+        heuristic tables, still belongs to it. Transitions of each state are
+        sorted first, so it does not depend on the order they were loaded in.
+
+        """
+        names = self.names
+        crc = zlib.crc32('\n'.join(names).encode())
+
+        for i in range(len(names)):
+            edges = sorted((names[m], c) for m, c in self.get(i))
+            crc = zlib.crc32(repr(edges).encode(), crc)
+
+        return crc
+
+    def to_transitions(self):
+        """Converts the graph back to a transitions dictionary."""
+        return {self.names[i]: {(self.names[m], c) for m, c in self.get(i)}
+                for i in range(self.sources)}
+
+    def intern(self, s0, goal, h=None):
+        """Translates search arguments from state names to state ids.
+
+        Args:
+            s0: String representing the name of the starting state.
+            goal: A list of goal state names.
+            h: Heuristic function that takes state name, or None.
+
+        Returns:
+            A tuple (s0, goal, h) where s0 is the starting state id, goal is a
+            set of goal state ids and h is a heuristic function that takes
+            state id, or None if h was not given.
+
+        """
+        index = self.index
+        names = self.names
+
+        s0 = index.get(s0, -1)
+        goal = {index[g] for g in goal if g in index}
+
+        if h is not None:
+            h = interned_heuristic(h, names)
+
+        return s0, goal, h
+
+    def reversed(self):
+        """Returns a graph with all transitions reversed.
+
+        Costs are kept the same and all states keep their ids. Every state
+        has its transitions defined in the reversed graph.
+
+        """
+        n = len(self.names)
+
+        offsets = array('q', bytes(8 * (n + 1)))
+        for m in self.targets:
+            offsets[m + 1] += 1
+
+        for i in range(n):
+            offsets[i + 1] += offsets[i]
+
+        fill = offsets[:-1]
+        targets = array('q', bytes(8 * len(self.targets)))
+        costs = array('d', bytes(8 * len(self.costs)))
+
+        for i in range(n):
+            for j in range(self.offsets[i], self.offsets[i + 1]):
+                m = self.targets[j]
+                targets[fill[m]] = i
+                costs[fill[m]] = self.costs[j]
+                fill[m] += 1
+
+        return Graph(self.names, n, offsets, targets, costs)
+
+
+class GraphTransitions(Mapping):
+    """Transitions dictionary backed by a Graph.
+
+    A read-only dictionary containing set of possible transitions and their
+    costs for each key that represents the state name. Transitions of a state
+    are built from the arrays of the graph when the state is first looked up
+    and then kept, so a graph memory-mapped from a snapshot can be used in
+    place of a transitions dictionary without converting all of it.
+
+    Attributes:
+        graph: The Graph holding the transitions.
+        cost_bound: The cost_bound attribute of the graph.
+    """
+
+    def __init__(self, graph):
+        """Inits GraphTransitions over a graph."""
+        self.graph = graph
+        self.cache = {}
+
+    @property
+    def cost_bound(self):
+        """The cost_bound attribute of the graph."""
+        return self.graph.cost_bound
+
+    def __getitem__(self, s):
+        """Returns transitions of state s as a set of (name, cost) pairs."""
+        edges = self.get(s)
+
+        if edges is None:
+            raise KeyError(s)
+
+        return edges
+
+    def get(self, s, default=None):
+        """Returns transitions of state s, or default if it has none."""
+        edges = self.cache.get(s)
+
+        if edges is not None:
+            return edges
+
+        graph = self.graph
+        i = graph.index.get(s, graph.sources)
+
+        if i >= graph.sources:
+            return default
+
+        names = graph.names
+        start, end = graph.offsets[i], graph.offsets[i + 1]
+
+        edges = self.cache[s] = set(zip(
+            [names[m] for m in graph.targets[start:end]],
+            graph.costs[start:end]))
+
+        return edges
+
+    def __iter__(self):
+        """Iterates over names of states that have their transitions
+        defined."""
+        return iter(self.graph.names[:self.graph.sources])
+
+    def __len__(self):
+        """Returns the number of states that have their transitions defined."""
+        return self.graph.sources
+
+    def __contains__(self, s):
+        """Returns whether state s has its transitions defined."""
+        return self.graph.index.get(s, self.graph.sources) < self.graph.sources
+
+
+def interned_heuristic(h, names):
+    """Wraps a heuristic function that takes state names to take state ids.
+
+    Args:
+        h: Heuristic function that takes state name.
+        names: A list of state names indexed by state id.
+
+    Returns:
+        A function that takes state id and returns its heuristic value. It
+        also has a batch method that takes a list of state ids.
+
+    """
+    interned = lambda i: h(names[i])
+    interned.batch = lambda ids: evaluate(h, [names[i] for i in ids])
+
+    return interned
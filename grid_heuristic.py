@@ -0,0 +1,80 @@
+"""Grid map heuristic functions.
+
+Module that provides heuristic functions for grid maps whose states are named
+'row_column' after their cell, as generated by successors.GridMap.
+
+"""
+
+from successors import SQRT2
+
+
+class OctileDistance():
+    """Octile distance heuristic.
+
+    A class whose instances give the cost of the cheapest path to the
+    closest goal state on an empty grid: diagonal moves cost sqrt(2) and
+    orthogonal moves 1. Without diagonal moves it is the manhattan distance.
+
+    Attributes:
+        goals: A list of (row, column) tuples of the goal states.
+        diagonal: A boolean indicating whether diagonal moves are allowed.
+        integer_steps: A boolean indicating that values are integers that
+            change by at most the transition cost between neighboring
+            states, which holds without diagonal moves, see
+            util.priority_queue.
+    """
+
+    def __init__(self, goals, diagonal=True):
+        """Inits OctileDistance with a list of goal state names."""
+        self.goals = [_coordinates(g) for g in goals]
+        self.diagonal = diagonal
+        self.integer_steps = not diagonal
+
+    def __call__(self, state):
+        """Returns the heuristic value of a state."""
+        r, c = _coordinates(state)
+        h = float('inf')
+
+        for gr, gc in self.goals:
+            dr, dc = abs(r - gr), abs(c - gc)
+
+            if self.diagonal:
+                d = max(dr, dc) + (SQRT2 - 1) * min(dr, dc)
+            else:
+                d = dr + dc
+
+            if d < h:
+                h = d
+
+        return h
+
+    def batch(self, states):
+        """Returns a list of heuristic values of given states."""
+        return [self(s) for s in states]
+
+
+def _coordinates(s):
+    """Returns (row, column) of a state named 'row_column'."""
+    r, _, c = s.partition('_')
+
+    return int(r), int(c)
+
+
+def octile_distance(goals, diagonal=True):
+    """Octile distance heuristic
+
+    Function that returns a function that gives octile distance heuristic
+    value for each given state of a grid map. It never overestimates, because
+    it is the cost of the cheapest path when no cells are blocked.
+
+    Args:
+        goals: List of goal states represented by string name of the state.
+        diagonal: A boolean indicating whether diagonal moves are allowed,
+            else the manhattan distance is used.
+
+    Returns:
+        Returns an OctileDistance that gives octile distance heuristic value
+        for each given state.
+
+    """
+    return OctileDistance(goals, diagonal)
@@ -0,0 +1,170 @@
+"""Heuristic function contract and wrappers.
+
+A module that describes how heuristic functions are called and provides
+wrappers around them. A heuristic is a callable that takes a state name and
+returns its heuristic value. It may also provide a batch method that takes a
+list of state names and returns a list of their values, which lets callers
+score all successors of a state in one call.
+
+"""
+
+from collections import OrderedDict
+
+
+def evaluate(h, states):
+    """Evaluates heuristic function on a list of states.
+
+    Uses the batch method of the heuristic if it has one, else calls it once
+    for every state.
+
+    Args:
+        h: Heuristic function.
+        states: A list of state names.
+
+    Returns:
+        A list of heuristic values of given states.
+
+    """
+    batch = getattr(h, 'batch', None)
+
+    if batch is not None:
+        return batch(states)
+
+    return [h(s) for s in states]
+
+
+class TableHeuristic():
+    """Heuristic given by a table of values.
+
+    Attributes:
+        table: A dictionary mapping state names to heuristic values.
+    """
+
+    def __init__(self, table):
+        """Inits TableHeuristic with a dictionary of values."""
+        self.table = table
+
+    def __call__(self, s):
+        """Returns the heuristic value of a state."""
+        return self.table[s]
+
+    def batch(self, states):
+        """Returns a list of heuristic values of given states."""
+        return list(map(self.table.__getitem__, states))
+
+
+class CountingHeuristic():
+    """Heuristic wrapper that counts computed values.
+
+    Keeps the batch and incremental child methods of the wrapped heuristic.
+
+    Attributes:
+        h: Wrapped heuristic function.
+        calls: An integer representing the number of computed values.
+        incremental: A boolean indicating whether child method can be used.
+        integer_steps: The integer_steps attribute of the wrapped heuristic,
+            see util.priority_queue.
+    """
+
+    def __init__(self, h):
+        """Inits CountingHeuristic wrapping heuristic h."""
+        self.h = h
+        self.calls = 0
+        self.incremental = getattr(h, 'incremental', False)
+        self.integer_steps = getattr(h, 'integer_steps', False)
+
+    def __call__(self, s):
+        """Returns the heuristic value of a state."""
+        self.calls += 1
+        return self.h(s)
+
+    def batch(self, states):
+        """Returns a list of heuristic values of given states."""
+        self.calls += len(states)
+        return evaluate(self.h, states)
+
+    def child(self, parent, h, state):
+        """Returns the heuristic value of a state from its parent."""
+        self.calls += 1
+        return self.h.child(parent, h, state)
+
+
+class Memoized():
+    """Heuristic wrapper that remembers recently computed values.
+
+    Keeps values of at most maxsize states and forgets the least recently
+    used one when full.
+
+    Attributes:
+        h: Wrapped heuristic function.
+        maxsize: An integer representing the largest number of kept values.
+        hits: An integer representing the number of values found in memory.
+        misses: An integer representing the number of computed values.
+        integer_steps: The integer_steps attribute of the wrapped heuristic,
+            see util.priority_queue.
+    """
+
+    def __init__(self, h, maxsize=65536):
+        """Inits Memoized wrapping heuristic h."""
+        self.h = h
+        self.integer_steps = getattr(h, 'integer_steps', False)
+        self.maxsize = maxsize
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __call__(self, s):
+        """Returns the heuristic value of a state."""
+        cache = self.cache
+
+        if s in cache:
+            self.hits += 1
+            cache.move_to_end(s)
+            return cache[s]
+
+        self.misses += 1
+        value = cache[s] = self.h(s)
+
+        if len(cache) > self.maxsize:
+            cache.popitem(last=False)
+
+        return value
+
+    def batch(self, states):
+        """Returns a list of heuristic values of given states.
+
+        Values that are not remembered are computed in a single batch call
+        of the wrapped heuristic.
+
+        """
+        cache = self.cache
+
+        missing = [s for s in states if s not in cache]
+
+        self.misses += len(missing)
+        self.hits += len(states) - len(missing)
+
+        if missing:
+            cache.update(zip(missing, evaluate(self.h, missing)))
+
+        values = [cache[s] for s in states]
+
+        for s in states:
+            cache.move_to_end(s)
+
+        while len(cache) > self.maxsize:
+            cache.popitem(last=False)
+
+        return values
+
+    @property
+    def hit_rate(self):
+        """The fraction of lookups whose value was found in memory."""
+        total = self.hits + self.misses
+
+        return self.hits / total if total else 0.
+
+    def print_stats(self):
+        """Prints cache statistics."""
+        print('Heuristic cache: {} hits, {} misses, hit rate {:.1%}'.format(
+            self.hits, self.misses, self.hit_rate))
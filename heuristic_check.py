@@ -2,124 +2,474 @@
     
 A module that provides functions that perform heuristic checks. Checks include
 optimistic and consistent properties.
+
+Both checks are also available on plain arrays of transitions and heuristic
+values, which find all violations in a single pass. They use NumPy when it is
+installed and plain Python loops otherwise, with the same results.
     
 """
 
+from array import array
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory, get_context, get_all_start_methods
+
 from util import flip_transitions
 from search import dijkstra
+from graph import Graph
+from heuristic import evaluate
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+EPSILON = 1e-9
+
+
+class CheckReport():
+    """Result of a heuristic check.
+
+    Evaluates to True if no violations were found.
+
+    Attributes:
+        count: An integer representing the number of violations.
+        worst: The largest amount by which the property is violated, or 0 if
+            there are no violations.
+        offenders: A list of at most k (index, amount) pairs of the largest
+            violations, largest first and ties ordered by index. Indices are
+            state ids or transition indices, depending on the check.
+    """
+
+    def __init__(self, count, worst, offenders):
+        """Inits CheckReport with violation count, worst and offenders."""
+        self.count = count
+        self.worst = worst
+        self.offenders = offenders
+
+    def __bool__(self):
+        """Returns whether the checked property holds."""
+        return self.count == 0
+
+    def __repr__(self):
+        return 'CheckReport(count={}, worst={}, offenders={})'.format(
+            self.count, self.worst, self.offenders)
+
+
+def _violations(lhs, rhs, k):
+    """Compares lhs > rhs elementwise and reports where it holds.
+
+    Differences up to EPSILON times the magnitude of rhs, but at least
+    EPSILON, are rounding errors of float costs, such as sums of sqrt(2) on
+    grid maps, and are not reported.
+
+    Args:
+        lhs: A sequence of floats, NumPy array if NumPy is used.
+        rhs: A sequence of floats of the same length.
+        k: An integer representing the largest number of offenders reported.
+
+    Returns:
+        A CheckReport whose indices are positions in lhs and rhs.
+
+    """
+    if np is not None:
+        with np.errstate(invalid='ignore'):
+            idx = np.flatnonzero(lhs - rhs > EPSILON * np.maximum(1., np.abs(rhs)))
+        amounts = lhs[idx] - rhs[idx]
+        top = np.argsort(-amounts, kind='stable')[:k]
+        
+        worst = float(amounts[top[0]]) if len(idx) else 0.
+        offenders = [(int(i), float(a)) for i, a in zip(idx[top], amounts[top])]
+        
+        return CheckReport(len(idx), worst, offenders)
+    
+    found = [(i, float(l - r)) for i, (l, r) in enumerate(zip(lhs, rhs))
+             if l - r > EPSILON * max(1., abs(r))]
+    found.sort(key=lambda f: -f[1])
+    
+    worst = found[0][1] if found else 0.
+    
+    return CheckReport(len(found), worst, found[:k])
+
+
+def merge_reports(reports, k=10):
+    """Merges reports of disjoint parts of a check into one report.
+
+    Offender indices of the reports must already refer to the whole check.
+    The result is the same as if the whole check was done at once.
+
+    """
+    offenders = sorted((o for r in reports for o in r.offenders),
+                       key=lambda o: (-o[1], o[0]))[:k]
+    worst = max((r.worst for r in reports if r.count), default=0.)
+    
+    return CheckReport(sum(r.count for r in reports), worst, offenders)
+
+
+_shared = []
+_inherited = None
+
+
+def _attach(blocks, graph=None, h=None):
+    """Attaches a worker process to shared arrays, and keeps the graph and
+    heuristic it inherited."""
+    global _inherited
+    
+    for name, typecode, length in blocks:
+        block = shared_memory.SharedMemory(name)
+        size = length * array(typecode).itemsize
+        _shared.append((block, block.buf[:size].cast(typecode)))
+    
+    _inherited = graph, h
+
+
+def _check_chunk(check, sliced, start, end, k):
+    """Runs a check on a chunk of the shared arrays in a worker process."""
+    arrays = [a for _, a in _shared]
+    args = [a[start:end] for a in arrays[:sliced]] + arrays[sliced:]
+    
+    report = check(*args, k=k)
+    report.offenders = [(i + start, amount) for i, amount in report.offenders]
+    
+    return report
+
+
+def _evaluate_chunk(start, end):
+    """Writes heuristic values of a chunk of states to the first shared
+    array in a worker process."""
+    graph, h = _inherited
+    
+    _shared[0][1][start:end] = array('d', evaluate(h, graph.names[start:end]))
+
+
+def _consistency_chunk(first, last, k):
+    """Checks transitions of states first to last - 1 against the shared
+    heuristic values in a worker process."""
+    graph, _ = _inherited
+    offsets = graph.offsets
+    start, end = offsets[first], offsets[last]
+    
+    sources = array('q')
+    for i in range(first, last):
+        sources.extend([i] * (offsets[i + 1] - offsets[i]))
+    
+    report = check_consistency(sources, graph.targets[start:end],
+                               graph.costs[start:end], _shared[0][1], k=k)
+    report.offenders = [(j + start, amount) for j, amount in report.offenders]
+    
+    return report
+
 
+def _check_graph(h, graph, goal, k, jobs):
+    """Checks a heuristic on a graph in a pool of processes.
 
-def is_optimistic(h, trans, goal):
+    Workers are forked with the graph, whose arrays they read without
+    copying, and first evaluate the heuristic on equal shares of the states
+    into a shared array of values. For the optimistic check the parent finds
+    real costs meanwhile, and workers then compare shares of values and
+    costs. For the consistency check workers check the transitions of shares
+    of states that have about as many transitions each.
+
+    Args:
+        h: Heuristic function that is being checked.
+        graph: The Graph the heuristic is checked on.
+        goal: List of goal states for the optimistic check, or None for the
+            consistency check.
+        k: An integer representing the largest number of offenders reported.
+        jobs: An integer representing the number of processes.
+
+    Returns:
+        A tuple (report, values, costs) where report is a CheckReport merged
+        from reports of all shares, values are heuristic values of the
+        checked states and costs are real costs of states with their
+        transitions defined, or None for the consistency check.
+
+    """
+    sources = graph.sources
+    n = len(graph.names) if goal is None else sources
+    chunks = jobs * 4
+    
+    # fork shares the graph and heuristic with workers instead of pickling them
+    context = get_context('fork' if 'fork' in get_all_start_methods() else None)
+    blocks = []
+    
+    try:
+        for length in [n] if goal is None else [n, n]:
+            block = shared_memory.SharedMemory(create=True, size=max(1, 8 * length))
+            blocks.append((block, 'd', length))
+        
+        with ProcessPoolExecutor(jobs, mp_context=context, initializer=_attach,
+                                 initargs=([(b.name, t, l) for b, t, l in blocks],
+                                           graph, h)) as pool:
+            bounds = [n * i // chunks for i in range(chunks + 1)]
+            done = [pool.submit(_evaluate_chunk, bounds[i], bounds[i + 1])
+                    for i in range(chunks)]
+            
+            costs = None
+            if goal is not None:
+                distances = dijkstra(goal, flip_transitions(graph))
+                costs = array('d', [distances.get(s, float('inf'))
+                                    for s in graph.names[:sources]])
+                blocks[1][0].buf[:8 * n] = costs.tobytes()
+            
+            for f in done:
+                f.result()
+            
+            if goal is None:
+                edges = len(graph.targets)
+                bounds = [bisect_left(graph.offsets, edges * i // chunks, 0, sources)
+                          for i in range(chunks)] + [sources]
+                reports = [pool.submit(_consistency_chunk, bounds[i],
+                                       bounds[i + 1], k) for i in range(chunks)]
+            else:
+                reports = [pool.submit(_check_chunk, check_optimism, 2,
+                                       bounds[i], bounds[i + 1], k)
+                           for i in range(chunks)]
+            
+            report = merge_reports([r.result() for r in reports], k)
+        
+        values = array('d')
+        values.frombytes(blocks[0][0].buf[:8 * n])
+        
+        return report, values, costs
+    finally:
+        for block, _, _ in blocks:
+            block.close()
+            block.unlink()
+
+
+def _check_parallel(check, arrays, sliced, k, jobs):
+    """Runs a check on chunks of arrays in a pool of processes.
+
+    Arrays are copied once into shared memory, which workers read without
+    copying. Every worker gets an equal share of the first sliced arrays and
+    the rest of the arrays whole.
+
+    Args:
+        check: Check function that is run on every chunk.
+        arrays: A list of arrays in the order check takes them, each a pair
+            of an array typecode and a sequence.
+        sliced: An integer representing how many leading arrays are split.
+        k: An integer representing the largest number of offenders reported.
+        jobs: An integer representing the number of processes.
+
+    Returns:
+        A CheckReport merged from reports of all chunks.
+
+    """
+    blocks = []
+    
+    try:
+        for typecode, a in arrays:
+            a = array(typecode, a)
+            size = len(a) * a.itemsize
+            block = shared_memory.SharedMemory(create=True, size=max(1, size))
+            block.buf[:size] = a.tobytes()
+            blocks.append((block, typecode, len(a)))
+        
+        n = blocks[0][2]
+        chunks = jobs * 4
+        bounds = [n * i // chunks for i in range(chunks + 1)]
+        
+        with ProcessPoolExecutor(jobs, initializer=_attach, initargs=(
+                [(b.name, t, l) for b, t, l in blocks],)) as pool:
+            reports = [pool.submit(_check_chunk, check, sliced, bounds[i],
+                                   bounds[i + 1], k) for i in range(chunks)]
+            
+            return merge_reports([r.result() for r in reports], k)
+    finally:
+        for block, _, _ in blocks:
+            block.close()
+            block.unlink()
+
+
+def check_optimism(values, costs, k=10, jobs=1):
+    """Checks optimistic property on arrays.
+
+    Args:
+        values: A sequence of heuristic values indexed by state id.
+        costs: A sequence of real costs from each state to the closest goal
+            state, indexed the same way. Unreachable states have infinite
+            cost.
+        k: An integer representing the largest number of offenders reported.
+        jobs: An integer representing the number of processes to use.
+
+    Returns:
+        A CheckReport of states whose heuristic value is larger than their
+        real cost, indexed by state id.
+
+    """
+    if jobs > 1:
+        return _check_parallel(check_optimism, [('d', values), ('d', costs)],
+                               2, k, jobs)
+    
+    if np is not None:
+        values = np.asarray(values, dtype=float)
+        costs = np.asarray(costs, dtype=float)
+    
+    return _violations(values, costs, k)
+
+
+def check_consistency(sources, targets, costs, values, k=10, jobs=1):
+    """Checks consistency property on arrays.
+
+    Args:
+        sources: A sequence of source state ids, one for each transition.
+        targets: A sequence of target state ids, one for each transition.
+        costs: A sequence of transition costs.
+        values: A sequence of heuristic values indexed by state id.
+        k: An integer representing the largest number of offenders reported.
+        jobs: An integer representing the number of processes to use.
+
+    Returns:
+        A CheckReport of transitions over which the heuristic value drops by
+        more than their cost, indexed by transition.
+
+    """
+    if jobs > 1:
+        return _check_parallel(check_consistency, [
+            ('q', sources), ('q', targets), ('d', costs), ('d', values)],
+            3, k, jobs)
+    
+    if np is not None:
+        values = np.asarray(values, dtype=float)
+        lhs = values[np.asarray(sources, dtype=np.int64)]
+        rhs = values[np.asarray(targets, dtype=np.int64)]
+        rhs += np.asarray(costs, dtype=float)
+    else:
+        lhs = [values[s] for s in sources]
+        rhs = [values[m] + c for m, c in zip(targets, costs)]
+    
+    return _violations(lhs, rhs, k)
+
+
+def is_optimistic(h, trans, goal, jobs=1):
     """Checks if heuristic is optimistic.
 
     Function that performs optimistic check on given heuristic function.
     Heuristic is optimistic if it never overestimates the real cost from the
     current state to the end state. Real costs are calculated using dijkstra
-    algorithm. Also prints out the check and errors if optimistic property is
-    violated.
+    algorithm. With several jobs the heuristic is evaluated and compared in
+    worker processes while dijkstra runs, see _check_graph. Also prints out
+    the check and the largest errors if optimistic property is violated.
 
     Args:
         h: Heuristic function that is being checked.
         trans: A dictionary containing list of possible transitions and their
-            costs for each key that represents the state name.
+            costs for each key that represents the state name, or a Graph.
         goal: List of goal states represented by string name of the state.
+        jobs: An integer representing the number of processes to use.
 
     Returns:
-        Boolean indicating whether the heuristic is optimistic or not.
+        A CheckReport that is True if the heuristic is optimistic.
     
     """
     print('Checking if heuristic is optimistic.')
     
-    costs = dijkstra(goal, flip_transitions(trans))
+    if not isinstance(trans, Graph):
+        trans = Graph.from_transitions(trans)
     
-    errors = []
+    states = trans.names[:trans.sources]
     
-    for s in trans:
-        hs = h(s)
-        if hs > costs[s]:
-            errors.append((s, hs, costs[s]))
+    if jobs > 1:
+        report, values, costs = _check_graph(h, trans, goal, 10, jobs)
+    else:
+        distances = dijkstra(goal, flip_transitions(trans))
+        
+        values = evaluate(h, states)
+        costs = [distances.get(s, float('inf')) for s in states]
+        
+        report = check_optimism(values, costs)
     
-    print_optimistic_check(errors)
+    print_optimistic_check(report, states, values, costs)
     
-    return not errors
+    return report
 
 
-def print_optimistic_check(errors):
+def print_optimistic_check(report, states, values, costs):
     """Prints optimistic check results.
 
     Function that prints the results of optimistic check. If heuristic is not
-    optimistic, also prints out the errors.
+    optimistic, also prints out the largest errors.
 
     Args:
-        errors: List of errors where optimistic property is violated.
+        report: A CheckReport returned by check_optimism.
+        states: A list of state names indexed by state id.
+        values: A sequence of heuristic values indexed by state id.
+        costs: A sequence of real costs indexed by state id.
     
     """
-    error_num = len(errors)
-    
-    if error_num == 0:
+    if report:
         print('Heuristic is optimistic.')
-    else:        
-        if error_num > 10:
-            print('  [ERR] {} errors, omitting output.'.format(error_num))
-        else:
-            for s, h, hs in errors:
-                print('  [ERR] h({}) > h*: {} > {}'.format(s, h, hs))
+    else:
+        for i, _ in report.offenders:
+            print('  [ERR] h({}) > h*: {} > {}'.format(states[i], values[i], costs[i]))
         
+        print('  [ERR] {} errors, worst overestimates by {}.'.format(
+            report.count, report.worst))
         print('Heuristic is not optimistic.')
 
 
-def is_consistent(h, trans):
+def is_consistent(h, trans, jobs=1):
     """Checks if heuristic is consistent.
 
     Function that performs consistency check on given heuristic function.
-    Heuristic is consistent if it changes by cost at most. Also prints out the
-    check and errors if consistency property is violated.
-    violated.
+    Heuristic is consistent if it changes by cost at most. With several jobs
+    the heuristic is evaluated and transitions are checked in worker
+    processes, see _check_graph. Also prints out the check and the largest
+    errors if consistency property is violated.
 
     Args:
         h: Heuristic function that is being checked.
         trans: A dictionary containing list of possible transitions and their
-            costs for each key that represents the state name.
+            costs for each key that represents the state name, or a Graph.
+        jobs: An integer representing the number of processes to use.
 
     Returns:
-        Boolean indicating whether the heuristic is consistent or not.
+        A CheckReport that is True if the heuristic is consistent.
     
     """
     print('Checking if heuristic is consistent.')
     
-    errors = []
+    if not isinstance(trans, Graph):
+        trans = Graph.from_transitions(trans)
     
-    for s1 in trans:
-        for s2, cost in trans[s1]:
-            h1, h2 = h(s1), h(s2)
-            if h1 > h2 + cost:
-                errors.append((s1, s2, h1, h2, cost))
+    if jobs > 1:
+        report, values, _ = _check_graph(h, trans, None, 10, jobs)
+    else:
+        values = evaluate(h, trans.names)
+        report = check_consistency(trans.edge_sources(), trans.targets,
+                                   trans.costs, values)
     
-    print_consistent_check(errors)
+    print_consistent_check(report, trans, values)
     
-    return not errors
+    return report
 
 
-def print_consistent_check(errors):
+def print_consistent_check(report, graph, values):
     """Prints consistency check results.
 
     Function that prints the results of consistency check. If heuristic is not
-    consistent, also prints out the errors.
+    consistent, also prints out the largest errors.
 
     Args:
-        errors: List of errors where consistency property is violated.
+        report: A CheckReport returned by check_consistency.
+        graph: The checked Graph.
+        values: A sequence of heuristic values indexed by state id.
     
     """
-    error_num = len(errors)
-    
-    if error_num == 0:
+    if report:
         print('Heuristic is consistent.')
-    else:        
-        if error_num > 10:
-            print('  [ERR] {} errors, omitting output.'.format(error_num))
-        else:
-            for s1, s2, h1, h2, c in errors:
-                print('  [ERR] h({}) > h({}) + c: {} > {} + {}'.format(s1, s2, h1, h2, c))
+    else:
+        names = graph.names
+        
+        for j, _ in report.offenders:
+            # transition j belongs to the last state whose transitions start before it
+            s1, s2 = bisect_right(graph.offsets, j) - 1, graph.targets[j]
+            print('  [ERR] h({}) > h({}) + c: {} > {} + {}'.format(
+                names[s1], names[s2], values[s1], values[s2], graph.costs[j]))
         
+        print('  [ERR] {} errors, worst drops by {} over cost.'.format(
+            report.count, report.worst))
         print('Heuristic is not consistent.')
-
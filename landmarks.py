@@ -0,0 +1,257 @@
+"""Landmark heuristics for any state space.
+
+Module that provides ALT heuristics, named after A*, landmarks and triangle
+inequality. A few landmark states are chosen and the costs from every landmark
+to every state and from every state to every landmark are computed once. For
+any landmark L, triangle inequality gives two lower bounds on the cost from a
+state v to a goal g:
+
+    d(L, g) - d(L, v) and d(v, L) - d(g, L)
+
+The heuristic value is the largest of these bounds over all landmarks, which
+never overestimates and is consistent, for any goal state.
+
+"""
+
+import struct
+from array import array
+
+from graph import Graph
+from search import dijkstra
+
+
+LANDMARKS = 8
+
+_MAGIC = b'ALT1'
+
+INF = float('inf')
+
+
+class Landmarks():
+    """Landmark distance tables of a state space.
+
+    Attributes:
+        names: A list of state names indexed by state id.
+        index: A dictionary mapping state names to their ids.
+        landmarks: A list of landmark state ids.
+        forward: A list of arrays, one per landmark, holding the cost from
+            the landmark to each state, or infinity if it is not reachable.
+        backward: A list of arrays, one per landmark, holding the cost from
+            each state to the landmark, or infinity if it is not reachable.
+        checksum: An integer checksum of the state space, see Graph.checksum.
+    """
+
+    def __init__(self, names, landmarks, forward, backward, checksum=0):
+        """Inits Landmarks with already computed tables."""
+        self.names = names
+        self.index = {s: i for i, s in enumerate(names)}
+        self.landmarks = landmarks
+        self.forward = forward
+        self.backward = backward
+        self.checksum = checksum
+
+    @classmethod
+    def build(cls, trans, k=LANDMARKS, start=None):
+        """Chooses landmarks and computes their distance tables.
+
+        Landmarks are chosen farthest-first: the first one is the state
+        farthest from start, every next one the state farthest from all
+        landmarks chosen so far. States that no landmark reaches count as
+        farthest, so every part of the state space gets a landmark.
+
+        Args:
+            trans: A dictionary containing list of possible transitions and
+                their costs for each key that represents the state name, or a
+                Graph.
+            k: An integer representing the number of landmarks.
+            start: String representing the name of the state the choice
+                starts from, or None for the first state.
+
+        Returns:
+            Landmarks of the state space.
+
+        """
+        graph = trans if isinstance(trans, Graph) else Graph.from_transitions(trans)
+        reverse = graph.reversed()
+        names = graph.names
+
+        k = min(k, len(names))
+
+        if start is None and names:
+            start = names[0]
+
+        closest = _distances(names, dijkstra([start], graph)) if names else []
+
+        landmarks, forward, backward = [], [], []
+
+        for _ in range(k):
+            candidates = (i for i in range(len(names)) if i not in landmarks)
+            landmark = max(candidates, key=closest.__getitem__)
+
+            landmarks.append(landmark)
+            forward.append(_distances(names, dijkstra([names[landmark]], graph)))
+            backward.append(_distances(names, dijkstra([names[landmark]], reverse)))
+
+            if len(landmarks) == 1:
+                closest = forward[-1][:]
+            else:
+                closest = array('d', map(min, closest, forward[-1]))
+
+        return cls(names, landmarks, forward, backward, graph.checksum())
+
+    def heuristic(self, goals):
+        """Returns a heuristic estimating the cost from a state to goals."""
+        return LandmarkHeuristic(self, goals, self.forward, self.backward)
+
+    def heuristic_from(self, starts):
+        """Returns a heuristic estimating the cost from starts to a state.
+
+        It is used by the backward search of bidirectional algorithms.
+
+        """
+        return LandmarkHeuristic(self, starts, self.backward, self.forward)
+
+    def write(self, f):
+        """Writes landmark tables to a binary file object."""
+        f.write(struct.pack('<4sIIQ', _MAGIC, len(self.names),
+                            len(self.landmarks), self.checksum))
+        f.write(array('q', self.landmarks).tobytes())
+
+        for table in self.forward + self.backward:
+            f.write(table.tobytes())
+
+    @classmethod
+    def read(cls, f, graph):
+        """Reads landmark tables written by write from a binary file object.
+
+        Args:
+            f: A binary file object.
+            graph: A Graph of the state space, which must be the same as when
+                the tables were written.
+
+        Raises:
+            ValueError: If the file is not a landmark file or was written for
+                a different state space.
+
+        """
+        magic, n, k, checksum = struct.unpack('<4sIIQ', f.read(20))
+
+        if magic != _MAGIC:
+            raise ValueError('Not a landmark file.')
+
+        names = graph.names
+
+        if n != len(names) or checksum != graph.checksum():
+            raise ValueError('Landmark file is for a different state space.')
+
+        landmarks = array('q')
+        landmarks.frombytes(f.read(8 * k))
+
+        tables = []
+        for _ in range(2 * k):
+            table = array('d')
+            table.frombytes(f.read(8 * n))
+            tables.append(table)
+
+        return cls(names, list(landmarks), tables[:k], tables[k:], checksum)
+
+
+class LandmarkHeuristic():
+    """Landmark heuristic for a set of target states.
+
+    Estimates the cost from a state v to the closest target t as the largest
+    of first[L][t] - first[L][v] and second[L][v] - second[L][t] over all
+    landmarks L. With forward and backward tables as first and second it
+    estimates the cost from v to targets, swapped it estimates the cost from
+    targets to v. States that are not in the tables get value 0.
+
+    Attributes:
+        index: A dictionary mapping state names to their ids.
+        first: A list of distance tables, one per landmark.
+        second: A list of distance tables, one per landmark.
+        targets: A list with a list of (first, second) table values for each
+            target state, one pair per landmark.
+    """
+
+    def __init__(self, landmarks, targets, first, second):
+        """Inits LandmarkHeuristic with Landmarks and target state names."""
+        self.index = landmarks.index
+        self.first = first
+        self.second = second
+
+        ids = [self.index[t] for t in targets if t in self.index]
+        self.targets = [[(f[t], s[t]) for f, s in zip(first, second)]
+                        for t in ids]
+
+    def __call__(self, state):
+        """Returns the heuristic value of a state."""
+        i = self.index.get(state)
+
+        if i is None or not self.targets:
+            return 0.
+
+        values = [(f[i], s[i]) for f, s in zip(self.first, self.second)]
+
+        best = INF
+
+        for target in self.targets:
+            h = 0.
+
+            # Differences of two infinities are NaN and never count.
+            for (fv, sv), (ft, st) in zip(values, target):
+                if ft - fv > h:
+                    h = ft - fv
+                if sv - st > h:
+                    h = sv - st
+
+            if h < best:
+                best = h
+
+        return best
+
+    def batch(self, states):
+        """Returns a list of heuristic values of given states."""
+        return [self(s) for s in states]
+
+
+def _distances(names, costs):
+    """Returns an array of costs from a dijkstra result indexed by state id."""
+    return array('d', [costs.get(s, INF) for s in names])
+
+
+def landmarks(trans, fname=None, k=LANDMARKS, start=None):
+    """Landmark tables of a state space
+
+    Function that returns landmark tables of a state space, from which
+    heuristics for any goal states are made. If a file is given, tables are
+    loaded from it when it exists and was written for the same state space,
+    and saved to it after they are built otherwise.
+
+    Args:
+        trans: A dictionary containing list of possible transitions and their
+            costs for each key that represents the state name, or a Graph.
+        fname: String representing path to a landmark file, or None.
+        k: An integer representing the number of landmarks.
+        start: String representing the name of the state landmark choice
+            starts from, or None.
+
+    Returns:
+        Landmarks of the state space.
+
+    """
+    graph = trans if isinstance(trans, Graph) else Graph.from_transitions(trans)
+
+    if fname:
+        try:
+            with open(fname, 'rb') as f:
+                return Landmarks.read(f, graph)
+        except (FileNotFoundError, ValueError, struct.error):
+            pass
+
+    result = Landmarks.build(graph, k, start)
+
+    if fname:
+        with open(fname, 'wb') as f:
+            result.write(f)
+
+    return result
@@ -13,62 +13,219 @@ def main():
     
     """
     from argparse import ArgumentParser
-    from data_loader import get_state_space, get_heuristic
-    from search import BFS, UCS, DFS, lDFS, IDS, GBFS, HCS, AStar
+    from data_loader import get_state_space, get_heuristic, get_grid_map, print_state_space
+    from successors import SlidingPuzzle, GridMap
+    from search import BFS, UCS, DFS, lDFS, IDS, GBFS, HCS, AStar, ARAStar, JPS, IDAStar, bibfs, biastar, PRINT, print_search_stats
+    from parallel_search import HDAStar
+    from external_search import ExternalBFS
     from heuristic_check import is_optimistic, is_consistent
     from puzzle_heuristic import manhattan_distance
+    from grid_heuristic import octile_distance
+    from pattern_database import pattern_database
+    from landmarks import landmarks
+    from contraction import CH, contraction_hierarchy
+    from result_cache import ResultCache, query_key, source_digest
+    from heuristic import Memoized
+    from batch import BatchSolver, run_batch
+    from portfolio import portfolio, CRITERIA
+    
+    algorithms = ['bfs', 'ebfs', 'ucs', 'dfs', 'ldfs', 'ids', 'gbfs', 'hcs', 'astar', 'arastar', 'hdastar', 'jps', 'idastar', 'bibfs', 'biastar', 'ch']
     
     parser = ArgumentParser('run specified search algorithm on a given state space')
-    parser.add_argument('ss', type=str, help='path to a state space to use')
-    parser.add_argument('-a', '--algorithm', type=str, choices= ['bfs', 'ucs', 'dfs', 'ldfs', 'ids', 'gbfs', 'hcs', 'astar'], help='state space search algoritm to use')
+    parser.add_argument('ss', type=str, help='path to a state space to use, or a start state with --puzzle')
+    parser.add_argument('-a', '--algorithm', type=str, choices=algorithms, help='state space search algoritm to use')
     parser.add_argument('-d', '--depth', type=int, help='maximum depth for the limited DFS')
-    parser.add_argument('-e', '--heuristic', type=str, help='heuristic to use: [path, \'l1\']')
+    parser.add_argument('-e', '--heuristic', type=str, help='heuristic to use: [path, \'l1\', \'octile\', \'pdb\', \'pdb:<path>\', \'alt\', \'alt:<path>\']')
+    parser.add_argument('-w', '--weight', type=float, default=3., help='initial heuristic weight of arastar')
+    parser.add_argument('--step', type=float, default=0.5, help='how much arastar lowers the weight after each found path')
+    parser.add_argument('--time-limit', type=float, help='seconds after which arastar returns the best path found so far')
+    parser.add_argument('--expansions', type=int, help='expanded states after which arastar returns the best path found so far')
+    parser.add_argument('--buffer', type=int, default=100000, help='successors ebfs keeps in memory before writing them to disk')
+    parser.add_argument('--locality', type=int, help='last layers ebfs checks for duplicates, 2 if transitions can be reversed, all by default')
     parser.add_argument('-c', '--check', action='store_true', help="run checks on heuristic")
+    parser.add_argument('--portfolio', type=str, help='comma separated algorithms run at the same time, the first acceptable result wins, see portfolio.py')
+    parser.add_argument('--criterion', type=str, choices=CRITERIA, default='any', help='result accepted from a portfolio: any path or an optimal one')
+    parser.add_argument('-b', '--batch', type=str, help='answer JSON line queries from a file, or - for stdin, see batch.py')
+    parser.add_argument('-j', '--jobs', type=int, default=1, help='number of processes used by heuristic checks, batch queries and hdastar')
+    parser.add_argument('--compact', action='store_true', help='store state space as a compact integer graph')
+    parser.add_argument('--no-cache', action='store_true', help='do not use binary snapshots of loaded files')
+    parser.add_argument('-q', '--queue', type=str, choices=['heap', 'bucket'], help='priority queue for ucs and astar, selected from costs by default')
+    parser.add_argument('-m', '--memoize', type=int, help='remember heuristic values of given number of recently seen states')
+    parser.add_argument('-r', '--result-cache', type=str, help='directory where search results are kept and reused')
+    parser.add_argument('-s', '--stats', action='store_true', help='print performance counters and phase times of the search')
+    parser.add_argument('--silent', action='store_true', help='do not print search output')
+    parser.add_argument('-p', '--puzzle', action='store_true', help='treat ss as a start state of a generated sliding puzzle')
+    parser.add_argument('-g', '--grid', action='store_true', help='treat ss as a path to a grid map, see data_loader.get_grid_map')
 
     args = parser.parse_args()
     
-    s0, transitions, goal = get_state_space(args.ss)
+    if args.portfolio:
+        for a in args.portfolio.split(','):
+            if a not in algorithms or a == 'hdastar':
+                parser.error('invalid portfolio algorithm {}'.format(a))
+    
+    if args.batch:
+        run_batch(args.batch, args.jobs, ss=args.ss, puzzle=args.puzzle,
+                  grid=args.grid, compact=args.compact, algorithm=args.algorithm,
+                  depth=args.depth, heuristic=args.heuristic,
+                  queue=args.queue, memoize=args.memoize,
+                  cache=not args.no_cache, results=args.result_cache)
+        return
+    
+    if args.puzzle:
+        transitions = SlidingPuzzle.from_state(args.ss)
+        s0, goal = args.ss, {transitions.goal()}
+        print_state_space(s0, goal, transitions.states(), transitions.transitions())
+        
+        if not transitions.solvable(s0):
+            print('Goal state is not reachable from the start state.')
+            return
+    elif args.grid:
+        s0, transitions, goal = get_grid_map(args.ss)
+    else:
+        s0, transitions, goal = get_state_space(args.ss, args.compact, not args.no_cache)
+    
+    if args.portfolio:
+        solver = BatchSolver(s0, transitions, goal, depth=args.depth,
+                             heuristic=args.heuristic, queue=args.queue,
+                             memoize=args.memoize, cache=not args.no_cache)
+        solver.heuristic(goal)
+        
+        search = lambda algorithm, **kwargs: solver.search(algorithm, s0, goal, args.depth, **kwargs)
+        result, winner = portfolio(search, args.portfolio.split(','), goal, args.criterion, None if args.silent else PRINT)
+        
+        if args.silent:
+            print('Winner: {}'.format(winner))
+        
+        if result is not None and args.stats:
+            print_search_stats(result)
+        
+        return
     
     heuristic = None
+    heuristic_back = None
     if args.heuristic:
         if args.heuristic == 'l1':
             heuristic = manhattan_distance(goal)
+            heuristic_back = manhattan_distance([s0])
+        elif args.heuristic == 'octile':
+            diagonal = transitions.diagonal if args.grid else True
+            heuristic = octile_distance(goal, diagonal)
+            heuristic_back = octile_distance([s0], diagonal)
+        elif args.heuristic == 'pdb' or args.heuristic.startswith('pdb:'):
+            heuristic = pattern_database(goal, args.heuristic[4:] or None)
+        elif args.heuristic == 'alt' or args.heuristic.startswith('alt:'):
+            if args.puzzle or args.grid:
+                print('Landmark heuristics need a state space loaded from a file.')
+            else:
+                tables = landmarks(transitions, args.heuristic[4:] or None, start=s0)
+                heuristic = tables.heuristic(goal)
+                heuristic_back = tables.heuristic_from([s0])
+        else:
+            heuristic = get_heuristic(args.heuristic, not args.no_cache)
+        
+        if heuristic and args.memoize:
+            heuristic = Memoized(heuristic, args.memoize)
+    
+    results = None
+    if args.result_cache:
+        results = ResultCache(directory=args.result_cache)
+        key = query_key('puzzle' if args.puzzle else source_digest(args.ss),
+                        source_digest(args.heuristic), args.algorithm, s0,
+                        sorted(goal), args.depth, args.queue, args.compact)
+    
+    def run(search, *search_args):
+        """Runs a search, or replays its result if it is cached."""
+        reporter = None if args.silent else PRINT
+        
+        if results is None:
+            result = search(*search_args, reporter=reporter, counters=args.stats)
         else:
-            heuristic = get_heuristic(args.heuristic)
+            result = results.search(key, search, *search_args, reporter=reporter, counters=args.stats)
+        
+        if args.stats:
+            print_search_stats(result)
+        
+        return result
+    
+    def ch(s0, transitions, goal, reporter=None, counters=True):
+        """Runs a contraction hierarchy query, building it only if needed."""
+        hierarchy = contraction_hierarchy(transitions, None if args.no_cache else args.ss + '.ch')
+        return CH(s0, transitions, goal, hierarchy, reporter, counters)
     
     if args.algorithm:
         if args.algorithm == 'bfs':
-            BFS(s0, transitions, goal)
+            run(BFS, s0, transitions, goal)
+        elif args.algorithm == 'ebfs':
+            if results is not None:
+                key = query_key(key, args.buffer, args.locality)
+            run(ExternalBFS, s0, transitions, goal, None, args.buffer, args.locality)
         elif args.algorithm == 'ucs':
-            UCS(s0, transitions, goal)
+            run(UCS, s0, transitions, goal, args.queue)
         elif args.algorithm == 'dfs':
-            DFS(s0, transitions, goal)
+            run(DFS, s0, transitions, goal)
         elif args.algorithm == 'ldfs':
             if args.depth:
-                lDFS(s0, transitions, goal, args.depth)
+                run(lDFS, s0, transitions, goal, args.depth)
             else:
                 print('Maximum depth not provided.')
         elif args.algorithm == 'ids':
-            IDS(s0, transitions, goal)
+            run(IDS, s0, transitions, goal)
+        elif args.algorithm == 'bibfs':
+            run(bibfs, s0, transitions, goal)
+        elif args.algorithm == 'jps':
+            grid = transitions if args.grid else GridMap.from_transitions(transitions)
+            if grid is None:
+                print('Jump point search needs a grid map.')
+            else:
+                run(JPS, s0, grid, goal, heuristic, args.queue)
+        elif args.algorithm == 'ch':
+            if args.puzzle or args.grid:
+                print('Contraction hierarchies need a state space loaded from a file.')
+            else:
+                run(ch, s0, transitions, goal)
         elif heuristic:
             if args.algorithm == 'gbfs':
-                GBFS(s0, transitions, goal, heuristic)
+                run(GBFS, s0, transitions, goal, heuristic)
             elif args.algorithm == 'hcs':
-                HCS(s0, transitions, heuristic)
+                run(HCS, s0, transitions, heuristic)
             elif args.algorithm == 'astar':
-                AStar(s0, transitions, goal, heuristic)
+                run(AStar, s0, transitions, goal, heuristic, args.queue)
+            elif args.algorithm == 'arastar':
+                if results is not None:
+                    # paths found within a time limit depend on the machine
+                    results = None if args.time_limit else results
+                    key = query_key(key, args.weight, args.step, args.expansions)
+                run(ARAStar, s0, transitions, goal, heuristic, args.weight, args.step, args.time_limit, args.expansions)
+            elif args.algorithm == 'hdastar':
+                run(HDAStar, s0, transitions, goal, heuristic, args.jobs, args.queue)
+            elif args.algorithm == 'idastar':
+                run(IDAStar, s0, transitions, goal, heuristic)
+            elif args.algorithm == 'biastar':
+                run(biastar, s0, transitions, goal, heuristic, heuristic_back, args.queue)
             else:
                 print('Invalid algorithm.')
         else:
             print('No heuristic provided.')
     
     if args.check:
-        if heuristic:
+        if args.puzzle:
+            print('Heuristic checks need a state space loaded from a file.')
+        elif heuristic:
+            if args.grid:
+                transitions = transitions.to_transitions()
+            
             print('Checking heuristic')
-            is_optimistic(heuristic, transitions, goal)
-            is_consistent(heuristic, transitions)
+            is_optimistic(heuristic, transitions, goal, args.jobs)
+            is_consistent(heuristic, transitions, args.jobs)
         else:
             print('No heuristic provided.')
+    
+    if isinstance(heuristic, Memoized):
+        heuristic.print_stats()
+    
+    if results is not None:
+        results.print_stats()
 
 
 # run if program is called as main program
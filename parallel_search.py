@@ -0,0 +1,313 @@
+"""Parallel path-finding algorithms.
+
+A module that provides a hash distributed A* search (HDA*), which runs A*
+in several worker processes. Every state is owned by one worker, chosen by a
+hash of the state, and only its owner keeps it on an open list and expands
+it. Successors owned by other workers are sent to them in batches.
+
+"""
+
+import zlib
+from multiprocessing import get_context, get_all_start_methods
+from queue import Empty
+from time import sleep
+
+from util import priority_queue
+from heuristic import CountingHeuristic
+from search import SearchResult, _intern, _names
+
+
+POLL_EXPANSIONS = 64
+PROBE_INTERVAL = 0.001
+
+
+def owner(s, workers):
+    """Returns index of the worker that owns state s.
+
+    State ids of a Graph are spread by their value, state names by their
+    CRC, which unlike hash does not change between processes.
+
+    """
+    if isinstance(s, int):
+        return s % workers
+
+    return zlib.crc32(s.encode()) % workers
+
+
+def HDAStar(s0, trans, goal, h, workers=2, queue=None, reporter=None,
+            counters=True):
+    """Performs a hash distributed A* search.
+
+    Performs an A* search starting from state s0 and trying to reach goal
+    state, if it exists, in a number of worker processes. Each worker keeps
+    open list and costs of the states it owns and sends generated successors
+    to their owners in batches. A worker that expands a goal state reports
+    its cost, which is then sent to all workers as a bound, and states whose
+    estimate is not lower than the bound are not expanded.
+
+    The search ends when every worker has nothing left to expand below the
+    bound and no batch is on its way. This is detected by waves of probes:
+    each worker answers whether it is idle together with the numbers of
+    batches it has sent and received, and two consecutive waves with all
+    workers idle, equal answers and as many batches received as sent prove
+    it. The bound is then the cost of an optimal path if the heuristic is
+    admissible. Search also reports the results to reporter.
+
+    Args:
+        s0: String representing the name of the starting state.
+        trans: A dictionary containing list of possible transitions and their
+            costs for each key that represents the state name, a Graph or a
+            SuccessorProvider.
+        goal: A list of goal state names.
+        h: Heuristic function that is admissible for the goal states.
+        workers: An integer representing the number of worker processes.
+        queue: String 'heap' or 'bucket' selecting the priority queue, or
+            None to select it from the costs and the heuristic, see
+            util.priority_queue.
+        reporter: A Reporter that receives the search output, such as PRINT,
+            or None to discard it.
+        counters: A boolean indicating whether counters are collected.
+
+    Returns:
+        A SearchResult with the path from s0 to one of the goal states, or
+        with path None if the path is not found. Its counters are summed
+        over all workers, its frontier is the sum of the largest open lists.
+
+    """
+    result, reporter = SearchResult.start('hdastar', reporter, counters)
+
+    # fork shares the loaded state space with workers instead of pickling it
+    context = get_context('fork' if 'fork' in get_all_start_methods() else None)
+
+    inboxes = [context.Queue() for _ in range(workers)]
+    results = context.Queue()
+
+    processes = [context.Process(target=_worker, daemon=True, args=(
+        i, workers, s0, trans, goal, h, queue, counters, inboxes, results))
+        for i in range(workers)]
+
+    for p in processes:
+        p.start()
+
+    result.phase('setup')
+
+    try:
+        get = lambda: _get(results, processes)
+        
+        cost, found = _coordinate(workers, inboxes, get)
+
+        path = None
+        if found is not None:
+            path = [found]
+
+            while True:
+                inboxes[owner(path[-1], workers)].put(('parent', path[-1]))
+                p = _receive(get, 'parent')[1]
+
+                if p is None:
+                    break
+
+                path.append(p)
+
+            path = _names(trans, path[::-1])
+
+        for inbox in inboxes:
+            inbox.put(('stop',))
+
+        stats = [_receive(get, 'stats')[1:] for _ in range(workers)]
+    finally:
+        for p in processes:
+            p.join(1)
+            if p.is_alive():
+                p.terminate()
+
+    expanded, generated, reopened, frontier, calls = map(sum, zip(*stats))
+
+    result.finish(reporter, path, expanded, cost if path else None, generated,
+                  frontier, reopened)
+
+    if counters:
+        result.heuristic_calls = calls
+
+    return result
+
+
+def _get(results, processes):
+    """Returns the next message from results.
+
+    Raises:
+        RuntimeError: If a worker process has died.
+
+    """
+    while True:
+        try:
+            return results.get(timeout=1)
+        except Empty:
+            if not all(p.is_alive() for p in processes):
+                raise RuntimeError('A search worker process has died.')
+
+
+def _receive(get, kind):
+    """Returns the next message of given kind returned by get, dropping
+    answers of probes that are no longer needed."""
+    while True:
+        msg = get()
+
+        if msg[0] == kind:
+            return msg
+
+
+def _coordinate(workers, inboxes, get):
+    """Forwards found costs to workers and detects the end of the search.
+
+    Returns:
+        A tuple (cost, goal) of the cheapest found path, or (inf, None) if no
+        path was found. Goal is the state where the path ends.
+
+    """
+    best, found = float('inf'), None
+    wave, answers, previous = 0, {}, None
+
+    for inbox in inboxes:
+        inbox.put(('probe', wave))
+
+    while True:
+        msg = get()
+
+        if msg[0] == 'solution':
+            _, cost, s = msg
+
+            if cost < best:
+                best, found = cost, s
+
+                for inbox in inboxes:
+                    inbox.put(('bound', best))
+        elif msg[0] == 'status' and msg[2] == wave:
+            answers[msg[1]] = msg[3:]
+
+            if len(answers) < workers:
+                continue
+
+            current = [answers[i] for i in range(workers)]
+            idle = all(a[0] for a in current)
+            balanced = sum(a[1] for a in current) == sum(a[2] for a in current)
+
+            if idle and balanced and current == previous:
+                return best, found
+
+            previous = current if idle and balanced else None
+
+            if not idle:
+                sleep(PROBE_INTERVAL)
+
+            wave, answers = wave + 1, {}
+
+            for inbox in inboxes:
+                inbox.put(('probe', wave))
+
+
+def _worker(i, workers, s0, trans, goal, h, queue, counters, inboxes, results):
+    """Runs the part of a hash distributed A* search owned by worker i.
+
+    Expands states from its open list and answers messages from its inbox:
+    batches of (state, cost, parent) successors, bounds, probes, questions
+    for the parent of a state and the final stop.
+
+    """
+    open = priority_queue(trans, queue, h)
+
+    if counters:
+        h = CountingHeuristic(h)
+
+    counted = h
+    s0, goal, h = _intern(s0, trans, goal, h)
+
+    inbox = inboxes[i]
+    costs, parents, hs, closed = {}, {}, {}, set()
+    buffers = [[] for _ in range(workers)]
+
+    bound = float('inf')
+    sent = received = expanded = generated = reopened = 0
+
+    def relax(m, cm, p):
+        """Records a cheaper way to state m through p and opens m."""
+        nonlocal reopened
+
+        if cm >= costs.get(m, bound):
+            return
+
+        hm = hs.get(m)
+        if hm is None:
+            hm = hs[m] = h(m)
+
+        if cm + hm >= bound:
+            return
+
+        costs[m] = cm
+        parents[m] = p
+        open.push(m, cm + hm)
+
+        if m in closed:
+            closed.discard(m)
+            reopened += 1
+
+    if owner(s0, workers) == i:
+        relax(s0, 0., None)
+
+    while True:
+        for _ in range(POLL_EXPANSIONS):
+            if not open or open.peek()[1] >= bound:
+                break
+
+            s, _ = open.pop()
+            cs = costs[s]
+
+            closed.add(s)
+            expanded += 1
+
+            if s in goal:
+                bound = cs
+                results.put(('solution', cs, s))
+                continue
+
+            for m, c in trans.get(s, []):
+                generated += 1
+                j = owner(m, workers)
+
+                if j == i:
+                    relax(m, cs + c, s)
+                else:
+                    buffers[j].append((m, cs + c, s))
+
+        for j, buffer in enumerate(buffers):
+            if buffer:
+                inboxes[j].put(('nodes', buffer))
+                buffers[j] = []
+                sent += 1
+
+        block = not open or open.peek()[1] >= bound
+
+        while True:
+            try:
+                msg = inbox.get(block)
+            except Empty:
+                break
+
+            block = False
+            kind = msg[0]
+
+            if kind == 'nodes':
+                received += 1
+                for m, cm, p in msg[1]:
+                    relax(m, cm, p)
+            elif kind == 'bound':
+                bound = min(bound, msg[1])
+            elif kind == 'probe':
+                idle = not open or open.peek()[1] >= bound
+                results.put(('status', i, msg[1], idle, sent, received))
+            elif kind == 'parent':
+                results.put(('parent', parents.get(msg[1])))
+            elif kind == 'stop':
+                results.put(('stats', expanded, generated, reopened,
+                             open.peak, counted.calls if counters else 0))
+                return
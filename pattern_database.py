@@ -0,0 +1,299 @@
+"""Pattern database heuristics for sliding puzzles.
+
+Module that provides additive pattern database heuristics for N x N sliding
+puzzles in the 123_456_78x state notation. A pattern database stores, for
+every placement of a subset of tiles, the number of moves of those tiles
+needed to bring them to their goal cells. Databases of disjoint subsets can
+be added together and still never overestimate the real cost.
+
+"""
+
+import struct
+from collections import deque
+from math import ceil
+
+
+BLANK = 'x'
+MAX_PATTERN_SIZE = 5
+
+_MAGIC = b'PDB1'
+
+
+def permutations(n, k):
+    """Returns the number of ordered placements of k tiles into n cells."""
+    result = 1
+
+    for i in range(k):
+        result *= n - i
+
+    return result
+
+
+def rank(positions, n):
+    """Ranks an ordered placement of tiles.
+
+    Perfect ranking of partial permutations: every placement of
+    len(positions) distinct tiles into n cells gets a distinct integer in
+    range(permutations(n, len(positions))).
+
+    Args:
+        positions: A sequence of distinct cell indices of the tiles.
+        n: An integer representing the number of cells.
+
+    Returns:
+        An integer rank of the placement.
+
+    """
+    r = 0
+    used = 0
+
+    for i, p in enumerate(positions):
+        r = r * (n - i) + p - bin(used & ((1 << p) - 1)).count('1')
+        used |= 1 << p
+
+    return r
+
+
+def default_patterns(goal):
+    """Splits tiles of a goal state into disjoint patterns.
+
+    Tiles are taken in the order they appear in the goal state and split into
+    as few patterns as possible, each with at most MAX_PATTERN_SIZE tiles and
+    with sizes differing by at most one.
+
+    """
+    tiles = [t for t in goal if t not in ('_', BLANK)]
+    parts = ceil(len(tiles) / MAX_PATTERN_SIZE)
+
+    return [''.join(tiles[len(tiles) * i // parts:len(tiles) * (i + 1) // parts])
+            for i in range(parts)]
+
+
+class PatternDatabase():
+    """Additive pattern database heuristic for one goal state.
+
+    Attributes:
+        goal: A string representing the goal state.
+        n: An integer representing the number of rows and columns.
+        patterns: A list of strings, each containing tiles of one pattern.
+        tables: A list of bytearrays, one per pattern, holding the number of
+            moves of pattern tiles indexed by rank of their cells.
+    """
+
+    def __init__(self, goal, patterns, tables):
+        """Inits PatternDatabase with already built tables."""
+        self.goal = goal
+        self.n = goal.count('_') + 1
+        self.patterns = patterns
+        self.tables = tables
+
+    @classmethod
+    def build(cls, goal, patterns=None):
+        """Builds pattern database for a goal state.
+
+        Args:
+            goal: A string representing the goal state.
+            patterns: A list of strings with disjoint sets of tiles, or None
+                to use default_patterns.
+
+        Returns:
+            A PatternDatabase with one table per pattern.
+
+        """
+        if patterns is None:
+            patterns = default_patterns(goal)
+
+        return cls(goal, patterns, [build_table(goal, p) for p in patterns])
+
+    def __call__(self, state):
+        """Returns the heuristic value of a state."""
+        cells = state.replace('_', '')
+        cells_n = len(cells)
+        h = 0
+
+        for pattern, table in zip(self.patterns, self.tables):
+            h += table[rank([cells.index(t) for t in pattern], cells_n)]
+
+        return h
+
+    def batch(self, states):
+        """Returns a list of heuristic values of given states."""
+        return [self(s) for s in states]
+
+    def write(self, f):
+        """Writes the database to a binary file object."""
+        goal = self.goal.encode()
+        f.write(struct.pack('<II', len(goal), len(self.patterns)))
+        f.write(goal)
+
+        for pattern, table in zip(self.patterns, self.tables):
+            pattern = pattern.encode()
+            f.write(struct.pack('<IQ', len(pattern), len(table)))
+            f.write(pattern)
+            f.write(table)
+
+    @classmethod
+    def read(cls, f):
+        """Reads a database written by write from a binary file object."""
+        goal_len, count = struct.unpack('<II', f.read(8))
+        goal = f.read(goal_len).decode()
+
+        patterns, tables = [], []
+
+        for _ in range(count):
+            pattern_len, table_len = struct.unpack('<IQ', f.read(12))
+            patterns.append(f.read(pattern_len).decode())
+            tables.append(bytearray(f.read(table_len)))
+
+        return cls(goal, patterns, tables)
+
+
+def build_table(goal, pattern):
+    """Builds a pattern database table by breadth-first search from the goal.
+
+    Abstract states are placements of pattern tiles together with the region
+    of free cells the blank is in, identified by the lowest cell of the
+    region. Moving the blank inside its region costs nothing, so every
+    abstract move is a move of a pattern tile into an adjacent free cell of
+    the blank's region and costs 1.
+
+    Args:
+        goal: A string representing the goal state.
+        pattern: A string with tiles of the pattern.
+
+    Returns:
+        A bytearray holding, for each rank of pattern tile cells, the lowest
+        number of pattern tile moves needed to reach the goal.
+
+    """
+    cells = goal.replace('_', '')
+    n = goal.count('_') + 1
+    size = n * n
+    k = len(pattern)
+
+    neighbors = []
+    for c in range(size):
+        r, col = divmod(c, n)
+        neighbors.append([c + d for d, ok in ((-n, r > 0), (n, r < n - 1),
+                                                (-1, col > 0),
+                                                (1, col < n - 1)) if ok])
+
+    regions = {}
+
+    def region_labels(occupied):
+        """Labels each free cell with the lowest cell of its region."""
+        labels = regions.get(occupied)
+
+        if labels is None:
+            labels = [-1] * size
+
+            for c in range(size):
+                if labels[c] >= 0 or occupied >> c & 1:
+                    continue
+
+                labels[c] = c
+                stack = [c]
+                while stack:
+                    for m in neighbors[stack.pop()]:
+                        if labels[m] < 0 and not occupied >> m & 1:
+                            labels[m] = c
+                            stack.append(m)
+
+            regions[occupied] = labels
+
+        return labels
+
+    table = bytearray(b'\xff') * permutations(size, k)
+    seen = bytearray(len(table) * size)
+
+    start = tuple(cells.index(t) for t in pattern)
+    occupied = sum(1 << p for p in start)
+    blank = region_labels(occupied)[cells.index(BLANK)]
+
+    seen[rank(start, size) * size + blank] = 1
+    open = deque([(start, occupied, blank, 0)])
+
+    while open:
+        positions, occupied, blank, d = open.popleft()
+
+        r = rank(positions, size)
+        if table[r] > d:
+            table[r] = d
+
+        labels = region_labels(occupied)
+
+        for i, p in enumerate(positions):
+            for q in neighbors[p]:
+                if labels[q] != blank:
+                    continue
+
+                moved = positions[:i] + (q,) + positions[i + 1:]
+                moved_occupied = occupied ^ (1 << p) ^ (1 << q)
+                moved_blank = region_labels(moved_occupied)[p]
+
+                key = rank(moved, size) * size + moved_blank
+                if not seen[key]:
+                    seen[key] = 1
+                    open.append((moved, moved_occupied, moved_blank, d + 1))
+
+    return table
+
+
+def save_pattern_databases(fname, databases):
+    """Saves a list of pattern databases to a file."""
+    with open(fname, 'wb') as f:
+        f.write(_MAGIC)
+        f.write(struct.pack('<I', len(databases)))
+
+        for db in databases:
+            db.write(f)
+
+
+def load_pattern_databases(fname):
+    """Loads a list of pattern databases from a file."""
+    with open(fname, 'rb') as f:
+        if f.read(len(_MAGIC)) != _MAGIC:
+            raise ValueError('{} is not a pattern database file.'.format(fname))
+
+        count, = struct.unpack('<I', f.read(4))
+
+        return [PatternDatabase.read(f) for _ in range(count)]
+
+
+def pattern_database(goals, fname=None, patterns=None):
+    """Pattern database heuristic
+
+    Function that returns a function that gives additive pattern database
+    heuristic value for each given state. If a file is given, databases are
+    loaded from it when it exists and saved to it after they are built
+    otherwise.
+
+    Args:
+        goals: List of goal states represented by string name of the state.
+        fname: String representing path to a pattern database file, or None.
+        patterns: A list of strings with disjoint sets of tiles, or None to
+            use default_patterns.
+
+    Returns:
+        Returns a function that gives pattern database heuristic value for
+        each given state, the lowest over all goal states.
+
+    """
+    databases = None
+
+    if fname:
+        try:
+            databases = load_pattern_databases(fname)
+        except FileNotFoundError:
+            pass
+
+    if databases is None or {db.goal for db in databases} != set(goals):
+        databases = [PatternDatabase.build(g, patterns) for g in goals]
+
+        if fname:
+            save_pattern_databases(fname, databases)
+
+    if len(databases) == 1:
+        return databases[0]
+
+    return lambda state: min(db(state) for db in databases)
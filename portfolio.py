@@ -0,0 +1,139 @@
+"""Algorithm portfolio runner.
+
+A module that runs several search algorithms on the same state space at the
+same time, each in its own process, and returns the first result that meets
+a chosen criterion. Remaining searches are cancelled as soon as the result
+is known, so the running time is that of the fastest suitable algorithm.
+
+"""
+
+from multiprocessing import get_context, get_all_start_methods
+from time import perf_counter
+
+from search import SearchResult, SILENT
+
+
+# algorithms whose path is optimal if the heuristic is admissible
+OPTIMAL = ('ucs', 'astar', 'arastar', 'jps', 'idastar', 'biastar', 'ch')
+
+# algorithms that do not find a path only if there is none
+COMPLETE = ('bfs', 'ebfs', 'ucs', 'dfs', 'gbfs', 'astar', 'arastar', 'jps',
+            'bibfs', 'biastar', 'ch')
+
+CRITERIA = ('any', 'optimal')
+
+
+def accepts(criterion, algorithm, result, goal):
+    """Returns whether a result of algorithm meets criterion.
+
+    A path meets criterion 'any' if it ends in a goal state and criterion
+    'optimal' if it was also found by an algorithm in OPTIMAL. No path meets
+    both criteria if the algorithm is in COMPLETE, because then there is no
+    path at all.
+
+    """
+    if not result.path:
+        return algorithm in COMPLETE
+
+    if result.path[-1] not in goal:
+        return False
+
+    return criterion == 'any' or algorithm in OPTIMAL
+
+
+def portfolio(search, algorithms, goal, criterion='any', reporter=None):
+    """Runs search algorithms in parallel and returns the first good result.
+
+    Every algorithm is run in its own process by calling search. Processes
+    are forked, so state space and heuristics loaded before the call are
+    shared with them. When a result meets criterion, other processes are
+    terminated.
+
+    Args:
+        search: A function that takes an algorithm name as in main.py -a and
+            keyword arguments reporter and counters, runs the algorithm and
+            returns its SearchResult, like batch.BatchSolver.search with
+            fixed start and goals.
+        algorithms: A list of algorithm names.
+        goal: A list of goal state names.
+        criterion: String 'any' to accept any path to a goal state or
+            'optimal' to accept only paths of algorithms in OPTIMAL.
+        reporter: A Reporter that receives the search output, such as PRINT,
+            or None to discard it.
+
+    Returns:
+        A tuple (result, winner) where result is the accepted SearchResult
+        and winner is the name of the algorithm that found it, which is also
+        kept in metrics of the result, or (None, None) if no algorithm gave
+        an acceptable result.
+
+    Raises:
+        ValueError: If the criterion is unknown or no algorithm can meet it.
+
+    """
+    if criterion not in CRITERIA:
+        raise ValueError('Unknown criterion {}.'.format(criterion))
+
+    if criterion == 'optimal' and not set(algorithms) & set(OPTIMAL):
+        raise ValueError('None of the algorithms finds optimal paths.')
+
+    reporter = reporter or SILENT
+    reporter.start('portfolio of {}'.format(', '.join(algorithms)))
+
+    goal = set(goal)
+    begin = perf_counter()
+
+    context = get_context('fork' if 'fork' in get_all_start_methods() else None)
+    results = context.Queue()
+
+    processes = [context.Process(target=_run, daemon=True,
+                                 args=(search, algorithm, results))
+                 for algorithm in algorithms]
+
+    for p in processes:
+        p.start()
+
+    try:
+        for _ in processes:
+            algorithm, d, error = results.get()
+
+            if error is not None:
+                reporter.info('  {} failed: {}'.format(algorithm, error))
+                continue
+
+            result = SearchResult.from_dict(d)
+            elapsed = perf_counter() - begin
+
+            if not accepts(criterion, algorithm, result, goal):
+                reporter.info('  {} finished after {:.3f} s without an '
+                              'acceptable path'.format(algorithm, elapsed))
+                continue
+
+            result.metrics['winner'] = algorithm
+            reporter.info('Winner: {} after {:.3f} s'.format(algorithm,
+                                                            elapsed))
+
+            if result.path is None:
+                reporter.not_found()
+            else:
+                reporter.found(result.path, result.expanded, result.cost)
+
+            return result, algorithm
+    finally:
+        for p in processes:
+            if p.is_alive():
+                p.terminate()
+            p.join()
+
+    reporter.info('No algorithm gave an acceptable result.')
+
+    return None, None
+
+
+def _run(search, algorithm, results):
+    """Runs one algorithm of a portfolio in a worker process."""
+    try:
+        result = search(algorithm, reporter=None, counters=True)
+        results.put((algorithm, result.to_dict(), None))
+    except Exception as e:
+        results.put((algorithm, None, str(e)))
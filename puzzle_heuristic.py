@@ -1,55 +1,120 @@
-"""8-puzzle heuristic functions.
-    
-Module that provides heuristic functions for 8-puzzle that are based on
-specific states and calculated, not loaded from files.
-Currently, only one heuristic is implemented.
-    
+"""Sliding puzzle heuristic functions.
+
+Module that provides heuristic functions for N x N sliding puzzles that are
+based on specific states and calculated, not loaded from files.
+Currently, only one heuristic is implemented, pattern database heuristics are
+provided by the pattern_database module.
+
 """
 
 
+BLANK = 'x'
+
+
+class ManhattanDistance():
+    """Manhattan distance heuristic.
+
+    A class whose instances give manhattan distance heuristic value for each
+    given state, the lowest over all goal states. Distances of every tile
+    from every position in the state name are precomputed for each goal.
+    With a single goal state, heuristic value of a state can also be computed
+    from the value of its parent and the tile that was moved.
+
+    Attributes:
+        tables: A list with a dictionary for each goal state, mapping every
+            tile to a list of its distances from the goal position indexed by
+            position in the state name.
+        incremental: A boolean indicating whether child method can be used.
+        integer_steps: A boolean indicating that values are integers that
+            change by at most the transition cost between neighboring
+            states, see util.priority_queue. Each move changes the distance
+            of one tile by one.
+    """
+
+    integer_steps = True
+
+    def __init__(self, goals):
+        """Inits ManhattanDistance with a list of goal state names."""
+        self.tables = []
+
+        for g in goals:
+            w = g.index('_') + 1 if '_' in g else len(g) + 1
+
+            table = {}
+            for c, t in enumerate(g):
+                if t in ('_', BLANK):
+                    continue
+
+                table[t] = [abs(i // w - c // w) + abs(i % w - c % w)
+                            for i in range(len(g))]
+
+            self.tables.append(table)
+
+        self.incremental = len(self.tables) == 1
+
+    def __call__(self, state):
+        """Returns the heuristic value of a state."""
+        h = float('inf')
+
+        for table in self.tables:
+            current_h = 0
+
+            for i, t in enumerate(state):
+                if t in table:
+                    current_h += table[t][i]
+
+            if current_h < h:
+                h = current_h
+
+        return h
+
+    def batch(self, states):
+        """Returns a list of heuristic values of given states."""
+        if len(self.tables) != 1:
+            return [self(s) for s in states]
+
+        table = self.tables[0]
+
+        return [sum(table[t][i] for i, t in enumerate(s) if t in table)
+                for s in states]
+
+    def child(self, parent, h, state):
+        """Returns the heuristic value of a state one move away from parent.
+
+        Only the tile that moved into the blank position of the parent
+        changes its distance, so the value is updated in constant time.
+        Requires a single goal state.
+
+        Args:
+            parent: String representing the name of the parent state.
+            h: Heuristic value of the parent state.
+            state: String representing the name of a state that is reached
+                from the parent by one move of the blank.
+
+        Returns:
+            Heuristic value of the state.
+
+        """
+        before = state.index(BLANK)
+        after = parent.index(BLANK)
+        distances = self.tables[0][state[after]]
+
+        return h - distances[before] + distances[after]
+
+
 def manhattan_distance(goals):
     """Manhattan distance heuristic
 
     Function that returns a function that gives manhattan distance heuristic
-    value for each given state.
+    value for each given state. Works for N x N puzzles of any size. The blank
+    is not counted, so the heuristic never overestimates.
 
     Args:
         goals: List of goal states represented by string name of the state.
 
     Returns:
-        Returns a function that gives manhattan distance heuristic
+        Returns a ManhattanDistance that gives manhattan distance heuristic
         value for each given state.
-    
-    """
-    new_goals = []
-    
-    for g in goals:
-        new_goals.append({})
-        
-        row = 0
-        for c in range(len(g)):
-            if g[c] != '_':
-                new_goals[-1][g[c]] = c - row
-            else:
-                row += 1
-    
-    def heuristic(state):
-        h = float('inf')
-        
-        for g in new_goals:
-            current_h = 0
-            
-            row = 0
-            for c in range(len(state)):
-                if state[c] != '_':
-                    current_h += abs((c - row) % 3 - g[state[c]] % 3) + abs((c - row) // 3 - g[state[c]] // 3)
-                else:
-                    row += 1
-            
-            if current_h < h:
-                h = current_h
-        
-        return h
-    
-    return heuristic
 
+    """
+    return ManhattanDistance(goals)
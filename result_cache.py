@@ -0,0 +1,279 @@
+"""Persistent cache of search results.
+
+A module that remembers results of searches so that repeated searches are
+answered without searching again. Results are keyed by a hash of everything
+the result depends on: contents of the state space and heuristic files, the
+starting and goal states, the algorithm and its parameters. A changed file
+gives a different key, so old results are never returned for it.
+
+Recently used results are kept in memory and, optionally, as small JSON files
+in a directory whose total size is limited by removing the least recently used
+files.
+
+"""
+
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from contextlib import suppress
+
+from search import Reporter, SearchResult, SILENT
+
+
+RESULT_SUFFIX = '.json'
+
+
+def file_digest(fname):
+    """Returns a SHA-256 hex digest of contents of a file."""
+    digest = hashlib.sha256()
+
+    with open(fname, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def source_digest(spec):
+    """Returns a digest of a state space or heuristic given by a string.
+
+    Args:
+        spec: String naming a file, a generated source such as 'l1', a
+            prefixed file such as 'pdb:<path>', or None.
+
+    Returns:
+        Digest of the file contents if spec names an existing file, the spec
+        together with the digest of its file if it is prefixed, else the spec
+        itself.
+
+    """
+    if spec is None:
+        return None
+
+    if os.path.isfile(spec):
+        return file_digest(spec)
+
+    prefix, sep, fname = spec.partition(':')
+    if sep and os.path.isfile(fname):
+        return prefix + ':' + file_digest(fname)
+
+    return spec
+
+
+def query_key(*parts):
+    """Returns a key of a search given by JSON serializable parts."""
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode()).hexdigest()
+
+
+class ResultCache():
+    """Cache of search results.
+
+    An entry is a dictionary with the search name, progress messages, found
+    path, number of visited states and cost, which is everything a search
+    reports, and the SearchResult as a dictionary. Replaying an entry gives
+    the same output as the search did.
+
+    Attributes:
+        maxsize: An integer representing the number of entries kept in memory.
+        directory: String representing path to a directory with entries kept
+            on disk, or None.
+        max_bytes: An integer representing the largest total size of entry
+            files in the directory.
+        hits: An integer representing the number of entries found.
+        misses: An integer representing the number of entries not found.
+    """
+
+    def __init__(self, maxsize=1024, directory=None, max_bytes=64 << 20):
+        """Inits ResultCache with memory and disk limits."""
+        self.maxsize = maxsize
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.memory = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        """Returns path of the file of an entry."""
+        return os.path.join(self.directory, key + RESULT_SUFFIX)
+
+    def get(self, key):
+        """Returns the entry with given key, or None if it is not cached."""
+        memory = self.memory
+
+        if key in memory:
+            self.hits += 1
+            memory.move_to_end(key)
+            return memory[key]
+
+        if self.directory:
+            path = self._path(key)
+
+            try:
+                with open(path) as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                pass
+            else:
+                self.hits += 1
+                self._remember(key, entry)
+
+                with suppress(OSError):
+                    os.utime(path)
+
+                return entry
+
+        self.misses += 1
+
+        return None
+
+    def put(self, key, entry):
+        """Stores an entry with given key."""
+        self._remember(key, entry)
+
+        if not self.directory:
+            return
+
+        path = self._path(key)
+        tmp = '{}.{}.tmp'.format(path, os.getpid())
+
+        try:
+            with open(tmp, 'w') as f:
+                json.dump(entry, f)
+            os.replace(tmp, path)
+        except OSError:
+            with suppress(OSError):
+                os.remove(tmp)
+            return
+
+        self._evict()
+
+    def _remember(self, key, entry):
+        """Stores an entry in memory, forgetting the least recently used."""
+        self.memory[key] = entry
+        self.memory.move_to_end(key)
+
+        while len(self.memory) > self.maxsize:
+            self.memory.popitem(last=False)
+
+    def _evict(self):
+        """Removes least recently used entry files over the size limit."""
+        files = []
+
+        with suppress(OSError):
+            with os.scandir(self.directory) as it:
+                for e in it:
+                    if e.name.endswith(RESULT_SUFFIX):
+                        with suppress(OSError):
+                            st = e.stat()
+                            files.append((st.st_mtime_ns, st.st_size, e.path))
+
+        total = sum(size for _, size, _ in files)
+
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+
+            with suppress(OSError):
+                os.remove(path)
+            total -= size
+
+    def search(self, key, search, *args, reporter=None, **kwargs):
+        """Runs a search unless its result is cached.
+
+        The search is called with given arguments and a reporter that records
+        its output. If the result is cached, the recorded output is replayed
+        to reporter instead, unless counters are requested and the cached
+        result was searched without them.
+
+        Args:
+            key: String representing the key of the search, see query_key.
+            search: Search function taking a reporter keyword argument and
+                returning a SearchResult.
+            args: Arguments of the search function.
+            reporter: A Reporter that receives the search output, or None to
+                discard it.
+            kwargs: Keyword arguments of the search function.
+
+        Returns:
+            The SearchResult of the search, or of the search that was cached.
+
+        """
+        entry = self.get(key)
+
+        if entry is not None and (not kwargs.get('counters', True) or
+                                  entry['result']['counters']):
+            return replay(entry, reporter)
+
+        if entry is not None:
+            self.hits -= 1
+            self.misses += 1
+
+        recording = Recording(reporter)
+        result = search(*args, reporter=recording, **kwargs)
+        recording.entry['result'] = result.to_dict()
+        self.put(key, recording.entry)
+
+        return result
+
+    def print_stats(self):
+        """Prints cache statistics."""
+        total = self.hits + self.misses
+
+        print('Result cache: {} hits, {} misses, hit rate {:.1%}'.format(
+            self.hits, self.misses, self.hits / total if total else 0.))
+
+
+class Recording(Reporter):
+    """Reporter that passes search output on and records it as an entry.
+
+    Attributes:
+        reporter: A Reporter that receives the search output, or None.
+        entry: A dictionary with the recorded output, see ResultCache.
+    """
+
+    def __init__(self, reporter=None):
+        """Inits Recording passing output to reporter."""
+        self.reporter = reporter or SILENT
+        self.entry = {'name': None, 'info': [], 'found': False, 'path': None,
+                      'visited': 0, 'cost': None}
+
+    def start(self, name):
+        """Records and passes on the start of the search."""
+        self.entry['name'] = name
+        self.reporter.start(name)
+
+    def info(self, message):
+        """Records and passes on a line of progress information."""
+        self.entry['info'].append(message)
+        self.reporter.info(message)
+
+    def found(self, path, visited, cost=None):
+        """Records and passes on the found path."""
+        self.entry.update(found=True, path=path, visited=visited, cost=cost)
+        self.reporter.found(path, visited, cost)
+
+    def not_found(self):
+        """Passes on that no path was found."""
+        self.reporter.not_found()
+
+
+def replay(entry, reporter=None):
+    """Reports a recorded entry to reporter and returns its SearchResult."""
+    reporter = reporter or SILENT
+
+    if entry['name'] is not None:
+        reporter.start(entry['name'])
+
+    for message in entry['info']:
+        reporter.info(message)
+
+    if entry['found']:
+        reporter.found(entry['path'], entry['visited'], entry['cost'])
+    else:
+        reporter.not_found()
+
+    return SearchResult.from_dict(entry['result'])
@@ -1,191 +1,454 @@
 """Implementation of various path-finding algorithms.
     
 A module that provides functions that perform various path-finding
-algorithms. Algorithms also print the search results.
+algorithms. Algorithms return a SearchResult with the found path and
+performance counters, and report their output to an optional Reporter, which
+prints it with PRINT. State space can be given as a transitions dictionary, as
+a compact Graph or as a SuccessorProvider that generates transitions lazily.
 
 """
 
-from util import Stack, Queue, PriorityQueue
+from array import array
+from time import perf_counter
 
+from util import Stack, Queue, PriorityQueue, IndexedPriorityQueue, priority_queue, \
+    flip_transitions
+from graph import Graph, interned_heuristic
+from successors import SlidingPuzzle, SQRT2
+from grid_heuristic import octile_distance
+from heuristic import evaluate, CountingHeuristic
 
-class Node():
-    """Node in state space graph.
 
-    A class that is used for representing a single node/state in the state
-    space graph.
+class SearchTree():
+    """Search tree stored in parallel arrays.
+
+    A class that stores nodes of a search tree. Each node is identified by an
+    integer id and its data is kept at that index of parallel arrays instead
+    of in a separate object, which keeps memory usage per node small.
 
     Attributes:
-        s: A string representing the state name.
-        d: An integer representing the depth of the node in state space
-            graph.
-        p: Node representing the parent node or None if this is the start
+        states: A list of state names of the nodes.
+        parents: An array of integers representing the parent node id of each
+            node, or -1 for the root node.
+        depths: An array of integers representing the depth of each node in
+            state space graph.
+        costs: An array of floats representing the cost of moving to each
+            node.
+        heuristics: An array of floats representing heuristic value of each
             node.
-        c: A float representing the cost of moving to this node.
-        h: A float representing the node's heuristic value.
     """
     
-    def __init__(self, s, d=0, p=None, c=0., h=0.):
-        """Inits Node with given parameters."""
-        self.s = s
-        self.d = d
-        self.p = p
-        self.c = c
-        self.h = h
+    def __init__(self):
+        """Inits an empty SearchTree."""
+        self.states = []
+        self.parents = array('q')
+        self.depths = array('q')
+        self.costs = array('d')
+        self.heuristics = array('d')
+    
+    def add(self, s, p=-1, c=0., h=0.):
+        """Adds a node for state s as a child of node p and returns its id."""
+        self.states.append(s)
+        self.parents.append(p)
+        self.depths.append(self.depths[p] + 1 if p >= 0 else 0)
+        self.costs.append(c)
+        self.heuristics.append(h)
+        
+        return len(self.states) - 1
     
-    def path(self):
-        """Returns path to this node using backtracking."""
-        path = [self.s]
+    def path(self, n):
+        """Returns path to node n using backtracking."""
+        path = []
+        
+        while n >= 0:
+            path.append(self.states[n])
+            n = self.parents[n]
         
-        parent = self.p
-        while parent:
-            path[:0] = [parent.s]
-            parent = parent.p
+        path.reverse()
         
         return path
     
-    def __lt__(self, other):
-        """Overrides < operator using cost and heuristic values"""
-        return self.c + self.h < other.c + other.h
+    def __len__(self):
+        """Returns the number of nodes in the tree."""
+        return len(self.states)
+
+
+class Reporter():
+    """Receiver of search output.
+
+    Search algorithms report their progress and results to a reporter instead
+    of printing them directly. This reporter prints them, subclasses may keep
+    or discard them.
+    
+    """
+    
+    def start(self, name):
+        """Reports that search algorithm with given name has started."""
+        print('Running {}:'.format(name))
+    
+    def info(self, message):
+        """Reports a line of progress information."""
+        print(message)
+    
+    def found(self, path, visited, cost=None):
+        """Reports a found path, see print_search_results."""
+        print_search_results(path, visited, cost)
+    
+    def not_found(self):
+        """Reports that no path was found."""
+        print('Path not found.')
+
+
+class Silent(Reporter):
+    """Reporter that discards all search output."""
+    
+    def start(self, name):
+        """Ignores the start of the search."""
+    
+    def info(self, message):
+        """Ignores progress information."""
+    
+    def found(self, path, visited, cost=None):
+        """Ignores the found path."""
+    
+    def not_found(self):
+        """Ignores that no path was found."""
+
+
+class Recorder(Silent):
+    """Reporter that keeps search results instead of printing them.
+
+    Attributes:
+        path: A list of state names of the found path, or None.
+        visited: An integer representing the number of visited states
+            reported with the path.
+        cost: A float representing the reported cost of the path, or None if
+            search does not use cost information.
+    """
+    
+    def __init__(self):
+        """Inits Recorder with no results."""
+        self.path = None
+        self.visited = 0
+        self.cost = None
+    
+    def found(self, path, visited, cost=None):
+        """Keeps the found path, visited count and cost."""
+        self.path = path
+        self.visited = visited
+        self.cost = cost
+
 
+PRINT = Reporter()
+SILENT = Silent()
 
-def BFS(s0, trans, goal):
+
+class SearchResult():
+    """Result of a search with its performance counters.
+
+    Evaluates to True if a path was found. Counters other than expanded are
+    None if the search was run with counters switched off.
+
+    Attributes:
+        algorithm: String representing the name of the search algorithm.
+        path: A list of state names of the found path, or None.
+        cost: A float representing the cost of the path, or None if the path
+            is not found or search does not use cost information.
+        expanded: An integer representing the number of visited states, the
+            same number the reporter receives.
+        generated: An integer representing the number of search tree nodes
+            created for successor states.
+        reopened: An integer representing the number of times a state was
+            put back on the open list after it was expanded.
+        max_frontier: An integer representing the largest number of states
+            waiting on the open list at the same time.
+        heuristic_calls: An integer representing the number of computed
+            heuristic values.
+        times: A dictionary mapping phase names 'setup', 'search' and
+            'report' to their wall time in seconds.
+        metrics: A dictionary of JSON serializable values that only some
+            algorithms measure, such as the suboptimality bound of an anytime
+            search, mapped from their names.
+        counters: A boolean indicating whether counters were collected.
+    """
+    
+    FIELDS = ('algorithm', 'path', 'cost', 'expanded', 'generated', 'reopened',
+              'max_frontier', 'heuristic_calls', 'times', 'metrics', 'counters')
+    
+    def __init__(self, algorithm, counters=True):
+        """Inits SearchResult of given algorithm and starts timing it."""
+        self.algorithm = algorithm
+        self.path = None
+        self.cost = None
+        self.expanded = 0
+        self.generated = None
+        self.reopened = None
+        self.max_frontier = None
+        self.heuristic_calls = None
+        self.times = {}
+        self.metrics = {}
+        
+        self.counters = counters
+        self._heuristics = []
+        self._mark = perf_counter()
+    
+    @classmethod
+    def start(cls, algorithm, reporter=None, counters=True):
+        """Starts a search and reports its start.
+
+        Args:
+            algorithm: String representing the name of the search algorithm.
+            reporter: A Reporter that receives the search output, or None to
+                discard it.
+            counters: A boolean indicating whether counters are collected.
+
+        Returns:
+            A tuple (result, reporter) where result is a new SearchResult and
+            reporter is the given one or SILENT.
+        
+        """
+        reporter = reporter or SILENT
+        reporter.start(algorithm)
+        
+        return cls(algorithm, counters), reporter
+    
+    def count(self, h):
+        """Returns heuristic h wrapped to count its calls if counters are
+        collected, else h itself."""
+        if not self.counters or h is None:
+            return h
+        
+        h = CountingHeuristic(h)
+        self._heuristics.append(h)
+        
+        return h
+    
+    def phase(self, name):
+        """Ends the current phase with given name and starts the next one."""
+        now = perf_counter()
+        self.times[name] = self.times.get(name, 0.) + now - self._mark
+        self._mark = now
+    
+    def finish(self, reporter, path, expanded, cost=None, generated=0,
+               max_frontier=0, reopened=0):
+        """Records the outcome of a search and reports it.
+
+        Args:
+            reporter: A Reporter that receives the search output.
+            path: A list of state names of the found path, or None.
+            expanded: An integer representing the number of visited states.
+            cost: A float representing the cost of the path, or None.
+            generated: An integer representing the number of generated nodes.
+            max_frontier: An integer representing the largest open list size.
+            reopened: An integer representing the number of reopened states.
+
+        Returns:
+            The SearchResult itself.
+        
+        """
+        self.phase('search')
+        
+        self.path = path
+        self.cost = cost if path is not None else None
+        self.expanded = expanded
+        
+        if self.counters:
+            self.generated = generated
+            self.reopened = reopened
+            self.max_frontier = max_frontier
+            self.heuristic_calls = sum(h.calls for h in self._heuristics)
+        
+        if path is None:
+            reporter.not_found()
+        else:
+            reporter.found(path, expanded, cost)
+        
+        self.phase('report')
+        
+        return self
+    
+    def __bool__(self):
+        """Returns whether a path was found."""
+        return self.path is not None
+    
+    def to_dict(self):
+        """Returns a JSON serializable dictionary of the result."""
+        return {field: getattr(self, field) for field in self.FIELDS}
+    
+    @classmethod
+    def from_dict(cls, d):
+        """Returns a SearchResult from a dictionary made by to_dict."""
+        result = cls(d['algorithm'])
+        
+        for field in cls.FIELDS:
+            setattr(result, field, d[field])
+        
+        return result
+
+
+def BFS(s0, trans, goal, reporter=None, counters=True):
     """Performs a breadth-first search.
 
     Performs a breadth-first search starting from state s0 and trying to reach
-    goal state, if it exists. Search also prints out the results if the path is
-    found.
+    goal state, if it exists. Search also reports the results to reporter.
 
     Args:
         s0: String representing the name of the starting state.
         trans: A dictionary containing list of possible transitions and their
             costs for each key that represents the state name.
         goal: A list of goal state names.
+        reporter: A Reporter that receives the search output, such as PRINT,
+            or None to discard it.
+        counters: A boolean indicating whether counters are collected.
 
     Returns:
-        A list representing the path from s0 to one of the goal states if the
-        path is found, else returns None
+        A SearchResult with the path from s0 to one of the goal states, or
+        with path None if the path is not found.
     
     """
-    print('Running bfs:')
+    result, reporter = SearchResult.start('bfs', reporter, counters)
+    
+    s0, goal, _ = _intern(s0, trans, goal)
     
     open = Queue()
-    open.push(Node(s0))
+    tree = SearchTree()
+    open.push(tree.add(s0))
     
     visited = set()
     
+    result.phase('setup')
+    
     while open:
         n = open.pop()
+        s = tree.states[n]
         
-        visited.add(n.s)
+        if s in visited:
+            continue
+        
+        visited.add(s)
         
-        if n.s in goal:
-            path = n.path()
-            print_search_results(path, len(visited))
-            return path
+        if s in goal:
+            return result.finish(reporter, _path(trans, tree, n), len(visited),
+                                 None, len(tree), open.peak)
         
-        for m, _ in trans.get(n.s, []):
+        for m, _ in trans.get(s, []):
             if m not in visited:
-                open.push(Node(m, n.d + 1, n))
-    
-    print('Path not found.')
+                open.push(tree.add(m, n))
     
-    return None
+    return result.finish(reporter, None, len(visited), None, len(tree),
+                         open.peak)
 
 
-def UCS(s0, trans, goal):
+def UCS(s0, trans, goal, queue=None, reporter=None, counters=True):
     """Performs a uniform-cost search.
 
     Performs a uniform-cost search starting from state s0 and trying to reach
-    goal state, if it exists. Search also prints out the results if the path is
-    found.
+    goal state, if it exists. Search also reports the results to reporter.
 
     Args:
         s0: String representing the name of the starting state.
         trans: A dictionary containing list of possible transitions and their
             costs for each key that represents the state name.
         goal: A list of goal state names.
+        queue: String 'heap' or 'bucket' selecting the priority queue, or
+            None to select it from the costs of the state space.
+        reporter: A Reporter that receives the search output, such as PRINT,
+            or None to discard it.
+        counters: A boolean indicating whether counters are collected.
 
     Returns:
-        A list representing the path from s0 to one of the goal states if the
-        path is found, else returns None
+        A SearchResult with the path from s0 to one of the goal states, or
+        with path None if the path is not found.
     
     """
-    print('Running ucs:')
+    result, reporter = SearchResult.start('ucs', reporter, counters)
     
-    open = PriorityQueue()
-    open.push(Node(s0))
+    s0, goal, _ = _intern(s0, trans, goal)
+    
+    open = priority_queue(trans, queue)
+    open.push(s0, 0.)
+    
+    tree = SearchTree()
+    nodes = {s0: tree.add(s0)}
     
     visited = set()
     
+    result.phase('setup')
+    
     while open:
-        n = open.pop()
+        s, cs = open.pop()
+        n = nodes.pop(s)
         
-        visited.add(n.s)
+        visited.add(s)
         
-        if n.s in goal:
-            path = n.path()
-            print_search_results(path, len(visited), n.c)
-            return path
+        if s in goal:
+            return result.finish(reporter, _path(trans, tree, n), len(visited),
+                                 cs, len(tree), open.peak)
         
-        for m, c in trans.get(n.s, []):
-            if m not in visited:
-                open.push(Node(m, n.d + 1, n, n.c + c))
-    
-    print('Path not found.')
+        for m, c in trans.get(s, []):
+            if m not in visited and open.push(m, cs + c):
+                nodes[m] = tree.add(m, n, cs + c)
     
-    return None
+    return result.finish(reporter, None, len(visited), None, len(tree),
+                         open.peak)
 
 
-def DFS(s0, trans, goal):
+def DFS(s0, trans, goal, reporter=None, counters=True):
     """Performs a depth-first search.
 
     Performs a depth-first search starting from state s0 and trying to reach
-    goal state, if it exists. Search also prints out the results if the path is
-    found.
+    goal state, if it exists. Search also reports the results to reporter.
 
     Args:
         s0: String representing the name of the starting state.
         trans: A dictionary containing list of possible transitions and their
             costs for each key that represents the state name.
         goal: A list of goal state names.
+        reporter: A Reporter that receives the search output, such as PRINT,
+            or None to discard it.
+        counters: A boolean indicating whether counters are collected.
 
     Returns:
-        A list representing the path from s0 to one of the goal states if the
-        path is found, else returns None
+        A SearchResult with the path from s0 to one of the goal states, or
+        with path None if the path is not found.
     
     """
-    print('Running dfs:')
+    result, reporter = SearchResult.start('dfs', reporter, counters)
+    
+    s0, goal, _ = _intern(s0, trans, goal)
     
     open = Stack()
-    open.push(Node(s0))
+    tree = SearchTree()
+    open.push(tree.add(s0))
     
     visited = set()
     
+    result.phase('setup')
+    
     while open:
         n = open.pop()
+        s = tree.states[n]
         
-        visited.add(n.s)
+        visited.add(s)
         
-        if n.s in goal:
-            path = n.path()
-            print_search_results(path, len(visited))
-            return path
+        if s in goal:
+            return result.finish(reporter, _path(trans, tree, n), len(visited),
+                                 None, len(tree), open.peak)
         
-        for m, _ in trans.get(n.s, []):
+        for m, _ in trans.get(s, []):
             if m not in visited:
-                open.push(Node(m, n.d + 1, n))
-    
-    print('Path not found.')
+                open.push(tree.add(m, n))
     
-    return None
+    return result.finish(reporter, None, len(visited), None, len(tree),
+                         open.peak)
 
 
-def lDFS(s0, trans, goal, k, show=True, visited_before=0):
+def lDFS(s0, trans, goal, k, reporter=None, counters=True):
     """Performs a limited depth-first search.
 
     Performs a limited depth-first search starting from state s0 and trying to
-    reach goal state, if it exists. Search also prints out the results if the
-    path is found.
+    reach goal state, if it exists. Search also reports the results to
+    reporter.
 
     Args:
         s0: String representing the name of the starting state.
@@ -193,216 +456,1032 @@ def lDFS(s0, trans, goal, k, show=True, visited_before=0):
             costs for each key that represents the state name.
         goal: A list of goal state names.
         k: An integer representing the depth limmit of the search.
-        show: A boolean indicating whether the function should print results.
+        reporter: A Reporter that receives the search output, such as PRINT,
+            or None to discard it.
+        counters: A boolean indicating whether counters are collected.
 
     Returns:
-        A list representing the path from s0 to one of the goal states if the
-        path is found, else returns None. If variable show is False, returns
-        the number of visited states instead, because then it is used by IDF
-        search algorithm.
+        A SearchResult with the path from s0 to one of the goal states, or
+        with path None if the path is not found.
     
     """
-    if show:
-        print('Running limited dfs:')
+    result, reporter = SearchResult.start('limited dfs', reporter, counters)
+    
+    s0, goal, _ = _intern(s0, trans, goal)
     
     open = Stack()
-    open.push(Node(s0))
+    tree = SearchTree()
+    open.push(tree.add(s0))
     
     visited = {}
     
+    result.phase('setup')
+    
     while open:
         n = open.pop()
+        s, d = tree.states[n], tree.depths[n]
         
-        visited[n.s] = n.d
+        visited[s] = d
         
-        if n.s in goal:
-            path = n.path()
-            print_search_results(path, visited_before + len(visited))
-            return path
+        if s in goal:
+            return result.finish(reporter, _path(trans, tree, n), len(visited),
+                                 None, len(tree), open.peak)
         
-        if n.d < k:
-            for m, _ in trans.get(n.s, []):
-                if m not in visited or n.d + 1 < visited[m]:
-                    open.push(Node(m, n.d + 1, n))
-    
-    if not show:
-        return len(visited)
+        if d < k:
+            for m, _ in trans.get(s, []):
+                if m not in visited or d + 1 < visited[m]:
+                    open.push(tree.add(m, n))
     
-    print('Path not found.')
-    
-    return None
+    return result.finish(reporter, None, len(visited), None, len(tree),
+                         open.peak)
 
 
-def IDS(s0, trans, goal):
+def IDS(s0, trans, goal, reporter=None, counters=True):
     """Performs a iterative deepening search.
 
     Performs a iterative deepening search starting from state s0 and trying to
-    reach goal state, if it exists. Search also prints out the results if the
-    path is found.
+    reach goal state, if it exists. Search also reports the results to
+    reporter.
 
     Args:
         s0: String representing the name of the starting state.
         trans: A dictionary containing list of possible transitions and their
             costs for each key that represents the state name.
         goal: A list of goal state names.
+        reporter: A Reporter that receives the search output, such as PRINT,
+            or None to discard it.
+        counters: A boolean indicating whether counters are collected.
 
     Returns:
-        A list representing the path from s0 to one of the goal states if the
-        path is found, else returns None
+        A SearchResult with the path from s0 to one of the goal states, or
+        with path None if the path is not found. Counters are summed over
+        all depth limits.
     
     """
-    print('Running ids:')
+    result, reporter = SearchResult.start('ids', reporter, counters)
+    
+    visited = generated = frontier = 0
+    
+    result.phase('setup')
     
-    visited = 0
     for k in range(100):
-        res = lDFS(s0, trans, goal, k, False, visited)
+        res = lDFS(s0, trans, goal, k, None, counters)
         
-        if type(res) is list:
-            return res
+        visited += res.expanded
         
-        visited += res
+        if counters:
+            generated += res.generated
+            frontier = max(frontier, res.max_frontier)
         
-        k += 1
-    
-    print('Path not found.')
+        if res:
+            return result.finish(reporter, res.path, visited, None, generated,
+                                 frontier)
     
-    return None
+    return result.finish(reporter, None, visited, None, generated, frontier)
 
 
-def GBFS(s0, trans, goal, h):
+def GBFS(s0, trans, goal, h, reporter=None, counters=True):
     """Performs a greedy best-first search.
 
     Performs a greedy best-first search starting from state s0 and trying to
-    reach goal state, if it exists. Search also prints out the results if the
-    path is found.
+    reach goal state, if it exists. Search also reports the results to
+    reporter.
 
     Args:
         s0: String representing the name of the starting state.
         trans: A dictionary containing list of possible transitions and their
             costs for each key that represents the state name.
         goal: A list of goal state names.
+        reporter: A Reporter that receives the search output, such as PRINT,
+            or None to discard it.
+        counters: A boolean indicating whether counters are collected.
 
     Returns:
-        A list representing the path from s0 to one of the goal states if the
-        path is found, else returns None
+        A SearchResult with the path from s0 to one of the goal states, or
+        with path None if the path is not found.
     
     """
-    print('Running gbfs:')
-
+    result, reporter = SearchResult.start('gbfs', reporter, counters)
+    
+    s0, goal, h = _intern(s0, trans, goal, result.count(h))
+    
     open = PriorityQueue()
-    open.push(Node(s0))
+    hb = _batch_heuristic(trans, h)
+    
+    tree = SearchTree()
+    open.push((0., tree.add(s0, h=h(s0))))
     
     visited = set()
     
+    result.phase('setup')
+    
     while open:
-        n = open.pop()
+        _, n = open.pop()
+        s = tree.states[n]
         
-        visited.add(n.s)
+        visited.add(s)
         
-        if n.s in goal:
-            path = n.path()
-            print_search_results(path, len(visited))
-            return path
+        if s in goal:
+            return result.finish(reporter, _path(trans, tree, n), len(visited),
+                                 None, len(tree), open.peak)
         
-        for m, c in trans.get(n.s, []):
-            if m not in visited:
-                open.push(Node(m, n.d + 1, n, h=h(m)))
-    
-    print('Path not found.')
+        M = [m for m, _ in trans.get(s, []) if m not in visited]
+        
+        for m, hm in zip(M, hb(s, tree.heuristics[n], M)):
+            open.push((hm, tree.add(m, n, h=hm)))
     
-    return None
+    return result.finish(reporter, None, len(visited), None, len(tree),
+                         open.peak)
 
 
-def HCS(s0, trans, h):
+def HCS(s0, trans, h, reporter=None, counters=True):
     """Performs a hill climb search.
 
     Performs a hill climb search starting from state s0 and trying to reach
-    goal state, if it exists. Search also prints out the results if the path is
-    found.
+    goal state, if it exists. Search also reports the results to reporter.
+
+    The search moves to the successor with the lowest heuristic value as long
+    as it is lower than the value of the current state, so it stops in local
+    minima and on plateaus.
 
     Args:
         s0: String representing the name of the starting state.
         trans: A dictionary containing list of possible transitions and their
             costs for each key that represents the state name.
         goal: A list of goal state names.
+        reporter: A Reporter that receives the search output, such as PRINT,
+            or None to discard it.
+        counters: A boolean indicating whether counters are collected.
 
     Returns:
-        A list representing the path from s0 to one of the goal states if the
-        path is found, else returns None
+        A SearchResult with the path from s0 to the state where the climb
+        stopped. Its frontier is the largest number of successors compared.
     
     """
-    print('Running hcs:')
+    result, reporter = SearchResult.start('hcs', reporter, counters)
+    
+    s0, _, h = _intern(s0, trans, (), result.count(h))
+    
+    hb = _batch_heuristic(trans, h)
     
-    n = Node(s0)
+    tree = SearchTree()
+    n = tree.add(s0, h=h(s0))
+    
+    generated = frontier = 0
+    
+    result.phase('setup')
     
     while True:
-        M = trans.get(n.s, [])
+        s, hn = tree.states[n], tree.heuristics[n]
+        M = [t for t, _ in trans.get(s, [])]
         
         if not M:
             break
         
+        generated += len(M)
+        frontier = max(frontier, len(M))
+        
         m = None
         hm = float('inf')
         
-        for s, _ in M:
-            hs = h(s)
-            
-            if hs < hm:
-                m = s
-                hm = hs
+        for t, ht in zip(M, hb(s, hn, M)):
+            if ht < hm:
+                m = t
+                hm = ht
         
-        if n.h < hm:
+        if hn <= hm:
             break
         
-        n = Node(m, n.d + 1, n, h=hm)
+        n = tree.add(m, n, h=hm)
     
-    path = n.path()
-    print_search_results(path, n.d + 1)
-    return path
+    return result.finish(reporter, _path(trans, tree, n), tree.depths[n] + 1,
+                         None, generated, frontier)
 
 
-def AStar(s0, trans, goal, h):
+def AStar(s0, trans, goal, h, queue=None, reporter=None, counters=True):
     """Performs an A* search.
 
     Performs an A* search starting from state s0 and trying to reach
-    goal state, if it exists. Search also prints out the results if the path is
-    found.
+    goal state, if it exists. Search also reports the results to reporter.
 
     Args:
         s0: String representing the name of the starting state.
         trans: A dictionary containing list of possible transitions and their
             costs for each key that represents the state name.
         goal: A list of goal state names.
+        queue: String 'heap' or 'bucket' selecting the priority queue, or
+            None to select it from the costs and the heuristic, see
+            util.priority_queue.
+        reporter: A Reporter that receives the search output, such as PRINT,
+            or None to discard it.
+        counters: A boolean indicating whether counters are collected.
 
     Returns:
-        A list representing the path from s0 to one of the goal states if the
-        path is found, else returns None
+        A SearchResult with the path from s0 to one of the goal states, or
+        with path None if the path is not found.
     
     """
-    print('Running astar:')
+    result, reporter = SearchResult.start('astar', reporter, counters)
     
-    open = PriorityQueue()
-    open.push(Node(s0))
+    open = priority_queue(trans, queue, h)
+    
+    s0, goal, h = _intern(s0, trans, goal, result.count(h))
+    
+    open.push(s0, 0.)
+    
+    hb = _batch_heuristic(trans, h)
+    
+    tree = SearchTree()
+    nodes = {s0: tree.add(s0, h=h(s0))}
     
     closed = {}
+    reopened = 0
+    
+    result.phase('setup')
     
     while open:
-        n = open.pop()
+        s, _ = open.pop()
+        n = nodes.pop(s)
+        cs = tree.costs[n]
+        
+        closed[s] = cs
+        
+        if s in goal:
+            return result.finish(reporter, _path(trans, tree, n), len(closed),
+                                 cs, len(tree), open.peak, reopened)
+        
+        M = [(m, cs + c) for m, c in trans.get(s, [])
+             if m not in closed or closed[m] > cs + c]
+        
+        new = [m for m, _ in M if m not in nodes]
+        hs = dict(zip(new, hb(s, tree.heuristics[n], new)))
+        
+        for m, cm in M:
+            if m in nodes:
+                hm = tree.heuristics[nodes[m]]
+            else:
+                hm = hs[m]
+            
+            if open.push(m, cm + hm):
+                nodes[m] = tree.add(m, n, cm, hm)
+                
+                if m in closed:
+                    reopened += 1
+    
+    return result.finish(reporter, None, len(closed), None, len(tree),
+                         open.peak, reopened)
+
+
+def JPS(s0, grid, goal, h=None, queue=None, reporter=None, counters=True):
+    """Performs a jump point search.
+
+    Performs an A* search on a grid map starting from state s0 and trying to
+    reach goal state, if it exists. Instead of every neighbor, a state gets
+    as successors only the jump points found by scanning from it in the
+    directions an optimal path can continue in. Scans skip cells that every
+    optimal path crosses in a straight line, so far fewer states are
+    expanded than by AStar on the same grid, while found paths are equally
+    expensive. Search also reports the results to reporter.
+
+    Args:
+        s0: String representing the name of the starting state.
+        grid: A GridMap.
+        goal: A list of goal state names.
+        h: Heuristic function that is admissible for the goal states, or None
+            to use the octile distance.
+        queue: String 'heap' or 'bucket' selecting the priority queue, or
+            None for IndexedPriorityQueue.
+        reporter: A Reporter that receives the search output, such as PRINT,
+            or None to discard it.
+        counters: A boolean indicating whether counters are collected.
+
+    Returns:
+        A SearchResult with the path of single moves from s0 to one of the
+        goal states, or with path None if the path is not found. Expanded and
+        generated states are jump points.
+    
+    """
+    result, reporter = SearchResult.start('jps', reporter, counters)
+    
+    if h is None:
+        h = octile_distance(goal, grid.diagonal)
+    h = result.count(h)
+    
+    cells, w, name = grid.cells, grid.stride, grid.name
+    goals = {p for p in map(grid.cell, goal) if p is not None}
+    start = grid.cell(s0)
+    
+    jump = _jump_diagonal if grid.diagonal else _jump_orthogonal
+    
+    # jumps are longer than single moves, so priorities are not bounded
+    open = priority_queue(None, queue)
+    tree = SearchTree()
+    nodes = {}
+    
+    if start is not None:
+        open.push(start, 0.)
+        nodes[start] = tree.add(start, h=h(s0))
+    
+    closed = {}
+    reopened = 0
+    
+    result.phase('setup')
+    
+    while open:
+        p, _ = open.pop()
+        n = nodes.pop(p)
+        cp = tree.costs[n]
+        
+        closed[p] = cp
+        
+        if p in goals:
+            path = _grid_path(grid, tree.path(n))
+            return result.finish(reporter, path, len(closed), cp, len(tree),
+                                 open.peak, reopened)
+        
+        parent = tree.parents[n]
+        
+        for dr, dc in _jump_directions(grid, p, tree.states[parent]
+                                       if parent >= 0 else None):
+            m = jump(cells, w, goals, p + dr * w + dc, dr, dc)
+            if m < 0:
+                continue
+            
+            k = max(abs(m // w - p // w), abs(m % w - p % w))
+            cm = cp + (k * SQRT2 if dr and dc else k)
+            
+            if m in closed and closed[m] <= cm:
+                continue
+            
+            hm = tree.heuristics[nodes[m]] if m in nodes else h(name(m))
+            
+            if open.push(m, cm + hm):
+                nodes[m] = tree.add(m, n, cm, hm)
+                
+                if m in closed:
+                    reopened += 1
+    
+    return result.finish(reporter, None, len(closed), None, len(tree),
+                         open.peak, reopened)
+
+
+def ARAStar(s0, trans, goal, h, weight=3., step=0.5, time_limit=None,
+            expansions=None, reporter=None, counters=True):
+    """Performs an anytime repairing A* search.
+
+    Performs a weighted A* search starting from state s0 and trying to reach
+    goal state, if it exists. States are ordered by cost plus weight times
+    heuristic, which finds a first path quickly. The search is then
+    continued with weight lowered by step down to 1, reusing the costs found
+    so far: only states whose cost improved since they were expanded are
+    expanded again, and states that cannot lead to a cheaper path than the
+    best one are dropped. Each improved path is reported with its
+    suboptimality bound, the ratio by which it can be more expensive than an
+    optimal path if the heuristic is admissible. Search ends when the bound
+    reaches 1 or a budget runs out, and also reports the best path found to
+    reporter.
+
+    Args:
+        s0: String representing the name of the starting state.
+        trans: A dictionary containing list of possible transitions and their
+            costs for each key that represents the state name.
+        goal: A list of goal state names.
+        h: Heuristic function that is admissible for the goal states.
+        weight: A float not lower than 1 representing the initial weight of
+            the heuristic.
+        step: A float representing how much the weight is lowered after each
+            search.
+        time_limit: A float representing the number of seconds after which
+            search stops, or None.
+        expansions: An integer representing the number of expanded states
+            after which search stops, or None.
+        reporter: A Reporter that receives the search output, such as PRINT,
+            or None to discard it.
+        counters: A boolean indicating whether counters are collected.
+
+    Returns:
+        A SearchResult with the best path found from s0 to one of the goal
+        states, or with path None if the path is not found. Its metrics hold
+        bound, the suboptimality bound of the path, and solutions, a list of
+        [cost, bound, expanded, seconds] of each reported path.
+    
+    """
+    result, reporter = SearchResult.start('arastar', reporter, counters)
+    
+    if weight < 1:
+        raise ValueError('Heuristic weight must not be lower than 1.')
+    
+    s0, goal, h = _intern(s0, trans, goal, result.count(h))
+    
+    inf = float('inf')
+    begin = perf_counter()
+    
+    costs, parents, hs = {s0: 0.}, {s0: None}, {s0: h(s0)}
+    closed, incons = set(), set()
+    
+    open = IndexedPriorityQueue()
+    open.push(s0, weight * hs[s0])
+    
+    best, found = (0., s0) if s0 in goal else (inf, None)
+    lower, bound, solutions = 0., inf, []
+    expanded = generated = reopened = peak = 0
+    
+    result.phase('setup')
+    
+    while True:
+        stopped = False
+        
+        while open and open.peek()[1] < best:
+            if (expansions is not None and expanded >= expansions or
+                    time_limit is not None and
+                    perf_counter() - begin >= time_limit):
+                stopped = True
+                break
+            
+            s, _ = open.pop()
+            cs = costs[s]
+            
+            closed.add(s)
+            expanded += 1
+            
+            for m, c in trans.get(s, []):
+                cm = cs + c
+                if cm >= costs.get(m, inf):
+                    continue
+                
+                hm = hs.get(m)
+                if hm is None:
+                    hm = hs[m] = h(m)
+                
+                if cm + hm >= best:
+                    continue
+                
+                costs[m] = cm
+                parents[m] = s
+                generated += 1
+                
+                if m in goal:
+                    best, found = cm, m
+                elif m in closed:
+                    incons.add(m)
+                else:
+                    open.push(m, cm + weight * hm)
+        
+        peak = max(peak, open.peak)
+        
+        if stopped:
+            break
+        
+        frontier = list(incons)
+        while open:
+            frontier.append(open.pop()[0])
+        
+        # best is at most weight times the optimal cost, and no path through
+        # a waiting state is cheaper than its cost plus heuristic
+        lower = max(lower, best / weight,
+                    min([costs[s] + hs[s] for s in frontier] + [best]))
+        
+        if found is None:
+            break
+        
+        if not solutions or _ratio(best, lower) < bound:
+            bound = _ratio(best, lower)
+            solutions.append([best, bound, expanded, perf_counter() - begin])
+            reporter.info('Path of cost {:g} within {:.3f} of optimal after '
+                          '{} expanded states'.format(best, bound, expanded))
+        
+        if lower >= best:
+            break
+        
+        weight = max(1., weight - step)
+        reopened += len(incons)
+        
+        for s in frontier:
+            if costs[s] + hs[s] < best:
+                open.push(s, costs[s] + weight * hs[s])
+        
+        closed, incons = set(), set()
+    
+    path, cost = None, None
+    if found is not None:
+        path = [found]
+        while parents[path[-1]] is not None:
+            path.append(parents[path[-1]])
+        path.reverse()
+        
+        # costs of states on the path may have improved after it was found
+        cost = sum(min(c for m, c in trans.get(s, []) if m == t)
+                   for s, t in zip(path, path[1:]))
+        
+        if not solutions or cost < solutions[-1][0]:
+            bound = _ratio(cost, lower)
+            solutions.append([cost, bound, expanded, perf_counter() - begin])
+        
+        path = _names(trans, path)
+    
+    result.finish(reporter, path, expanded, cost, generated, peak, reopened)
+    
+    result.metrics['bound'] = bound if path is not None else None
+    result.metrics['solutions'] = solutions
+    
+    return result
+
+
+def IDAStar(s0, trans, goal, h, reporter=None, counters=True):
+    """Performs an iterative deepening A* search.
+
+    Performs a series of depth-first searches starting from state s0 that
+    expand only states whose estimated total cost does not exceed a
+    threshold. Threshold starts at the heuristic value of s0 and is raised to
+    the lowest estimate that exceeded it until a goal state is reached. Only
+    the current path is kept in memory. Search also reports expansions per
+    threshold and the results to reporter.
+
+    Args:
+        s0: String representing the name of the starting state.
+        trans: A dictionary containing list of possible transitions and their
+            costs for each key that represents the state name.
+        goal: A list of goal state names.
+        h: Heuristic function that is admissible for the goal states.
+        reporter: A Reporter that receives the search output, such as PRINT,
+            or None to discard it.
+        counters: A boolean indicating whether counters are collected.
+
+    Returns:
+        A SearchResult with the path from s0 to one of the goal states, or
+        with path None if the path is not found. Its frontier is the longest
+        path held in memory.
+    
+    """
+    result, reporter = SearchResult.start('idastar', reporter, counters)
+    
+    s0, goal, h = _intern(s0, trans, goal, result.count(h))
+    
+    hc = _child_heuristic(trans, h)
+    
+    h0 = threshold = h(s0)
+    visited = 0
+    generated = 0
+    frontier = 1
+    iterations = 0
+    
+    result.phase('setup')
+    
+    while True:
+        iterations += 1
+        
+        path, costs, hs, on_path = [s0], [0.], [h0], {s0}
+        stack = [iter(trans.get(s0, []))]
+        
+        expansions = 1
+        found = s0 in goal
+        next_threshold = float('inf')
+        
+        while stack and not found:
+            for m, c in stack[-1]:
+                if m in on_path:
+                    continue
+                
+                cm = costs[-1] + c
+                hm = hc(path[-1], hs[-1], m)
+                fm = cm + hm
+                generated += 1
+                
+                if fm > threshold:
+                    if fm < next_threshold:
+                        next_threshold = fm
+                    continue
+                
+                path.append(m)
+                costs.append(cm)
+                hs.append(hm)
+                
+                if len(path) > frontier:
+                    frontier = len(path)
+                
+                if m in goal:
+                    found = True
+                    break
+                
+                on_path.add(m)
+                stack.append(iter(trans.get(m, [])))
+                expansions += 1
+                break
+            else:
+                stack.pop()
+                on_path.discard(path.pop())
+                costs.pop()
+                hs.pop()
+        
+        visited += expansions
+        reporter.info('  threshold {}: {} expansions'.format(threshold, expansions))
+        
+        if found:
+            reporter.info('Iterations = {}'.format(iterations))
+            return result.finish(reporter, _names(trans, path), visited,
+                                 costs[-1], generated, frontier)
+        
+        if next_threshold == float('inf'):
+            break
+        
+        threshold = next_threshold
+    
+    return result.finish(reporter, None, visited, None, generated, frontier)
+
+
+def bibfs(s0, trans, goal, reporter=None, counters=True):
+    """Performs a bidirectional breadth-first search.
+
+    Performs a breadth-first search from state s0 and a backward breadth-first
+    search from all goal states at the same time, expanding one whole layer
+    of the smaller frontier at a time until the two searches meet. Search
+    also reports the results to reporter.
+
+    Args:
+        s0: String representing the name of the starting state.
+        trans: A dictionary containing list of possible transitions and their
+            costs for each key that represents the state name. It is
+            reversed using util.flip_transitions.
+        goal: A list of goal state names.
+        reporter: A Reporter that receives the search output, such as PRINT,
+            or None to discard it.
+        counters: A boolean indicating whether counters are collected.
+
+    Returns:
+        A SearchResult with the path from s0 to one of the goal states, or
+        with path None if the path is not found. Its frontier is the largest
+        total size of both frontiers.
+    
+    """
+    result, reporter = SearchResult.start('bibfs', reporter, counters)
+    
+    s0, goal, _ = _intern(s0, trans, goal)
+    
+    transs = [trans, flip_transitions(trans)]
+    trees = [SearchTree(), SearchTree()]
+    seen = [{s0: trees[0].add(s0)}, {g: trees[1].add(g) for g in goal}]
+    frontiers = [[s0], list(seen[1])]
+    
+    visited = 0
+    peak = len(frontiers[0]) + len(frontiers[1])
+    meet = None
+    
+    if s0 in goal:
+        meet = (seen[0][s0], seen[1][s0])
+    
+    result.phase('setup')
+    
+    while meet is None and frontiers[0] and frontiers[1]:
+        i = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+        
+        tree, own, other = trees[i], seen[i], seen[1 - i]
+        depths = trees[1 - i].depths
+        
+        frontier = []
+        
+        for s in frontiers[i]:
+            visited += 1
+            n = own[s]
+            
+            for m, _ in transs[i].get(s, []):
+                if m in own:
+                    continue
+                
+                own[m] = tree.add(m, n)
+                frontier.append(m)
+                
+                if m in other and (meet is None or
+                                   depths[other[m]] < depths[meet[1]]):
+                    meet = (own[m], other[m])
+        
+        frontiers[i] = frontier
+        peak = max(peak, len(frontiers[0]) + len(frontiers[1]))
+        
+        if meet is not None and i == 1:
+            meet = (meet[1], meet[0])
+    
+    generated = len(trees[0]) + len(trees[1])
+    
+    if meet is None:
+        return result.finish(reporter, None, visited, None, generated, peak)
+    
+    path = _path(trans, trees[0], meet[0])
+    path += reversed(_path(trans, trees[1], meet[1])[:-1])
+    
+    return result.finish(reporter, path, visited, None, generated, peak)
+
+
+def biastar(s0, trans, goal, h, h_back=None, queue=None, reporter=None,
+            counters=True):
+    """Performs a bidirectional A* search.
+
+    Performs an A* search from state s0 and a backward A* search from all goal
+    states at the same time, always expanding the side with the smaller open
+    list. Search stops when the best path found through a state reached from
+    both sides is not more expensive than the lowest estimate on either open
+    list. Search also reports the results to reporter.
+
+    Args:
+        s0: String representing the name of the starting state.
+        trans: A dictionary containing list of possible transitions and their
+            costs for each key that represents the state name. It is
+            reversed using util.flip_transitions.
+        goal: A list of goal state names.
+        h: Heuristic function estimating cost from a state to the goal states.
+        h_back: Heuristic function estimating cost from s0 to a state, or None
+            to use no heuristic in the backward search.
+        queue: String 'heap' or 'bucket' selecting the priority queue, or
+            None to select it from the costs and the heuristic, see
+            util.priority_queue.
+        reporter: A Reporter that receives the search output, such as PRINT,
+            or None to discard it.
+        counters: A boolean indicating whether counters are collected.
+
+    Returns:
+        A SearchResult with the path from s0 to one of the goal states, or
+        with path None if the path is not found. Its frontier is the largest
+        total size of both open lists.
+    
+    """
+    result, reporter = SearchResult.start('biastar', reporter, counters)
+    
+    opens = [priority_queue(trans, queue, h), priority_queue(trans, queue, h_back)]
+    
+    if h_back is None:
+        h_back = lambda s: 0.
+    else:
+        h_back = result.count(h_back)
+        
+        if isinstance(trans, Graph):
+            h_back = interned_heuristic(h_back, trans.names)
+    
+    s0, goal, h = _intern(s0, trans, goal, result.count(h))
+    
+    transs = [trans, flip_transitions(trans)]
+    hcs = [_child_heuristic(trans, h), _child_heuristic(trans, h_back)]
+    trees = [SearchTree(), SearchTree()]
+    nodes = [{s0: trees[0].add(s0, h=h(s0))}, {}]
+    closeds = [{}, {}]
+    
+    opens[0].push(s0, 0.)
+    for g in goal:
+        nodes[1][g] = trees[1].add(g, h=h_back(g))
+        opens[1].push(g, 0.)
+    
+    best = float('inf')
+    meet = None
+    peak = len(opens[0]) + len(opens[1])
+    reopened = 0
+    
+    if s0 in goal:
+        best, meet = 0., (nodes[0][s0], nodes[1][s0])
+    
+    result.phase('setup')
+    
+    while opens[0] and opens[1]:
+        if max(opens[0].peek()[1], opens[1].peek()[1]) >= best:
+            break
+        
+        i = 0 if len(opens[0]) <= len(opens[1]) else 1
+        
+        tree, own, closed = trees[i], nodes[i], closeds[i]
+        other, other_costs = nodes[1 - i], trees[1 - i].costs
+        
+        s, _ = opens[i].pop()
+        n = own[s]
+        cs = tree.costs[n]
+        
+        closed[s] = cs
+        
+        for m, c in transs[i].get(s, []):
+            cm = cs + c
+            
+            if m in closed and closed[m] <= cm:
+                continue
+            
+            if m in opens[i] and tree.costs[own[m]] <= cm:
+                continue
+            
+            if m in own:
+                hm = tree.heuristics[own[m]]
+            else:
+                hm = hcs[i](s, tree.heuristics[n], m)
+            
+            if m in closed:
+                reopened += 1
+            
+            own[m] = tree.add(m, n, cm, hm)
+            opens[i].push(m, cm + hm)
+            
+            if m in other and cm + other_costs[other[m]] < best:
+                best = cm + other_costs[other[m]]
+                meet = (own[m], other[m]) if i == 0 else (other[m], own[m])
+        
+        if len(opens[0]) + len(opens[1]) > peak:
+            peak = len(opens[0]) + len(opens[1])
+    
+    visited = len(closeds[0]) + len(closeds[1])
+    generated = len(trees[0]) + len(trees[1])
+    
+    if meet is None:
+        return result.finish(reporter, None, visited, None, generated, peak,
+                             reopened)
+    
+    path = _path(trans, trees[0], meet[0])
+    path += reversed(_path(trans, trees[1], meet[1])[:-1])
+    
+    return result.finish(reporter, path, visited, best, generated, peak,
+                         reopened)
+
+
+def _jump_directions(grid, p, parent):
+    """Returns (row, column) steps in which jump point search scans from the
+    cell at position p entered from the cell at position parent.
+
+    All moves are scanned from the starting cell. Otherwise the direction of
+    the parent is continued, together with turns that an optimal path may
+    take around blocked cells.
+    
+    """
+    cells, w = grid.cells, grid.stride
+    
+    if parent is None:
+        steps = [(-1, 0), (1, 0), (0, -1), (0, 1)]
         
-        closed[n.s] = n.c
+        if grid.diagonal:
+            steps += [(dr, dc) for dr in (-1, 1) for dc in (-1, 1)
+                      if cells[p + dr * w] and cells[p + dc]]
         
-        if n.s in goal:
-            path = n.path()
-            print_search_results(path, len(closed), n.c)
-            return path
+        return steps
+    
+    dr = (p // w > parent // w) - (p // w < parent // w)
+    dc = (p % w > parent % w) - (p % w < parent % w)
+    
+    if not grid.diagonal:
+        if dc:
+            return [(-1, 0), (1, 0), (0, dc)]
+        return [(0, -1), (0, 1), (dr, 0)]
+    
+    if dr and dc:
+        steps = [(dr, 0), (0, dc)]
+        if cells[p + dr * w] and cells[p + dc]:
+            steps.append((dr, dc))
+        return steps
+    
+    if dc:
+        steps = [(-1, 0), (1, 0), (0, dc)]
+        if cells[p + dc]:
+            steps += [(dr, dc) for dr in (-1, 1) if cells[p + dr * w]]
+        return steps
+    
+    steps = [(0, -1), (0, 1), (dr, 0)]
+    if cells[p + dr * w]:
+        steps += [(dr, dc) for dc in (-1, 1) if cells[p + dc]]
+    return steps
+
+
+def _jump_diagonal(cells, w, goals, p, dr, dc):
+    """Scans from the cell at position p in steps (dr, dc) on a grid with
+    diagonal moves and returns position of the first jump point, or -1.
+
+    A cell is a jump point if it is a goal, if an orthogonal scan finds a
+    cell whose optimal path must turn there around a blocked cell, or if a
+    diagonal scan from it finds a jump point with an orthogonal scan.
+    
+    """
+    step = dr * w + dc
+    
+    while cells[p]:
+        if p in goals:
+            return p
         
-        for m, c in trans.get(n.s, []):
-            if m not in closed or closed[m] > n.c + c:
-                open.push(Node(m, n.d + 1, n, n.c + c, h(m)))
+        if dr and dc:
+            if _jump_diagonal(cells, w, goals, p + dc, 0, dc) >= 0 or \
+                    _jump_diagonal(cells, w, goals, p + dr * w, dr, 0) >= 0:
+                return p
+            
+            if not (cells[p + dc] and cells[p + dr * w]):
+                return -1
+        elif dc:
+            if cells[p - w] and not cells[p - w - dc] or \
+                    cells[p + w] and not cells[p + w - dc]:
+                return p
+        elif cells[p - 1] and not cells[p - 1 - step] or \
+                cells[p + 1] and not cells[p + 1 - step]:
+            return p
+        
+        p += step
+    
+    return -1
+
+
+def _jump_orthogonal(cells, w, goals, p, dr, dc):
+    """Scans from the cell at position p in steps (dr, dc) on a grid without
+    diagonal moves and returns position of the first jump point, or -1.
+
+    A cell is a jump point if it is a goal, if its optimal path must turn
+    there around a blocked cell, or if it is scanned vertically and a
+    horizontal scan from it finds a jump point.
     
-    print('Path not found.')
+    """
+    step = dr * w + dc
+    
+    while cells[p]:
+        if p in goals:
+            return p
+        
+        if dc:
+            if cells[p - w] and not cells[p - w - dc] or \
+                    cells[p + w] and not cells[p + w - dc]:
+                return p
+        else:
+            if cells[p - 1] and not cells[p - 1 - step] or \
+                    cells[p + 1] and not cells[p + 1 - step]:
+                return p
+            
+            if _jump_orthogonal(cells, w, goals, p - 1, 0, -1) >= 0 or \
+                    _jump_orthogonal(cells, w, goals, p + 1, 0, 1) >= 0:
+                return p
+        
+        p += step
     
-    return None
+    return -1
+
+
+def _grid_path(grid, jump_points):
+    """Returns names of all cells on the straight lines between consecutive
+    jump points given by their positions."""
+    w = grid.stride
+    path = [grid.name(jump_points[0])]
+    
+    for p, m in zip(jump_points, jump_points[1:]):
+        dr = (m // w > p // w) - (m // w < p // w)
+        dc = (m % w > p % w) - (m % w < p % w)
+        
+        while p != m:
+            p += dr * w + dc
+            path.append(grid.name(p))
+    
+    return path
+
+
+def _ratio(cost, lower):
+    """Returns the suboptimality bound of a path of given cost if the optimal
+    cost is at least lower."""
+    if lower >= cost:
+        return 1.
+    
+    return cost / lower if lower > 0 else float('inf')
+
+
+def _child_heuristic(trans, h):
+    """Returns a function (s, hs, m) giving heuristic value of successor m of
+    state s with heuristic value hs.
+
+    Heuristic values are computed incrementally from the parent if successors
+    are generated by a SlidingPuzzle and the heuristic supports it.
+    
+    """
+    if isinstance(trans, SlidingPuzzle) and getattr(h, 'incremental', False):
+        return h.child
+    
+    return lambda s, hs, m: h(m)
+
+
+def _batch_heuristic(trans, h):
+    """Returns a function (s, hs, M) giving a list of heuristic values of
+    successors M of state s with heuristic value hs.
+
+    All successors are scored in one heuristic.evaluate call, or
+    incrementally from the parent as in _child_heuristic.
+    
+    """
+    if isinstance(trans, SlidingPuzzle) and getattr(h, 'incremental', False):
+        return lambda s, hs, M: [h.child(s, hs, m) for m in M]
+    
+    return lambda s, hs, M: evaluate(h, M)
+
+
+def _intern(s0, trans, goal, h=None):
+    """Translates search arguments to state ids if trans is a Graph."""
+    if isinstance(trans, Graph):
+        return trans.intern(s0, goal, h)
+    
+    return s0, goal, h
+
+
+def _path(trans, tree, n):
+    """Returns path to node n with state ids mapped back to state names."""
+    return _names(trans, tree.path(n))
+
+
+def _names(trans, path):
+    """Returns path with state ids mapped back to state names."""
+    if isinstance(trans, Graph):
+        names = trans.names
+        path = [names[s] for s in path]
+    
+    return path
 
 
 def print_search_results(path, visited, cost=None):
@@ -428,7 +1507,26 @@ def print_search_results(path, visited, cost=None):
     print(' =>\n'.join(path))
 
 
-def dijkstra(start_states, trans):
+def print_search_stats(result):
+    """Prints performance counters and phase times of a search result.
+    
+    Args:
+        result: A SearchResult.
+    
+    """
+    print('Expanded = {}, generated = {}, reopened = {}, max frontier = {}, '
+          'heuristic calls = {}'.format(result.expanded, result.generated,
+                                        result.reopened, result.max_frontier,
+                                        result.heuristic_calls))
+    print('Time: ' + ', '.join('{} {:.3f} ms'.format(phase, 1000 * t)
+                               for phase, t in result.times.items()))
+    
+    if result.metrics:
+        print('Metrics: ' + ', '.join('{} = {}'.format(name, value)
+                                      for name, value in result.metrics.items()))
+
+
+def dijkstra(start_states, trans, queue=None):
     """Performs a dijsktra search.
 
     Performs a dijkstra search starting from states in start_states and trying
@@ -437,41 +1535,41 @@ def dijkstra(start_states, trans):
     Args:
         start_states: A list of starting states' names.
         trans: A dictionary containing list of possible transitions and their
-            costs for each key that represents the state name.
+            costs for each key that represents the state name, or a Graph.
+        queue: String 'heap' or 'bucket' selecting the priority queue, or
+            None to select it from the costs of the state space.
 
     Returns:
         A dictionary representing the cost to get to each state from the
         closest starting state.
     
     """
+    graph = isinstance(trans, Graph)
+    if graph:
+        start_states = [trans.index[s] for s in start_states if s in trans.index]
+    
     costs = {}
     
-    open = PriorityQueue()
+    open = priority_queue(trans, queue)
     
     visited = set()
     
     for s0 in start_states:
         costs[s0] = 0.
-        open.push((0., s0))
+        open.push(s0, 0.)
     
     while open:
-        d, n = open.pop()
-        
-        if n in visited:
-            continue
+        n, d = open.pop()
         
         visited.add(n)
         
-        if n not in costs:
-            costs[n] = float('inf')
-        
         for m, c in trans.get(n, []):
-            if m not in costs:
-                costs[m] = float('inf')
-            
-            if costs[n] + c < costs[m]:
-                costs[m] = costs[n] + c
-                open.push((costs[m], m))
+            if m not in visited and open.push(m, d + c):
+                costs[m] = d + c
+    
+    if graph:
+        names = trans.names
+        costs = {names[s]: c for s, c in costs.items()}
     
     return costs
 
@@ -0,0 +1,321 @@
+"""Search query server.
+
+A module that keeps named state spaces loaded in memory and answers search
+queries sent over a Unix socket or a TCP port. Connections are handled by an
+asyncio event loop and searches run in a pool of worker processes, each of
+which loads all state spaces once at startup, so a slow query does not block
+the others.
+
+Queries and results are JSON lines as described in the batch module. A query
+also names the state space in its space key, which may be left out when the
+server has only one. Results of queries sent over one connection are written
+as soon as they are ready, so they may come in a different order than the
+queries, and carry the query id. A query {"stats": true} returns the number
+of answered requests, throughput and latency percentiles instead.
+
+It is run as a program, for example:
+
+    python3 server.py istra=maps/istra.txt,maps/istra_heuristic.txt \\
+        puzzle=puzzle:867_254_3x1,l1 --unix /tmp/search.sock
+
+"""
+
+import asyncio
+import json
+import os
+import signal
+import sys
+from argparse import ArgumentParser
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from math import ceil
+from time import perf_counter
+
+from batch import BatchSolver, parse_query
+
+
+def percentile(values, q):
+    """Returns the q-th percentile of values using the nearest rank method.
+
+    Args:
+        values: A sorted list of numbers.
+        q: A number between 0 and 100.
+
+    Returns:
+        The smallest value that is not smaller than q percent of values, or
+        None if values are empty.
+
+    """
+    if not values:
+        return None
+
+    return values[max(0, min(len(values), ceil(q / 100 * len(values))) - 1)]
+
+
+def parse_space(spec, **settings):
+    """Parses a state space given on the command line.
+
+    Args:
+        spec: String NAME=SOURCE[,HEURISTIC] where SOURCE is a path to a state
+            space file, puzzle:<start state> for a generated sliding puzzle or
+            grid:<path> for a grid map, and HEURISTIC selects the heuristic as
+            main.py -e.
+        settings: Other arguments of batch.BatchSolver.load.
+
+    Returns:
+        A tuple (name, settings) with arguments of batch.BatchSolver.load.
+
+    Raises:
+        ValueError: If the spec has no name.
+
+    """
+    name, sep, source = spec.partition('=')
+    if not sep or not name:
+        raise ValueError('State space {} has no name.'.format(spec))
+
+    source, _, heuristic = source.partition(',')
+
+    puzzle = source.startswith('puzzle:')
+    if puzzle:
+        source = source[len('puzzle:'):]
+
+    grid = source.startswith('grid:')
+    if grid:
+        source = source[len('grid:'):]
+
+    return name, dict(settings, ss=source, puzzle=puzzle, grid=grid,
+                      heuristic=heuristic or None)
+
+
+_solvers = {}
+
+
+def _init_worker(spaces):
+    """Loads all state spaces in a worker process.
+
+    Workers ignore interrupts, which are handled by the server process.
+
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    with redirect_stdout(sys.stderr):
+        for name, settings in spaces.items():
+            _solvers[name] = BatchSolver.load(**settings)
+
+
+def _answer(space, query):
+    """Answers a query in a worker process."""
+    return _solvers[space].answer(query)
+
+
+def _ready():
+    """Does nothing, used to start worker processes."""
+
+
+class QueryServer():
+    """Server answering search queries on resident state spaces.
+
+    Attributes:
+        spaces: A dictionary mapping state space names to arguments of
+            batch.BatchSolver.load.
+        jobs: An integer representing the number of worker processes.
+        requests: An integer representing the number of answered requests.
+        latencies: A deque with latencies of the most recent requests in
+            seconds, measured from receiving a query to writing its result.
+        started: Time when the server started, as given by perf_counter.
+    """
+
+    def __init__(self, spaces, jobs=None, window=100000):
+        """Inits QueryServer with state spaces and number of workers.
+
+        Args:
+            spaces: A dictionary mapping state space names to arguments of
+                batch.BatchSolver.load.
+            jobs: An integer representing the number of worker processes, or
+                None to use one per processor.
+            window: An integer representing the number of most recent
+                latencies kept for percentiles.
+
+        """
+        self.spaces = spaces
+        self.jobs = jobs or os.cpu_count()
+        self.requests = 0
+        self.latencies = deque(maxlen=window)
+        self.started = perf_counter()
+        self.pool = None
+
+    async def serve(self, host='127.0.0.1', port=8765, path=None,
+                    report=10.):
+        """Loads state spaces and answers queries until cancelled.
+
+        Args:
+            host: String representing the TCP host to listen on.
+            port: An integer representing the TCP port to listen on.
+            path: String representing a Unix socket path to listen on instead
+                of a TCP port, or None.
+            report: A float representing the number of seconds between
+                statistics printed to standard error, or 0 for none.
+
+        """
+        loop = asyncio.get_running_loop()
+
+        self.pool = ProcessPoolExecutor(self.jobs, initializer=_init_worker,
+                                        initargs=(self.spaces,))
+
+        with self.pool:
+            await asyncio.gather(*(loop.run_in_executor(self.pool, _ready)
+                                   for _ in range(self.jobs)))
+
+            if path:
+                server = await asyncio.start_unix_server(self.handle, path)
+            else:
+                server = await asyncio.start_server(self.handle, host, port)
+
+            print('Serving {} on {}.'.format(
+                ', '.join(self.spaces), path or '{}:{}'.format(host, port)),
+                file=sys.stderr)
+
+            self.started = perf_counter()
+
+            try:
+                async with server:
+                    if report:
+                        await asyncio.gather(server.serve_forever(),
+                                             self.report(report))
+                    else:
+                        await server.serve_forever()
+            finally:
+                self.print_stats()
+
+                if path and os.path.exists(path):
+                    os.remove(path)
+
+    async def report(self, interval):
+        """Prints statistics every interval seconds if there were requests."""
+        last = self.requests
+
+        while True:
+            await asyncio.sleep(interval)
+
+            if self.requests != last:
+                last = self.requests
+                self.print_stats()
+
+    async def handle(self, reader, writer):
+        """Answers queries from one connection."""
+        tasks = set()
+
+        async def respond(line, begin):
+            result = await self.answer(line)
+
+            try:
+                writer.write(json.dumps(result).encode() + b'\n')
+                await writer.drain()
+            except ConnectionError:
+                return
+
+            if 'stats' not in result:
+                self.requests += 1
+                self.latencies.append(perf_counter() - begin)
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+
+                if line.strip():
+                    task = asyncio.create_task(respond(line, perf_counter()))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+
+            if tasks:
+                await asyncio.gather(*tasks)
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def answer(self, line):
+        """Returns the result of a query given as a JSON line."""
+        try:
+            query = parse_query(line)
+        except ValueError as e:
+            return {'id': None, 'error': str(e)}
+
+        if query.get('stats'):
+            return {'stats': self.stats()}
+
+        space = query.get('space')
+        if space is None and len(self.spaces) == 1:
+            space = next(iter(self.spaces))
+
+        if space not in self.spaces:
+            return {'id': query.get('id'),
+                    'error': 'Unknown state space {}.'.format(space)}
+
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(self.pool, _answer, space, query)
+        result['space'] = space
+
+        return result
+
+    def stats(self):
+        """Returns a dictionary with request count, throughput in requests per
+        second and 50th and 99th percentile of latency in milliseconds."""
+        elapsed = perf_counter() - self.started
+        latencies = sorted(self.latencies)
+
+        ms = lambda t: None if t is None else round(t * 1000, 3)
+
+        return {'requests': self.requests,
+                'throughput': round(self.requests / elapsed, 3) if elapsed else 0.,
+                'p50_ms': ms(percentile(latencies, 50)),
+                'p99_ms': ms(percentile(latencies, 99))}
+
+    def print_stats(self):
+        """Prints statistics to standard error."""
+        stats = self.stats()
+
+        print('Requests: {}, throughput: {} /s, latency p50: {} ms, '
+              'p99: {} ms'.format(stats['requests'], stats['throughput'],
+                                  stats['p50_ms'], stats['p99_ms']),
+              file=sys.stderr)
+
+
+def main():
+    """Parses command line arguments and runs the server."""
+    parser = ArgumentParser('answer search queries on resident state spaces')
+    parser.add_argument('spaces', nargs='+', help='state spaces as NAME=SOURCE[,HEURISTIC], SOURCE is a path, puzzle:<start state> or grid:<path>')
+    parser.add_argument('-a', '--algorithm', type=str, help='default search algorithm of queries')
+    parser.add_argument('-j', '--jobs', type=int, help='number of worker processes, one per processor by default')
+    parser.add_argument('--unix', type=str, help='path to a Unix socket to listen on instead of a TCP port')
+    parser.add_argument('--host', type=str, default='127.0.0.1', help='TCP host to listen on')
+    parser.add_argument('--port', type=int, default=8765, help='TCP port to listen on')
+    parser.add_argument('--report', type=float, default=10., help='seconds between printed statistics, 0 for none')
+    parser.add_argument('--compact', action='store_true', help='store state spaces as compact integer graphs')
+    parser.add_argument('--no-cache', action='store_true', help='do not use binary snapshots of loaded files')
+    parser.add_argument('-q', '--queue', type=str, choices=['heap', 'bucket'], help='priority queue for ucs and astar, selected from costs by default')
+    parser.add_argument('-r', '--result-cache', type=str, help='directory where search results are kept and reused')
+    parser.add_argument('-m', '--memoize', type=int, help='remember heuristic values of given number of recently seen states')
+
+    args = parser.parse_args()
+
+    spaces = dict(parse_space(spec, compact=args.compact,
+                              algorithm=args.algorithm, queue=args.queue,
+                              memoize=args.memoize, cache=not args.no_cache,
+                              results=args.result_cache)
+                  for spec in args.spaces)
+
+    server = QueryServer(spaces, args.jobs)
+
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.unix, args.report))
+    except KeyboardInterrupt:
+        pass
+
+
+# run if program is called as main program
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,219 @@
+"""Binary snapshots of parsed state spaces and heuristics.
+
+A module that stores parsed state spaces and heuristics in versioned binary
+files next to their source files. A snapshot is keyed by the path, size and
+modification time of its source file and is memory-mapped when loaded, so
+that the source file does not have to be parsed again.
+
+"""
+
+import os
+import struct
+from contextlib import suppress
+from array import array
+from mmap import mmap, ACCESS_READ
+
+from graph import Graph
+
+
+SNAPSHOT_VERSION = 1
+SNAPSHOT_SUFFIX = '.snap'
+
+_MAGIC = b'SSNAP\x00\x00\x00'
+_HEADER = struct.Struct('<8sIcxxxqqq')
+_STATE_SPACE = struct.Struct('<qqqqq')
+_HEURISTIC = struct.Struct('<qq')
+
+
+def snapshot_path(fname):
+    """Returns path of the snapshot file belonging to the given file."""
+    return fname + SNAPSHOT_SUFFIX
+
+
+def _source_key(fname):
+    """Returns (path, size, mtime) identifying current version of a file."""
+    st = os.stat(fname)
+    return os.path.abspath(fname).encode(), st.st_size, st.st_mtime_ns
+
+
+def _pad(n):
+    """Returns n rounded up to a multiple of 8."""
+    return (n + 7) & ~7
+
+
+def _write(fname, kind, chunks):
+    """Writes a snapshot of the given kind made of given byte chunks.
+
+    Each chunk is padded to 8 bytes so that arrays can be memory-mapped
+    without copying. Snapshot is first written to a temporary file and then
+    moved in place. Errors are ignored because snapshots are only a cache.
+
+    """
+    snap = snapshot_path(fname)
+    tmp = '{}.{}.tmp'.format(snap, os.getpid())
+
+    try:
+        path, size, mtime = _source_key(fname)
+
+        with open(tmp, 'wb') as f:
+            for chunk in [_HEADER.pack(_MAGIC, SNAPSHOT_VERSION, kind, size,
+                                       mtime, len(path)), path] + chunks:
+                f.write(chunk)
+                f.write(bytes(_pad(len(chunk)) - len(chunk)))
+
+        os.replace(tmp, snap)
+    except OSError:
+        with suppress(OSError):
+            os.remove(tmp)
+
+
+def _open(fname, kind):
+    """Memory-maps a snapshot of the given kind if it is up to date.
+
+    Returns:
+        A tuple (view, offset) where view is a memoryview of the whole
+        snapshot and offset points to the first byte after the header, or None
+        if there is no valid snapshot for the current version of the file.
+
+    """
+    try:
+        path, size, mtime = _source_key(fname)
+
+        with open(snapshot_path(fname), 'rb') as f:
+            mm = mmap(f.fileno(), 0, access=ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    view = memoryview(mm)
+
+    if len(view) < _HEADER.size:
+        return None
+
+    magic, version, k, s_size, s_mtime, path_len = _HEADER.unpack_from(view)
+    offset = _pad(_HEADER.size)
+
+    if (magic, version, k, s_size, s_mtime) != \
+            (_MAGIC, SNAPSHOT_VERSION, kind, size, mtime) or \
+            bytes(view[offset:offset + path_len]) != path:
+        return None
+
+    return view, offset + _pad(path_len)
+
+
+def _strings(view, offset, length):
+    """Returns a list of strings stored as newline separated utf-8 text."""
+    if not length:
+        return [], offset
+
+    text = str(view[offset:offset + length], 'utf-8')
+
+    return text.split('\n'), offset + _pad(length)
+
+
+def _cast(view, offset, fmt, n):
+    """Returns a memoryview of n items of given format starting at offset."""
+    size = array(fmt).itemsize * n
+
+    return view[offset:offset + size].cast(fmt), offset + _pad(size)
+
+
+def save_state_space(fname, s0, graph, goal):
+    """Writes a snapshot of a state space loaded from a file.
+
+    Args:
+        fname: String representing path to a file containing state space.
+        s0: Starting state name as string.
+        graph: A Graph containing the transitions of the state space.
+        goal: A list of goal state names.
+
+    """
+    names = '\n'.join(graph.names).encode()
+    meta = '\n'.join([s0] + list(goal)).encode()
+
+    _write(fname, b'S', [
+        _STATE_SPACE.pack(len(graph.names), graph.sources,
+                          len(graph.targets), len(names), len(meta)),
+        names, meta,
+        array('q', graph.offsets).tobytes(),
+        array('q', graph.targets).tobytes(),
+        array('d', graph.costs).tobytes(),
+    ])
+
+
+def load_state_space(fname):
+    """Loads a state space from its snapshot.
+
+    Args:
+        fname: String representing path to a file containing state space.
+
+    Returns:
+        A tuple (s0, graph, goal) as stored by save_state_space, where arrays
+        of the graph are memory-mapped from the snapshot, or None if there is
+        no valid snapshot for the current version of the file.
+
+    """
+    opened = _open(fname, b'S')
+
+    if opened is None:
+        return None
+
+    view, offset = opened
+
+    n, sources, edges, names_len, meta_len = \
+        _STATE_SPACE.unpack_from(view, offset)
+    offset += _pad(_STATE_SPACE.size)
+
+    names, offset = _strings(view, offset, names_len)
+    meta, offset = _strings(view, offset, meta_len)
+    offsets, offset = _cast(view, offset, 'q', n + 1)
+    targets, offset = _cast(view, offset, 'q', edges)
+    costs, offset = _cast(view, offset, 'd', edges)
+
+    return meta[0], Graph(names, sources, offsets, targets, costs), \
+        set(meta[1:])
+
+
+def save_heuristic(fname, heuristic):
+    """Writes a snapshot of a heuristic loaded from a file.
+
+    Args:
+        fname: String representing path to a file containing heuristic
+            function.
+        heuristic: A dictionary mapping state names to heuristic values.
+
+    """
+    names = '\n'.join(heuristic).encode()
+
+    _write(fname, b'H', [
+        _HEURISTIC.pack(len(heuristic), len(names)),
+        names,
+        array('d', heuristic.values()).tobytes(),
+    ])
+
+
+def load_heuristic(fname):
+    """Loads a heuristic from its snapshot.
+
+    Args:
+        fname: String representing path to a file containing heuristic
+            function.
+
+    Returns:
+        A dictionary mapping state names to heuristic values, or None if there
+        is no valid snapshot for the current version of the file.
+
+    """
+    opened = _open(fname, b'H')
+
+    if opened is None:
+        return None
+
+    view, offset = opened
+
+    n, names_len = _HEURISTIC.unpack_from(view, offset)
+    offset += _pad(_HEURISTIC.size)
+
+    names, offset = _strings(view, offset, names_len)
+    values, offset = _cast(view, offset, 'd', n)
+
+    return dict(zip(names, values))
@@ -0,0 +1,334 @@
+"""Implicit state spaces given by successor functions.
+
+A module that provides state spaces whose transitions are generated lazily
+during the search instead of being loaded from a file. Such state spaces can
+be used by search algorithms in place of a transitions dictionary. Sliding
+puzzles and grid maps are provided.
+
+"""
+
+from math import factorial, sqrt
+
+from util import Transitions
+
+
+SQRT2 = sqrt(2)
+
+
+class SuccessorProvider():
+    """Implicit state space.
+
+    Base class for state spaces that generate transitions of a state only when
+    they are requested. Subclasses implement the successors method.
+
+    """
+
+    def successors(self, s):
+        """Returns a list of (state name, cost) transitions from state s."""
+        raise NotImplementedError
+
+    def get(self, s, default=()):
+        """Returns transitions from state s.
+
+        Mirrors dict.get so that a provider can be used in place of a
+        transitions dictionary.
+
+        """
+        return self.successors(s)
+
+
+class SlidingPuzzle(SuccessorProvider):
+    """N x N sliding puzzle.
+
+    Generates states of a sliding puzzle in the same notation as the loaded
+    puzzle maps, e.g. 123_456_78x for 3 x 3 puzzle. Rows are separated by '_',
+    tiles are single characters from TILES and the blank is 'x'. Every move of
+    the blank costs 1.
+
+    Attributes:
+        n: An integer representing the number of rows and columns.
+        cost_bound: The largest transition cost, see util.Transitions.
+    """
+
+    TILES = '123456789ABCDEFGHIJKLMNOPQRSTUVWYZ'
+    BLANK = 'x'
+
+    cost_bound = 1
+
+    def __init__(self, n=3):
+        """Inits SlidingPuzzle with n rows and columns."""
+        if not 2 <= n or n * n - 1 > len(self.TILES):
+            raise ValueError('Unsupported puzzle size {}.'.format(n))
+
+        self.n = n
+
+    @classmethod
+    def from_state(cls, state):
+        """Returns a puzzle whose size matches the given state name."""
+        return cls(state.count('_') + 1)
+
+    def goal(self):
+        """Returns the name of the solved state."""
+        tiles = self.TILES[:self.n * self.n - 1] + self.BLANK
+
+        return '_'.join(tiles[i:i + self.n]
+                        for i in range(0, len(tiles), self.n))
+
+    def successors(self, s):
+        """Returns a list of (state name, cost) transitions from state s."""
+        n = self.n
+        w = n + 1
+        b = s.index(self.BLANK)
+        c = b % w
+
+        moves = []
+
+        if b >= w:
+            moves.append(b - w)
+        if b + w < len(s):
+            moves.append(b + w)
+        if c > 0:
+            moves.append(b - 1)
+        if c < n - 1:
+            moves.append(b + 1)
+
+        result = []
+
+        for t in moves:
+            i, j = (t, b) if t < b else (b, t)
+            result.append((s[:i] + s[j] + s[i + 1:j] + s[i] + s[j + 1:], 1.))
+
+        return result
+
+    def reversed(self):
+        """Returns the reversed state space, which is the puzzle itself."""
+        return self
+
+    def solvable(self, s):
+        """Returns whether the solved state can be reached from state s.
+
+        Uses the parity of inversions of tiles and, for even sizes, of the
+        row of the blank.
+
+        """
+        tiles = s.replace('_', '')
+        order = {t: i for i, t in enumerate(self.TILES)}
+        seq = [order[t] for t in tiles if t != self.BLANK]
+
+        inversions = sum(1 for i in range(len(seq))
+                         for j in range(i + 1, len(seq)) if seq[i] > seq[j])
+
+        if self.n % 2:
+            return inversions % 2 == 0
+
+        blank_row = tiles.index(self.BLANK) // self.n
+
+        return (inversions + self.n - 1 - blank_row) % 2 == 0
+
+    def states(self):
+        """Returns the number of states reachable from the solved state."""
+        return factorial(self.n * self.n) // 2
+
+    def transitions(self):
+        """Returns the number of transitions between reachable states."""
+        n = self.n
+        return factorial(n * n - 1) // 2 * 4 * n * (n - 1)
+
+
+class GridMap(SuccessorProvider):
+    """Grid map with uniform costs.
+
+    Generates moves between passable cells of a grid. States are named
+    'row_column' after their cell. Moves to orthogonal neighbors cost 1 and,
+    if diagonal moves are allowed, moves to diagonal neighbors cost sqrt(2).
+    A diagonal move is allowed only if both orthogonal cells next to it are
+    passable, so paths never cut corners.
+
+    Cells are stored row by row in a bytearray with a border of blocked
+    cells around the grid, so neighbors of any cell can be looked up without
+    bounds checks.
+
+    Attributes:
+        width: An integer representing the number of columns.
+        height: An integer representing the number of rows.
+        diagonal: A boolean indicating whether diagonal moves are allowed.
+        cells: A bytearray with 1 for passable and 0 for blocked cells,
+            including the border.
+        stride: An integer representing the length of a row in cells.
+        cost_bound: The largest transition cost, see util.Transitions.
+    """
+
+    PASSABLE = '.GS'
+    BLOCKED = '@'
+
+    def __init__(self, rows, diagonal=True):
+        """Inits GridMap from a list of equally long strings, one per row.
+
+        Characters in PASSABLE mark passable cells, any other blocked ones.
+
+        """
+        self.height = len(rows)
+        self.width = len(rows[0]) if rows else 0
+        self.diagonal = diagonal
+        self.stride = self.width + 2
+        self.cost_bound = None if diagonal else 1
+
+        self.cells = bytearray(self.stride * (self.height + 2))
+
+        for r, row in enumerate(rows):
+            if len(row) != self.width:
+                raise ValueError('Row {} of the grid has length {} instead '
+                                 'of {}.'.format(r, len(row), self.width))
+
+            p = (r + 1) * self.stride + 1
+            self.cells[p:p + self.width] = bytes(
+                1 if t in self.PASSABLE else 0 for t in row)
+
+    @classmethod
+    def from_transitions(cls, trans):
+        """Detects a grid map in a state space.
+
+        A state space is a grid map if all state names are 'row_column', all
+        transitions are moves to neighboring cells with costs of GridMap,
+        and every state has every move a grid of its states would allow.
+
+        Args:
+            trans: A dictionary containing list of possible transitions and
+                their costs for each key that represents the state name, or a
+                Graph.
+
+        Returns:
+            A GridMap with the same states and transitions, or None if the
+            state space is not a grid map.
+
+        """
+        if hasattr(trans, 'to_transitions'):
+            trans = trans.to_transitions()
+
+        cells = set()
+        diagonal = False
+
+        for s in trans:
+            rc = _coordinates(s)
+            if rc is None:
+                return None
+
+            cells.add(rc)
+
+            for m, c in trans[s]:
+                rm = _coordinates(m)
+                if rm is None:
+                    return None
+
+                dr, dc = abs(rm[0] - rc[0]), abs(rm[1] - rc[1])
+
+                if dr + dc == 1 and c == 1:
+                    pass
+                elif dr == dc == 1 and abs(c - SQRT2) < 1e-9:
+                    diagonal = True
+                else:
+                    return None
+
+                cells.add(rm)
+
+        if not cells:
+            return None
+
+        height = max(r for r, _ in cells) + 1
+        width = max(c for _, c in cells) + 1
+
+        rows = [[cls.BLOCKED] * width for _ in range(height)]
+        for r, c in cells:
+            rows[r][c] = cls.PASSABLE[0]
+
+        grid = cls([''.join(row) for row in rows], diagonal)
+
+        for s in cells:
+            s = '{}_{}'.format(*s)
+            if len(trans.get(s, ())) != len(grid.successors(s)):
+                return None
+
+        return grid
+
+    def cell(self, s):
+        """Returns the position of the cell of state s in cells, or None if
+        s is not a passable cell of the grid."""
+        rc = _coordinates(s)
+        if rc is None:
+            return None
+
+        r, c = rc
+        if r >= self.height or c >= self.width:
+            return None
+
+        p = (r + 1) * self.stride + c + 1
+
+        return p if self.cells[p] else None
+
+    def name(self, p):
+        """Returns the name of the state of the cell at position p in
+        cells."""
+        return '{}_{}'.format(p // self.stride - 1, p % self.stride - 1)
+
+    def successors(self, s):
+        """Returns a list of (state name, cost) transitions from state s."""
+        p = self.cell(s)
+        if p is None:
+            return []
+
+        cells, name = self.cells, self.name
+        w = self.stride
+
+        result = [(name(m), 1.) for m in (p - w, p + w, p - 1, p + 1)
+                  if cells[m]]
+
+        if self.diagonal:
+            for dr in (-w, w):
+                for dc in (-1, 1):
+                    if cells[p + dr] and cells[p + dc] and cells[p + dr + dc]:
+                        result.append((name(p + dr + dc), SQRT2))
+
+        return result
+
+    def reversed(self):
+        """Returns the reversed state space, which is the grid itself."""
+        return self
+
+    def rows(self):
+        """Returns the grid as a list of strings, one per row."""
+        w = self.stride
+
+        return [''.join(self.PASSABLE[0] if self.cells[p] else self.BLOCKED
+                        for p in range(r * w + 1, r * w + 1 + self.width))
+                for r in range(1, self.height + 1)]
+
+    def to_transitions(self):
+        """Returns the grid as a transitions dictionary of its states."""
+        trans = Transitions()
+        trans.cost_bound = self.cost_bound
+
+        for p, free in enumerate(self.cells):
+            if free:
+                s = self.name(p)
+                trans[s] = set(self.successors(s))
+
+        return trans
+
+    def states(self):
+        """Returns the number of passable cells."""
+        return sum(self.cells)
+
+    def transitions(self):
+        """Returns the number of moves between passable cells."""
+        return sum(len(self.successors(self.name(p)))
+                   for p, free in enumerate(self.cells) if free)
+
+
+def _coordinates(s):
+    """Returns (row, column) of a state named 'row_column', or None."""
+    r, sep, c = s.partition('_')
+
+    if not sep or not r.isdigit() or not c.isdigit():
+        return None
+
+    return int(r), int(c)
@@ -0,0 +1,111 @@
+"""Tests of batch search queries."""
+
+import json
+
+import pytest
+
+from batch import BatchSolver, run_batch
+from search import dijkstra
+
+
+@pytest.fixture(scope='module')
+def solver():
+    """Returns a BatchSolver for the istra map with its heuristic."""
+    return BatchSolver.load('maps/istra.txt', algorithm='ucs', cache=False,
+                            heuristic='maps/istra_heuristic.txt')
+
+
+def answer(solver, query):
+    """Answers a query given as a dictionary through JSON lines."""
+    return json.loads(solver.solve_line(json.dumps(query)))
+
+
+@pytest.mark.parametrize('line, id, error', [
+    ('{"id": 1', None, 'Expecting'),
+    ('[1, 2]', None, 'Query is not a JSON object.'),
+    ('{"id": 2, "algorithm": "bogo"}', 2, 'Invalid algorithm bogo.'),
+    ('{"id": 3, "algorithm": "ldfs"}', 3, 'Maximum depth not provided.'),
+])
+def test_invalid_queries_are_reported(solver, line, id, error):
+    result = json.loads(solver.solve_line(line))
+    
+    assert set(result) == {'id', 'error'}
+    assert result['id'] == id
+    assert result['error'].startswith(error)
+
+
+def test_missing_heuristic_is_reported():
+    solver = BatchSolver.load('maps/istra.txt', cache=False)
+    
+    assert answer(solver, {'algorithm': 'astar'})['error'] == \
+        'No heuristic provided.'
+
+
+@pytest.mark.parametrize('algorithm', ['ucs', 'astar', 'arastar', 'biastar',
+                                       'idastar'])
+def test_optimal_algorithms_find_dijkstra_costs(solver, algorithm):
+    for start in ['Pula', 'Umag', 'Motovun', 'Buzet']:
+        result = answer(solver, {'id': start, 'start': start,
+                                 'goals': ['Buzet'], 'algorithm': algorithm})
+        
+        assert result['found'] and result['id'] == start
+        assert result['path'][0] == start and result['path'][-1] == 'Buzet'
+        assert result['cost'] == dijkstra([start], solver.trans)['Buzet']
+
+
+def test_defaults_come_from_state_space(solver):
+    result = answer(solver, {})
+    
+    assert (result['start'], result['goals'], result['algorithm']) == \
+        ('Pula', ['Buzet'], 'ucs')
+    assert result['metrics'] == {}
+    
+    result = answer(solver, {'algorithm': 'arastar'})
+    
+    assert result['metrics']['bound'] == 1.
+    assert result['metrics']['solutions'][-1][0] == result['cost']
+
+
+def test_unknown_start_is_not_found(solver):
+    result = answer(solver, {'start': 'Zagreb'})
+    
+    assert not result['found'] and result['path'] is None
+
+
+def test_puzzle_goals_of_other_parity_are_not_searched():
+    solver = BatchSolver.load('123_456_78x', puzzle=True, algorithm='bfs')
+    
+    result = answer(solver, {'start': '123_456_87x'})
+    
+    assert not result['found'] and result['path'] is None
+
+
+def test_grid_map_queries():
+    solver = BatchSolver.load('maps/grid.txt', grid=True, heuristic='octile')
+    
+    jps = answer(solver, {'algorithm': 'jps'})
+    astar = answer(solver, {'algorithm': 'astar'})
+    
+    assert jps['found'] and jps['cost'] == pytest.approx(astar['cost'])
+    assert answer(solver, {'algorithm': 'ch'})['error'].startswith(
+        'Contraction hierarchies need')
+    
+    solver = BatchSolver.load('maps/istra.txt', cache=False)
+    
+    assert answer(solver, {'algorithm': 'jps'})['error'] == \
+        'Jump point search needs a grid map.'
+
+
+@pytest.mark.parametrize('jobs', [1, 2])
+def test_results_keep_query_order(tmp_path, capsys, jobs):
+    starts = ['Pula', 'Umag', 'Motovun', 'Pazin', 'Rovinj', 'Labin'] * 3
+    fname = tmp_path / 'queries.jsonl'
+    fname.write_text('\n'.join(json.dumps({'id': i, 'start': s})
+                               for i, s in enumerate(starts)) + '\n\n')
+    
+    run_batch(str(fname), jobs, ss='maps/istra.txt', algorithm='ucs',
+              cache=False)
+    
+    results = [json.loads(l) for l in capsys.readouterr().out.splitlines()]
+    assert [r['id'] for r in results] == list(range(len(starts)))
+    assert [r['start'] for r in results] == starts
@@ -0,0 +1,50 @@
+"""Tests of the reproducible benchmark suite."""
+
+from copy import deepcopy
+
+import pytest
+
+from benchmark import compare_reports, puzzle_case, run_case
+from generators import puzzle_space, random_graph, road_graph
+from search import BFS
+
+
+def test_generators_are_reproducible():
+    assert road_graph(8, 8, seed=1) == road_graph(8, 8, seed=1)
+    assert random_graph(50, seed=2) == random_graph(50, seed=2)
+    assert road_graph(8, 8, seed=1) != road_graph(8, 8, seed=2)
+
+
+def test_puzzle_space_start_is_depth_moves_away():
+    s0, trans, goal = puzzle_space(3, 6, seed=3)
+    
+    assert len(BFS(s0, trans, goal).path) == 7
+
+
+@pytest.fixture(scope='module')
+def case(tmp_path_factory):
+    directory = str(tmp_path_factory.mktemp('suite'))
+    
+    return run_case(directory, 'puzzle', puzzle_case(3, 6), repeat=1)
+
+
+def test_run_case_measures_every_search(case):
+    assert case['states'] > 0
+    assert case['searches']['astar']['found']
+    assert case['searches']['astar']['cost'] == 6.
+    assert case['searches']['bfs']['cost'] == 6.
+    assert case['checks']['optimistic']['passed']
+    assert case['checks']['consistent']['passed']
+
+
+def test_compare_reports(case):
+    report = {'cases': {'puzzle': case}}
+    
+    assert compare_reports(report, report) == []
+    
+    changed = deepcopy(report)
+    changed['cases']['puzzle']['searches']['astar']['expanded'] += 1
+    
+    regressions = compare_reports(report, changed)
+    assert len(regressions) == 1
+    assert 'astar: expanded changed' in regressions[0]
@@ -0,0 +1,58 @@
+"""Tests of contraction hierarchies."""
+
+from random import Random
+
+import pytest
+
+from contraction import ContractionHierarchy, contraction_hierarchy, CH
+from generators import road_graph, random_graph
+from search import dijkstra
+from util import path_cost
+
+
+@pytest.mark.parametrize('trans', [road_graph(20, 20, seed=3),
+                                   random_graph(300, degree=2, seed=4)],
+                         ids=['road', 'random'])
+def test_query_costs_match_dijkstra(trans):
+    hierarchy = ContractionHierarchy.build(trans)
+    random = Random(0)
+    
+    for _ in range(30):
+        s0 = random.choice(sorted(trans))
+        goal = random.sample(sorted(trans), random.randint(1, 3))
+        costs = dijkstra([s0], trans)
+        best = min(costs.get(g, float('inf')) for g in goal)
+        
+        path, cost, _ = hierarchy.query(s0, goal)
+        
+        if best == float('inf'):
+            assert path is None
+            continue
+        
+        assert cost == best
+        assert path[0] == s0 and path[-1] in goal
+        assert path_cost(trans, path) == cost
+
+
+def test_ch_search_returns_unpacked_path():
+    trans = {'a': {('b', 1.), ('c', 5.)}, 'b': {('c', 1.)}, 'c': {('d', 1.)},
+             'd': set(), 'e': set()}
+    
+    assert CH('a', trans, ['d']).path == ['a', 'b', 'c', 'd']
+    assert CH('a', trans, ['e']).path is None
+
+
+def test_hierarchy_file(tmp_path):
+    trans = road_graph(10, 10, seed=5)
+    fname = str(tmp_path / 'road.ch')
+    
+    built = contraction_hierarchy(trans, fname)
+    loaded = contraction_hierarchy(trans, fname)
+    
+    assert list(loaded.rank) == list(built.rank)
+    assert loaded.edges == built.edges
+    
+    # a hierarchy of another state space is built again
+    other = road_graph(10, 10, seed=6)
+    assert contraction_hierarchy(other, fname).edges == \
+        ContractionHierarchy.build(other).edges
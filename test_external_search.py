@@ -0,0 +1,54 @@
+"""Tests of external-memory breadth-first search."""
+
+import os
+
+import pytest
+
+from external_search import ExternalBFS
+from generators import road_graph, far_query
+from graph import Graph
+from search import BFS
+from successors import SlidingPuzzle
+
+
+PUZZLE_S0 = '413_726_58x'
+
+
+@pytest.mark.parametrize('buffer', [1, 7, 1000])
+def test_paths_are_as_long_as_bfs(tmp_path, buffer):
+    trans = road_graph(15, 15, seed=2)
+    s0, goal = far_query(trans)
+    
+    result = ExternalBFS(s0, trans, goal, str(tmp_path), buffer)
+    bfs = BFS(s0, trans, goal)
+    
+    assert result.path[0] == s0 and result.path[-1] in goal
+    assert len(result.path) == len(bfs.path)
+    assert all(any(m == t for m, _ in trans[s])
+               for s, t in zip(result.path, result.path[1:]))
+    
+    # layer files are removed after the search
+    assert os.listdir(str(tmp_path)) == []
+
+
+@pytest.mark.parametrize('locality', [None, 2])
+def test_puzzle(locality):
+    puzzle = SlidingPuzzle(3)
+    goal = [puzzle.goal()]
+    
+    result = ExternalBFS(PUZZLE_S0, puzzle, goal, buffer=1000,
+                         locality=locality)
+    
+    assert len(result.path) == len(BFS(PUZZLE_S0, puzzle, goal).path)
+    assert result.metrics['bytes_written'] > 0
+    assert result.metrics['bytes_read'] > 0
+
+
+def test_graph_and_missing_path():
+    trans = {'a': {('b', 1.)}, 'b': {('a', 1.), ('c', 1.)}, 'c': set(),
+             'd': set()}
+    
+    assert ExternalBFS('a', Graph.from_transitions(trans), ['c']).path == \
+        ['a', 'b', 'c']
+    assert ExternalBFS('a', trans, ['d']).path is None
+    assert ExternalBFS('a', trans, ['a']).path == ['a']
@@ -0,0 +1,95 @@
+"""Tests of the heuristic contract and wrappers."""
+
+import pytest
+
+from heuristic import evaluate, TableHeuristic, Memoized
+from puzzle_heuristic import manhattan_distance
+from successors import SlidingPuzzle
+
+
+class Recorded():
+    """Heuristic that records the states of every call and batch."""
+    
+    def __init__(self, batch=True):
+        """Inits Recorded with or without a batch method."""
+        self.calls = []
+        if batch:
+            self.batch = self._batch
+    
+    def __call__(self, s):
+        """Returns the length of the state name."""
+        self.calls.append([s])
+        return len(s)
+    
+    def _batch(self, states):
+        """Returns lengths of the state names."""
+        self.calls.append(list(states))
+        return [len(s) for s in states]
+
+
+def test_evaluate_uses_batch_when_available():
+    h = Recorded()
+    assert evaluate(h, ['a', 'bb']) == [1, 2]
+    assert h.calls == [['a', 'bb']]
+    
+    h = Recorded(batch=False)
+    assert evaluate(h, ['a', 'bb']) == [1, 2]
+    assert h.calls == [['a'], ['bb']]
+
+
+def test_table_heuristic():
+    h = TableHeuristic({'a': 1., 'b': 2.})
+    
+    assert h('b') == 2.
+    assert h.batch(['b', 'a']) == [2., 1.]
+    with pytest.raises(KeyError):
+        h('c')
+
+
+def test_memoized_counts_hits_and_misses():
+    h = Memoized(Recorded(batch=False))
+    
+    assert [h(s) for s in ['a', 'bb', 'a', 'a']] == [1, 2, 1, 1]
+    assert (h.hits, h.misses) == (2, 2)
+    assert h.hit_rate == 0.5
+    assert h.h.calls == [['a'], ['bb']]
+
+
+def test_memoized_forgets_least_recently_used():
+    h = Memoized(Recorded(batch=False), maxsize=2)
+    
+    h('a')
+    h('bb')
+    h('a')
+    h('ccc')
+    
+    assert list(h.cache) == ['a', 'ccc']
+    
+    h('bb')
+    assert h.misses == 4
+
+
+def test_memoized_batch_computes_missing_in_one_call():
+    h = Memoized(Recorded())
+    
+    assert h.batch(['a', 'bb']) == [1, 2]
+    assert h.batch(['bb', 'ccc', 'a', 'dddd']) == [2, 3, 1, 4]
+    
+    assert h.h.calls == [['a', 'bb'], ['ccc', 'dddd']]
+    assert (h.hits, h.misses) == (2, 4)
+
+
+def test_memoized_keeps_integer_steps():
+    goal = [SlidingPuzzle(3).goal()]
+    
+    assert Memoized(manhattan_distance(goal)).integer_steps
+    assert not Memoized(Recorded()).integer_steps
+
+
+def test_manhattan_distance_batch():
+    puzzle = SlidingPuzzle(3)
+    h = manhattan_distance([puzzle.goal()])
+    
+    states = [m for m, _ in puzzle.successors('867_254_3x1')]
+    
+    assert h.batch(states) == [h(s) for s in states]
@@ -0,0 +1,109 @@
+"""Tests of heuristic checks."""
+
+from random import Random
+
+import pytest
+
+from data_loader import get_state_space, get_heuristic
+from heuristic_check import check_optimism, check_consistency, \
+    is_optimistic, is_consistent
+from generators import random_graph
+from search import dijkstra
+from util import flip_transitions
+
+
+def load(space, heuristic):
+    """Loads a state space and a heuristic from the maps directory."""
+    s0, trans, goal = get_state_space('maps/' + space, cache=False)
+    
+    return trans, goal, get_heuristic('maps/' + heuristic, cache=False)
+
+
+def test_check_optimism_reports_largest_violations_first():
+    inf = float('inf')
+    report = check_optimism([0., 5., 3., 4., 7.], [0., 2., 3., 1., inf], k=2)
+    
+    assert not report
+    assert report.count == 2
+    assert report.worst == 3.
+    assert report.offenders == [(1, 3.), (3, 3.)]
+    
+    assert check_optimism([1., 2.], [1., 3.])
+
+
+def test_check_consistency_reports_transitions():
+    sources = [0, 0, 1, 2]
+    targets = [1, 2, 2, 0]
+    costs = [1., 1., 2., 1.]
+    values = [5., 1., 0.]
+    
+    report = check_consistency(sources, targets, costs, values, k=10)
+    
+    assert report.count == 2
+    assert report.worst == 4.
+    assert report.offenders == [(1, 4.), (0, 3.)]
+    
+    assert check_consistency(sources, targets, costs, [1., 1., 0.])
+
+
+@pytest.mark.parametrize('space, heuristic, optimistic, consistent', [
+    ('istra.txt', 'istra_heuristic.txt', 0, 0),
+    ('istra.txt', 'istra_pessimistic_heuristic.txt', 2, 2),
+    ('ai.txt', 'ai_pass.txt', 0, 0),
+    ('ai.txt', 'ai_fail.txt', 1, 4),
+])
+def test_checks_on_maps(space, heuristic, optimistic, consistent):
+    trans, goal, h = load(space, heuristic)
+    
+    assert is_optimistic(h, trans, goal).count == optimistic
+    assert is_consistent(h, trans).count == consistent
+
+
+def test_printed_offenders(capsys):
+    trans, goal, h = load('ai.txt', 'ai_fail.txt')
+    capsys.readouterr()
+    
+    is_optimistic(h, trans, goal)
+    
+    out = capsys.readouterr().out
+    assert '[ERR] h(pass_continuous) > h*: 20.0 > 1.0' in out
+    assert '[ERR] 1 errors, worst overestimates by 19.0.' in out
+    assert out.endswith('Heuristic is not optimistic.\n')
+
+
+
+def noisy_heuristic(trans, goal, seed=0):
+    """Returns a heuristic that overestimates real costs of some states."""
+    random = Random(seed)
+    costs = dijkstra(goal, flip_transitions(trans))
+    
+    return {s: costs.get(s, 0.) * random.choice([0.5, 0.9, 1.2])
+            for s in trans}.get
+
+
+@pytest.mark.parametrize('jobs', [2, 3])
+def test_parallel_checks_match_serial(jobs, capsys):
+    trans = random_graph(500, seed=jobs)
+    goal = ['s0', 's1']
+    h = noisy_heuristic(trans, goal, jobs)
+    
+    runs = []
+    for j in [1, jobs]:
+        reports = is_optimistic(h, trans, goal, j), is_consistent(h, trans, j)
+        runs.append(([vars(r) for r in reports], capsys.readouterr().out))
+    
+    assert runs[0] == runs[1]
+    assert runs[0][0][0]['count'] > 0 and runs[0][0][1]['count'] > 0
+
+
+def test_parallel_array_checks_match_serial():
+    random = Random(0)
+    values = [random.uniform(0, 10) for _ in range(1000)]
+    costs = [random.uniform(0, 10) for _ in range(1000)]
+    sources = [random.randrange(1000) for _ in range(3000)]
+    targets = [random.randrange(1000) for _ in range(3000)]
+    
+    assert vars(check_optimism(values, costs, jobs=2)) == \
+        vars(check_optimism(values, costs))
+    assert vars(check_consistency(sources, targets, costs * 3, values, jobs=2)) == \
+        vars(check_consistency(sources, targets, costs * 3, values))
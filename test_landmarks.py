@@ -0,0 +1,79 @@
+"""Tests of landmark (ALT) heuristics."""
+
+from random import Random
+
+import pytest
+
+from generators import random_graph
+from heuristic_check import is_optimistic, is_consistent
+from landmarks import landmarks
+from search import AStar, dijkstra
+from util import path_cost
+
+
+@pytest.fixture(scope='module')
+def graph():
+    """Returns a random graph with one-way roads and its landmark tables."""
+    trans = random_graph(400, degree=2, seed=1)
+    
+    return trans, landmarks(trans, k=4)
+
+
+def test_heuristic_is_admissible_and_consistent(graph):
+    trans, tables = graph
+    
+    for goal in [['s0'], ['s17', 's250'], ['s399']]:
+        h = tables.heuristic(goal)
+        
+        assert is_optimistic(h, trans, goal)
+        assert is_consistent(h, trans)
+
+
+def test_heuristic_from_bounds_costs_from_starts(graph):
+    trans, tables = graph
+    starts = ['s3', 's300']
+    
+    h = tables.heuristic_from(starts)
+    costs = [dijkstra([s], trans) for s in starts]
+    
+    for v in trans:
+        assert h(v) <= min(c.get(v, float('inf')) for c in costs)
+
+
+def test_astar_with_landmarks_is_optimal(graph):
+    trans, tables = graph
+    random = Random(0)
+    
+    for _ in range(10):
+        s0, g = random.sample(sorted(trans), 2)
+        
+        result = AStar(s0, trans, [g], tables.heuristic([g]))
+        
+        assert result.cost == path_cost(trans, result.path) == \
+            dijkstra([s0], trans)[g]
+
+
+def test_unknown_states_get_zero(graph):
+    _, tables = graph
+    
+    assert tables.heuristic(['s0'])('mars') == 0.
+    assert tables.heuristic(['mars'])('s0') == 0.
+
+
+def test_tables_file(graph, tmp_path):
+    trans, tables = graph
+    fname = str(tmp_path / 'graph.alt')
+    
+    built = landmarks(trans, fname, k=4)
+    loaded = landmarks(trans, fname, k=4)
+    
+    assert loaded.landmarks == built.landmarks == tables.landmarks
+    assert loaded.forward == built.forward
+    assert loaded.backward == built.backward
+    
+    # tables of another state space are built again
+    other = random_graph(50, seed=2)
+    rebuilt = landmarks(other, fname, k=2)
+    
+    assert len(rebuilt.landmarks) == 2
+    assert set(other) <= set(rebuilt.names)
@@ -0,0 +1,53 @@
+"""Tests of hash distributed A* search."""
+
+import pytest
+
+from generators import random_graph, scaled_distances
+from graph import Graph
+from heuristic import TableHeuristic
+from parallel_search import HDAStar, owner
+from puzzle_heuristic import manhattan_distance
+from search import AStar, dijkstra
+from successors import SlidingPuzzle
+from util import path_cost
+
+
+def test_owner_is_stable():
+    assert owner('Pula', 3) == owner('Pula', 3)
+    assert {owner(7, 4), owner(8, 4)} == {3, 0}
+
+
+@pytest.mark.parametrize('workers', [1, 2, 3])
+@pytest.mark.parametrize('seed', range(3))
+def test_costs_match_dijkstra(seed, workers):
+    trans = random_graph(200, degree=2, seed=seed)
+    s0, goal = 's0', ['s{}'.format(100 + seed)]
+    h = TableHeuristic(scaled_distances(trans, goal))
+    
+    result = HDAStar(s0, trans, goal, h, workers)
+    
+    assert result.path[0] == s0 and result.path[-1] in goal
+    assert result.cost == dijkstra([s0], trans)[goal[0]]
+    assert path_cost(trans, result.path) == result.cost
+    
+    graph = HDAStar(s0, Graph.from_transitions(trans), goal, h, workers)
+    assert graph.cost == result.cost
+
+
+def test_puzzle_matches_astar():
+    puzzle = SlidingPuzzle(3)
+    goal = [puzzle.goal()]
+    h = manhattan_distance(goal)
+    
+    result = HDAStar('867_254_3x1', puzzle, goal, h, 2)
+    
+    assert result.cost == AStar('867_254_3x1', puzzle, goal, h).cost
+    assert result.expanded > 0 and result.heuristic_calls > 0
+
+
+def test_without_path():
+    trans = {'a': {('b', 1.)}, 'b': {('a', 1.)}, 'c': set()}
+    
+    result = HDAStar('a', trans, ['c'], lambda s: 0., 2, counters=False)
+    
+    assert result.path is None and result.generated is None
@@ -0,0 +1,76 @@
+"""Tests of pattern database heuristics."""
+
+from collections import deque
+from random import Random
+
+import pytest
+
+from pattern_database import pattern_database, load_pattern_databases, \
+    default_patterns
+from search import AStar
+from successors import SlidingPuzzle
+
+
+@pytest.fixture(scope='module')
+def puzzle():
+    """Returns the 3 x 3 puzzle with moves from its goal to every state."""
+    puzzle = SlidingPuzzle(3)
+    goal = puzzle.goal()
+    
+    moves = {goal: 0}
+    layer = deque([goal])
+    
+    while layer:
+        s = layer.popleft()
+        
+        for m, _ in puzzle.successors(s):
+            if m not in moves:
+                moves[m] = moves[s] + 1
+                layer.append(m)
+    
+    return puzzle, goal, moves
+
+
+def test_default_patterns_are_disjoint():
+    patterns = default_patterns('123_456_78x')
+    assert patterns == ['1234', '5678']
+    
+    patterns = default_patterns(SlidingPuzzle(4).goal())
+    assert sorted(''.join(patterns)) == sorted('123456789ABCDEF')
+    assert max(map(len, patterns)) <= 5
+
+
+def test_pattern_database_is_admissible(puzzle):
+    puzzle, goal, moves = puzzle
+    h = pattern_database([goal])
+    
+    assert h(goal) == 0
+    
+    for s in Random(0).sample(sorted(moves), 3000):
+        assert h(s) <= moves[s]
+
+
+def test_astar_with_pattern_database_is_optimal(puzzle):
+    puzzle, goal, moves = puzzle
+    s0 = '867_254_3x1'
+    
+    result = AStar(s0, puzzle, [goal], pattern_database([goal]))
+    
+    assert len(result.path) - 1 == result.cost == moves[s0] == 31
+
+
+def test_pattern_database_file(tmp_path):
+    fname = str(tmp_path / 'puzzle.pdb')
+    goal = SlidingPuzzle(3).goal()
+    
+    built = pattern_database([goal], fname)
+    loaded = pattern_database([goal], fname)
+    
+    assert loaded.patterns == built.patterns
+    assert loaded.tables == built.tables
+    assert [db.goal for db in load_pattern_databases(fname)] == [goal]
+    
+    with open(fname, 'wb') as f:
+        f.write(b'not a database')
+    with pytest.raises(ValueError):
+        load_pattern_databases(fname)
@@ -0,0 +1,60 @@
+"""Tests of the algorithm portfolio runner."""
+
+import pytest
+
+from batch import BatchSolver
+from portfolio import accepts, portfolio
+from search import SearchResult
+
+
+@pytest.fixture(scope='module')
+def search():
+    """Returns a search function of the istra map from Pula to Buzet."""
+    solver = BatchSolver.load('maps/istra.txt', cache=False,
+                              heuristic='maps/istra_heuristic.txt')
+    
+    return lambda algorithm, **kwargs: solver.search(
+        algorithm, 'Pula', {'Buzet'}, **kwargs)
+
+
+def result(path):
+    """Returns a SearchResult with given path."""
+    r = SearchResult('test')
+    r.path = path
+    
+    return r
+
+
+def test_accepts():
+    goal = {'b'}
+    
+    assert accepts('any', 'gbfs', result(['a', 'b']), goal)
+    assert not accepts('optimal', 'gbfs', result(['a', 'b']), goal)
+    assert accepts('optimal', 'astar', result(['a', 'b']), goal)
+    assert not accepts('any', 'hcs', result(['a', 'c']), goal)
+    
+    # only complete algorithms prove that there is no path
+    assert accepts('optimal', 'bfs', result(None), goal)
+    assert not accepts('any', 'hcs', result(None), goal)
+
+
+def test_optimal_criterion(search):
+    found, winner = portfolio(search, ['gbfs', 'ucs'], ['Buzet'], 'optimal')
+    
+    assert winner == 'ucs' and found.metrics['winner'] == 'ucs'
+    assert found.cost == 100. and found.path[-1] == 'Buzet'
+
+
+def test_failed_algorithms_are_skipped(search):
+    found, winner = portfolio(search, ['ldfs', 'astar'], ['Buzet'])
+    
+    assert winner == 'astar' and found.cost == 100.
+    assert portfolio(search, ['ldfs'], ['Buzet']) == (None, None)
+
+
+def test_invalid_criteria(search):
+    with pytest.raises(ValueError):
+        portfolio(search, ['ucs'], ['Buzet'], 'fast')
+    
+    with pytest.raises(ValueError):
+        portfolio(search, ['gbfs', 'dfs'], ['Buzet'], 'optimal')
@@ -0,0 +1,73 @@
+"""Tests of the Manhattan distance heuristic for sliding puzzles."""
+
+from random import Random
+
+import pytest
+
+from puzzle_heuristic import manhattan_distance
+from search import AStar
+from successors import SlidingPuzzle
+
+
+def naive_distance(state, goal):
+    """Returns the Manhattan distance of a state computed from coordinates."""
+    rows, goal_rows = state.split('_'), goal.split('_')
+    
+    def cells(rows):
+        return {t: (r, c) for r, row in enumerate(rows)
+                for c, t in enumerate(row) if t != 'x'}
+    
+    at, to = cells(rows), cells(goal_rows)
+    
+    return sum(abs(at[t][0] - to[t][0]) + abs(at[t][1] - to[t][1]) for t in at)
+
+
+def random_walk(puzzle, moves, seed):
+    """Returns the states of a random walk from the goal of a puzzle."""
+    random = Random(seed)
+    states = [puzzle.goal()]
+    
+    for _ in range(moves):
+        states.append(random.choice(sorted(puzzle.successors(states[-1])))[0])
+    
+    return states
+
+
+@pytest.mark.parametrize('n', [2, 3, 4, 5])
+def test_table_matches_naive_distance(n):
+    puzzle = SlidingPuzzle(n)
+    goal = puzzle.goal()
+    h = manhattan_distance([goal])
+    
+    for s in random_walk(puzzle, 300, n):
+        assert h(s) == naive_distance(s, goal)
+
+
+def test_lowest_value_over_goals():
+    goals = ['123_456_78x', '123_456_x78']
+    h = manhattan_distance(goals)
+    
+    assert not h.incremental
+    assert h('123_456_78x') == h('123_456_x78') == 0
+    assert h('123_456_7x8') == 1
+
+
+@pytest.mark.parametrize('n', [3, 4])
+def test_child_matches_full_evaluation(n):
+    puzzle = SlidingPuzzle(n)
+    h = manhattan_distance([puzzle.goal()])
+    
+    assert h.incremental
+    
+    for s in random_walk(puzzle, 200, n):
+        for m, _ in puzzle.successors(s):
+            assert h.child(s, h(s), m) == h(m)
+
+
+def test_astar_with_manhattan_distance_is_optimal():
+    puzzle = SlidingPuzzle(3)
+    goal = [puzzle.goal()]
+    
+    result = AStar('867_254_3x1', puzzle, goal, manhattan_distance(goal))
+    
+    assert len(result.path) - 1 == result.cost == 31
@@ -0,0 +1,132 @@
+"""Tests of the persistent result cache."""
+
+import os
+import shutil
+
+import pytest
+
+from contraction import CH
+from data_loader import get_state_space
+from result_cache import ResultCache, query_key, source_digest
+from search import UCS, PRINT
+
+
+@pytest.fixture
+def space(tmp_path):
+    """Copies the istra map to a temporary directory."""
+    fname = str(tmp_path / 'istra.txt')
+    shutil.copy(os.path.join('maps', 'istra.txt'), fname)
+    
+    return fname
+
+
+def counted(search):
+    """Wraps a search function and counts its calls."""
+    def wrapper(*args, **kwargs):
+        wrapper.calls += 1
+        return search(*args, **kwargs)
+    
+    wrapper.calls = 0
+    
+    return wrapper
+
+
+def ucs_key(fname):
+    """Returns the key of a UCS search on a state space file."""
+    s0, _, goal = get_state_space(fname, cache=False)
+    
+    return query_key(source_digest(fname), None, 'ucs', s0, sorted(goal))
+
+
+def test_source_digest(space):
+    digest = source_digest(space)
+    
+    assert len(digest) == 64
+    assert source_digest('pdb:' + space) == 'pdb:' + digest
+    assert source_digest('l1') == 'l1'
+    assert source_digest(None) is None
+
+
+def test_replayed_output_matches_search(space, tmp_path, capsys):
+    s0, trans, goal = get_state_space(space, cache=False)
+    search = counted(UCS)
+    cache = ResultCache(directory=str(tmp_path / 'results'))
+    capsys.readouterr()
+    
+    result = cache.search(ucs_key(space), search, s0, trans, goal,
+                          reporter=PRINT)
+    searched = capsys.readouterr().out
+    
+    replayed = cache.search(ucs_key(space), search, s0, trans, goal,
+                            reporter=PRINT)
+    assert capsys.readouterr().out == searched
+    assert replayed.to_dict() == result.to_dict()
+    
+    # entries on disk are found by a new cache
+    cache = ResultCache(directory=str(tmp_path / 'results'))
+    replayed = cache.search(ucs_key(space), search, s0, trans, goal)
+    
+    assert replayed.to_dict() == result.to_dict()
+    assert search.calls == 1
+    assert (cache.hits, cache.misses) == (1, 0)
+
+
+def test_counters_are_searched_again_if_missing(space, tmp_path):
+    s0, trans, goal = get_state_space(space, cache=False)
+    search = counted(UCS)
+    cache = ResultCache(directory=str(tmp_path / 'results'))
+    key = ucs_key(space)
+    
+    assert cache.search(key, search, s0, trans, goal, counters=False).generated is None
+    assert cache.search(key, search, s0, trans, goal, counters=False).generated is None
+    assert cache.search(key, search, s0, trans, goal).generated is not None
+    assert cache.search(key, search, s0, trans, goal, counters=False).counters
+    
+    assert search.calls == 2
+    assert (cache.hits, cache.misses) == (2, 2)
+
+
+def test_contraction_hierarchy_results_are_replayed(space, tmp_path):
+    s0, trans, goal = get_state_space(space, cache=False)
+    search = counted(CH)
+    cache = ResultCache(directory=str(tmp_path / 'results'))
+    key = query_key(source_digest(space), 'ch')
+    
+    # a hierarchy query has no counters besides expanded states
+    first = cache.search(key, search, s0, trans, goal)
+    second = cache.search(key, search, s0, trans, goal)
+    
+    assert first.generated is None and first.counters
+    assert second.to_dict() == first.to_dict()
+    assert search.calls == 1
+
+
+def test_edited_file_is_searched_again(space, tmp_path):
+    cache = ResultCache(directory=str(tmp_path / 'results'))
+    search = counted(UCS)
+    
+    s0, trans, goal = get_state_space(space, cache=False)
+    cache.search(ucs_key(space), search, s0, trans, goal)
+    
+    with open(space) as f:
+        lines = f.read().replace('Barban,28 Medulin', 'Barban,1 Medulin')
+    with open(space, 'w') as f:
+        f.write(lines)
+    
+    s0, trans, goal = get_state_space(space, cache=False)
+    cache.search(ucs_key(space), search, s0, trans, goal)
+    
+    assert search.calls == 2
+    assert (cache.hits, cache.misses) == (0, 2)
+
+
+def test_least_recently_used_files_are_removed(tmp_path):
+    directory = str(tmp_path / 'results')
+    cache = ResultCache(maxsize=1, directory=directory, max_bytes=300)
+    
+    for i in range(5):
+        cache.put('key{}'.format(i), {'info': ['x' * 100]})
+    
+    assert 0 < len(os.listdir(directory)) < 5
+    assert cache.get('key4') is not None
+    assert cache.get('key0') is None
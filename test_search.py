@@ -0,0 +1,223 @@
+"""Tests of search algorithms against reference solutions."""
+
+from random import Random
+
+import pytest
+
+from data_loader import get_state_space, get_heuristic, get_grid_map
+from generators import random_graph, open_grid, maze_grid
+from grid_heuristic import octile_distance
+from puzzle_heuristic import manhattan_distance
+from search import BFS, UCS, HCS, AStar, ARAStar, JPS, IDAStar, \
+    SearchResult, dijkstra, bibfs, biastar
+from successors import SlidingPuzzle, GridMap
+from util import flip_transitions, path_cost
+
+
+PUZZLE_S0 = '867_254_3x1'
+
+
+def queries(trans, count, seed=0):
+    """Returns random (s0, goal) queries with one or two goal states."""
+    random = Random(seed)
+    names = sorted(trans)
+    
+    return [(random.choice(names), random.sample(names, random.randint(1, 2)))
+            for _ in range(count)]
+
+
+def check_path(trans, path, s0, goal):
+    """Checks that path leads over transitions from s0 to a goal state."""
+    assert path[0] == s0 and path[-1] in goal
+    
+    for s, t in zip(path, path[1:]):
+        assert any(m == t for m, _ in trans.get(s, []))
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_bibfs_finds_shortest_paths(seed):
+    trans = random_graph(300, degree=2, seed=seed)
+    
+    for s0, goal in queries(trans, 10, seed):
+        path = bibfs(s0, trans, goal).path
+        
+        check_path(trans, path, s0, goal)
+        assert len(path) == len(BFS(s0, trans, goal).path)
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_biastar_costs_match_dijkstra(seed):
+    trans = random_graph(300, seed=seed)
+    
+    for s0, goal in queries(trans, 10, seed):
+        costs = dijkstra([s0], trans)
+        to_goal = dijkstra(goal, flip_transitions(trans))
+        
+        h = lambda s: 0.8 * to_goal[s]
+        h_back = lambda s: 0.8 * costs[s]
+        
+        for result in [biastar(s0, trans, goal, lambda s: 0.),
+                       biastar(s0, trans, goal, h, h_back)]:
+            check_path(trans, result.path, s0, goal)
+            assert result.cost == path_cost(trans, result.path) == \
+                min(costs[g] for g in goal)
+
+
+def test_bidirectional_searches_on_puzzle():
+    puzzle = SlidingPuzzle(3)
+    goal = [puzzle.goal()]
+    
+    # one of the two hardest 3 x 3 states, 31 moves from the goal
+    assert len(bibfs(PUZZLE_S0, puzzle, goal).path) == 32
+    
+    path = biastar(PUZZLE_S0, puzzle, goal, manhattan_distance(goal),
+                   manhattan_distance([PUZZLE_S0])).path
+    check_path(puzzle, path, PUZZLE_S0, goal)
+    assert len(path) == 32
+
+
+def test_bidirectional_searches_without_path():
+    trans = {'a': {('b', 1.)}, 'b': {('a', 1.)}, 'c': set()}
+    
+    assert bibfs('a', trans, ['c']).path is None
+    assert biastar('a', trans, ['c'], lambda s: 0.).path is None
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_idastar_costs_match_dijkstra(seed):
+    trans = random_graph(60, degree=2, seed=seed)
+    
+    for s0, goal in queries(trans, 5, seed):
+        costs = dijkstra([s0], trans)
+        to_goal = dijkstra(goal, flip_transitions(trans))
+        
+        result = IDAStar(s0, trans, goal, lambda s: 0.9 * to_goal[s])
+        
+        check_path(trans, result.path, s0, goal)
+        assert result.cost == path_cost(trans, result.path) == \
+            min(costs[g] for g in goal)
+
+
+def test_idastar_without_path():
+    trans = {'a': {('b', 1.)}, 'b': {('a', 1.)}, 'c': set()}
+    
+    assert IDAStar('a', trans, ['c'], lambda s: 0.).path is None
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_arastar_improves_to_optimal_path(seed):
+    trans = random_graph(300, seed=seed)
+    back = flip_transitions(trans)
+    
+    for s0, goal in queries(trans, 5, seed):
+        costs = dijkstra(goal, back)
+        result = ARAStar(s0, trans, goal, lambda s: costs.get(s, 0.), 3., 1.)
+        
+        check_path(trans, result.path, s0, goal)
+        assert result.cost == costs[s0]
+        assert result.metrics['bound'] == 1.
+        
+        solutions = result.metrics['solutions']
+        assert solutions[-1][:2] == [costs[s0], 1.]
+        assert all(a[0] > b[0] for a, b in zip(solutions, solutions[1:]))
+
+
+def test_arastar_budget_and_weight():
+    puzzle = SlidingPuzzle(3)
+    goal = [puzzle.goal()]
+    h = manhattan_distance(goal)
+    
+    result = ARAStar(PUZZLE_S0, puzzle, goal, h, 3., expansions=50)
+    
+    assert result.path is None and result.expanded == 50
+    assert result.metrics == {'bound': None, 'solutions': []}
+    
+    # the first path is kept when the budget runs out before the next one
+    result = ARAStar(PUZZLE_S0, puzzle, goal, h, 3., expansions=5000)
+    
+    assert result.cost == result.metrics['solutions'][-1][0]
+    assert result.metrics['bound'] > 1. and result.expanded == 5000
+    
+    d = result.to_dict()
+    assert SearchResult.from_dict(d).metrics == result.metrics
+    
+    with pytest.raises(ValueError):
+        ARAStar(PUZZLE_S0, puzzle, goal, h, 0.5)
+
+
+@pytest.mark.parametrize('diagonal', [False, True])
+@pytest.mark.parametrize('generate', [open_grid, maze_grid])
+def test_jps_costs_match_ucs(generate, diagonal):
+    grid = generate(25, 17, seed=1, diagonal=diagonal)
+    trans = grid.to_transitions()
+    
+    for s0, goal in queries(trans, 10):
+        ucs = UCS(s0, trans, goal)
+        jps = JPS(s0, grid, goal)
+        
+        if ucs.path is None:
+            assert jps.path is None
+            continue
+        
+        check_path(trans, jps.path, s0, goal)
+        assert jps.cost == pytest.approx(ucs.cost)
+        assert path_cost(trans, jps.path) == pytest.approx(ucs.cost)
+
+
+def test_jps_on_grid_file():
+    s0, grid, goal = get_grid_map('maps/grid.txt')
+    h = octile_distance(goal, grid.diagonal)
+    
+    astar = AStar(s0, grid, goal, h)
+    jps = JPS(s0, grid, goal, h)
+    
+    assert jps.cost == pytest.approx(astar.cost)
+    assert jps.expanded < astar.expanded
+    
+    # a state space file with row_column states is recognized as a grid
+    assert GridMap.from_transitions(grid.to_transitions()).rows() == grid.rows()
+
+
+def test_hcs_climbs_from_start_state():
+    _, trans, _ = get_state_space('maps/istra.txt', cache=False)
+    h = get_heuristic('maps/istra_heuristic.txt', cache=False)
+    
+    assert HCS('Pula', trans, h).path == ['Pula', 'Barban']
+
+
+def test_hcs_stops_on_plateau():
+    trans = {'a': {('b', 1.)}, 'b': {('a', 1.), ('c', 1.)}, 'c': set()}
+    h = {'a': 2., 'b': 1., 'c': 1.}.get
+    
+    assert HCS('a', trans, h).path == ['a', 'b']
+
+
+def test_search_result_round_trip():
+    _, trans, _ = get_state_space('maps/istra.txt', cache=False)
+    h = get_heuristic('maps/istra_heuristic.txt', cache=False)
+    
+    for result in [AStar('Pula', trans, ['Buzet'], h),
+                   UCS('Pula', trans, ['Buzet'], counters=False),
+                   BFS('Pula', trans, ['Mars'])]:
+        d = result.to_dict()
+        
+        assert set(d) == set(SearchResult.FIELDS)
+        assert SearchResult.from_dict(d).to_dict() == d
+    
+    assert d['path'] is None
+
+
+def test_counters():
+    _, trans, _ = get_state_space('maps/istra.txt', cache=False)
+    h = get_heuristic('maps/istra_heuristic.txt', cache=False)
+    
+    result = AStar('Pula', trans, ['Buzet'], h)
+    
+    assert result.counters and result.cost == 100.
+    assert result.expanded <= result.generated
+    assert result.heuristic_calls > 0 and result.max_frontier > 0
+    
+    result = AStar('Pula', trans, ['Buzet'], h, counters=False)
+    
+    assert not result.counters and result.cost == 100.
+    assert result.generated is None and result.heuristic_calls is None
@@ -0,0 +1,98 @@
+"""Tests of the search query server."""
+
+import asyncio
+import json
+
+import pytest
+
+from batch import parse_query
+from server import QueryServer, parse_space, percentile
+
+
+def test_percentile():
+    values = list(range(1, 101))
+    
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile(values, 100) == 100
+    assert percentile([7], 50) == 7
+    assert percentile([], 50) is None
+
+
+def test_parse_space():
+    assert parse_space('istra=maps/istra.txt,maps/istra_heuristic.txt',
+                       cache=False) == \
+        ('istra', {'ss': 'maps/istra.txt', 'puzzle': False, 'grid': False,
+                   'cache': False, 'heuristic': 'maps/istra_heuristic.txt'})
+    assert parse_space('p=puzzle:867_254_3x1,l1') == \
+        ('p', {'ss': '867_254_3x1', 'puzzle': True, 'grid': False,
+               'heuristic': 'l1'})
+    assert parse_space('g=grid:maps/grid.txt,octile') == \
+        ('g', {'ss': 'maps/grid.txt', 'puzzle': False, 'grid': True,
+               'heuristic': 'octile'})
+    
+    with pytest.raises(ValueError):
+        parse_space('maps/istra.txt')
+
+
+@pytest.mark.parametrize('line', ['{"id": 1', '"query"', '[]'])
+def test_parse_query_errors(line):
+    with pytest.raises(ValueError):
+        parse_query(line)
+
+
+async def exchange(path, queries):
+    """Sends queries over a Unix socket and returns results by id."""
+    reader, writer = await asyncio.open_unix_connection(path)
+    
+    for query in queries:
+        writer.write(json.dumps(query).encode() + b'\n')
+    await writer.drain()
+    
+    results = [json.loads(await reader.readline()) for _ in queries]
+    writer.close()
+    
+    return results
+
+
+def test_server_answers_queries(tmp_path):
+    path = str(tmp_path / 'search.sock')
+    spaces = dict([
+        parse_space('istra=maps/istra.txt,maps/istra_heuristic.txt', cache=False),
+        parse_space('puzzle=puzzle:867_254_3x1,l1', algorithm='astar'),
+    ])
+    
+    async def run():
+        server = QueryServer(spaces, jobs=1)
+        serving = asyncio.create_task(server.serve(path=path, report=0))
+        
+        while server.pool is None or not (tmp_path / 'search.sock').exists():
+            await asyncio.sleep(0.05)
+        
+        results = await exchange(path, [
+            {'id': 1, 'space': 'istra', 'algorithm': 'astar'},
+            {'id': 2, 'space': 'puzzle', 'start': '123_456_7x8'},
+            {'id': 3, 'space': 'mars', 'algorithm': 'bfs'},
+            {'id': 4, 'algorithm': 'bfs'},
+        ])
+        stats = await exchange(path, [{'stats': True}])
+        
+        serving.cancel()
+        try:
+            await serving
+        except asyncio.CancelledError:
+            pass
+        
+        return results, stats[0]['stats']
+    
+    results, stats = asyncio.run(run())
+    results = {r['id']: r for r in results}
+    
+    assert results[1]['space'] == 'istra' and results[1]['cost'] == 100.
+    assert results[2]['path'] == ['123_456_7x8', '123_456_78x']
+    assert results[3]['error'] == 'Unknown state space mars.'
+    assert results[4]['error'] == 'Unknown state space None.'
+    
+    assert stats['requests'] == 4
+    assert stats['p50_ms'] is not None
+    assert not (tmp_path / 'search.sock').exists()
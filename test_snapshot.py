@@ -0,0 +1,89 @@
+"""Tests of binary snapshots of state spaces and heuristics."""
+
+import os
+import shutil
+
+import pytest
+
+from data_loader import get_state_space, get_heuristic
+from graph import Graph
+from snapshot import load_state_space, load_heuristic, snapshot_path
+
+
+@pytest.fixture
+def space(tmp_path):
+    """Copies the istra map and its heuristic to a temporary directory."""
+    for name in ['istra.txt', 'istra_heuristic.txt']:
+        shutil.copy(os.path.join('maps', name), tmp_path / name)
+    
+    return str(tmp_path / 'istra.txt'), str(tmp_path / 'istra_heuristic.txt')
+
+
+def touch(fname):
+    """Moves modification time of a file one second forward."""
+    st = os.stat(fname)
+    os.utime(fname, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+
+
+def test_state_space_round_trip(space, capsys):
+    fname, _ = space
+    
+    s0, parsed, goal = get_state_space(fname, cache=False)
+    parsed_output = capsys.readouterr().out
+    assert not os.path.exists(snapshot_path(fname))
+    
+    get_state_space(fname)
+    assert os.path.exists(snapshot_path(fname))
+    capsys.readouterr()
+    
+    loaded = get_state_space(fname)
+    assert capsys.readouterr().out == parsed_output
+    assert loaded[0] == s0 and set(loaded[2]) == set(goal)
+    assert dict(loaded[1]) == parsed
+    
+    _, graph, _ = get_state_space(fname, compact=True)
+    assert isinstance(graph, Graph)
+    assert graph.to_transitions() == parsed
+
+
+def test_snapshot_view_is_read_only(space):
+    fname, _ = space
+    get_state_space(fname)
+    
+    _, view, _ = get_state_space(fname)
+    
+    assert 'Pula' in view and 'nowhere' not in view
+    assert view.get('nowhere') is None
+    assert len(view) == len(list(view))
+    
+    with pytest.raises(TypeError):
+        view['Pula'] = set()
+    
+    copy = dict(view)
+    copy['Pula'] = set()
+    assert view['Pula']
+
+
+def test_state_space_invalidated_by_mtime(space):
+    fname, _ = space
+    get_state_space(fname)
+    assert load_state_space(fname) is not None
+    
+    touch(fname)
+    
+    assert load_state_space(fname) is None
+
+
+def test_heuristic_round_trip_and_invalidation(space):
+    _, hname = space
+    
+    parsed = get_heuristic(hname, cache=False)
+    get_heuristic(hname)
+    
+    values = load_heuristic(hname)
+    assert len(values) == 19
+    assert all(parsed(s) == v for s, v in values.items())
+    
+    touch(hname)
+    
+    assert load_heuristic(hname) is None
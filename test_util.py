@@ -0,0 +1,92 @@
+"""Tests of priority queues and their selection."""
+
+from random import Random
+
+import pytest
+
+from successors import SlidingPuzzle
+from util import BucketQueue, IndexedPriorityQueue, Transitions, \
+    integer_cost_bound, priority_queue
+
+
+def drain(queue):
+    """Pops all (item, priority) pairs from a queue."""
+    pairs = []
+    
+    while queue:
+        pairs.append(queue.pop())
+    
+    return pairs
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_bucket_queue_matches_heap(seed):
+    rng = Random(seed)
+    heap, bucket = IndexedPriorityQueue(), BucketQueue(span=8)
+    popped = []
+    
+    for _ in range(2000):
+        if rng.random() < 0.4 and heap:
+            pair = heap.pop()
+            assert bucket.pop() == pair
+            popped.append(pair)
+        else:
+            # priorities may fall below the last popped one, as with an
+            # inconsistent heuristic
+            low = popped[-1][1] - 10 if popped else 0
+            item, priority = rng.randrange(300), low + rng.randrange(50)
+            assert bucket.push(item, priority) == heap.push(item, priority)
+    
+    assert drain(bucket) == drain(heap)
+    assert bucket.peak == heap.peak
+
+
+def test_bucket_queue_orders_equal_priorities_by_last_push():
+    queue = BucketQueue()
+    
+    for item in 'abc':
+        queue.push(item, 5)
+    queue.push('a', 5)
+    queue.push('d', 7)
+    queue.push('d', 5)
+    
+    assert queue.peek() == ('a', 5)
+    assert drain(queue) == [('a', 5), ('b', 5), ('c', 5), ('d', 5)]
+
+
+def test_bucket_queue_rejects_fractions():
+    queue = BucketQueue()
+    
+    queue.push('a', 2.)
+    with pytest.raises(ValueError):
+        queue.push('b', 2.5)
+
+
+def test_integer_cost_bound():
+    assert integer_cost_bound([1, 3., 2]) == 3
+    assert integer_cost_bound([]) == 0
+    assert integer_cost_bound([1, 2.5]) is None
+    assert integer_cost_bound([-1]) is None
+    assert integer_cost_bound([5000]) is None
+
+
+def test_priority_queue_selection():
+    def h(s):
+        return 0
+    
+    trans = Transitions()
+    assert isinstance(priority_queue(trans), IndexedPriorityQueue)
+    
+    trans.cost_bound = 3
+    assert isinstance(priority_queue(trans), BucketQueue)
+    assert isinstance(priority_queue(trans, 'heap'), IndexedPriorityQueue)
+    assert isinstance(priority_queue(trans, h=h), IndexedPriorityQueue)
+    
+    h.integer_steps = True
+    assert isinstance(priority_queue(trans, h=h), BucketQueue)
+    assert priority_queue(trans, h=h).mask == 7
+    
+    assert isinstance(priority_queue(SlidingPuzzle(3)), BucketQueue)
+    
+    with pytest.raises(ValueError):
+        priority_queue(trans, 'list')
@@ -6,6 +6,10 @@ manipulations and also some helper functions.
 """
 
 from heapq import heappush, heappop
+from collections import OrderedDict
+
+
+BUCKET_COST_LIMIT = 1024
 
 
 class Stack():
@@ -13,15 +17,22 @@ class Stack():
 
     Implementation of last-in-first-out (LIFO) data structure.
 
+    Attributes:
+        peak: An integer representing the largest number of items that were
+            in the structure at the same time.
     """
     
     def __init__(self):
         """Initializes the empty structure."""
         self.items = []
+        self.peak = 0
     
     def push(self, item):
         """Adds new item to the structure."""
         self.items.append(item)
+        
+        if len(self.items) > self.peak:
+            self.peak = len(self.items)
     
     def pop(self):
         """Removes and returns the last added element to the structure."""
@@ -39,15 +50,22 @@ class Queue():
 
     Implementation of first-in-first-out (FIFO) data structure.
 
+    Attributes:
+        peak: An integer representing the largest number of items that were
+            in the structure at the same time.
     """
     
     def __init__(self):
         """Initializes the empty structure."""
         self.items = []
+        self.peak = 0
     
     def push(self, item):
         """Adds new item to the structure."""
         self.items.append(item)
+        
+        if len(self.items) > self.peak:
+            self.peak = len(self.items)
     
     def pop(self):
         """Removes and returns the first added element to the structure."""
@@ -66,15 +84,22 @@ class PriorityQueue():
     Implementation of priority data structure. It always returns the value
     with the lowest value.
 
+    Attributes:
+        peak: An integer representing the largest number of items that were
+            in the structure at the same time.
     """
     
     def __init__(self):
         """Initializes the empty structure."""
         self.items = []
+        self.peak = 0
     
     def push(self, item):
         """Adds new item to the structure."""
         heappush(self.items, item)
+        
+        if len(self.items) > self.peak:
+            self.peak = len(self.items)
     
     def pop(self):
         """Removes and returns the element with the lowest value from the
@@ -89,6 +114,394 @@ class PriorityQueue():
         return bool(self.items)
 
 
+class IndexedPriorityQueue():
+    """IndexedPriorityQueue class.
+
+    Implementation of addressable priority data structure. Each item is
+    stored at most once together with its priority, so priority of an item
+    already in the structure can be decreased in place instead of adding a
+    duplicate. It always returns the item with the lowest priority and items
+    with equal priorities in the order they were last pushed.
+
+    Attributes:
+        peak: An integer representing the largest number of items that were
+            in the structure at the same time.
+    """
+    
+    def __init__(self):
+        """Initializes the empty structure."""
+        self.heap = []
+        self.index = {}
+        self.count = 0
+        self.peak = 0
+    
+    def push(self, item, priority):
+        """Adds new item or decreases priority of an item in the structure.
+
+        Returns:
+            A boolean indicating whether the item was added or its priority
+            was decreased. Pushing an item that is already in the structure
+            with lower or equal priority does not change the structure.
+        
+        """
+        self.count += 1
+        
+        i = self.index.get(item)
+        
+        if i is None:
+            i = len(self.heap)
+            self.heap.append((priority, self.count, item))
+            self.index[item] = i
+            
+            if i >= self.peak:
+                self.peak = i + 1
+        elif priority < self.heap[i][0]:
+            self.heap[i] = (priority, self.count, item)
+        else:
+            return False
+        
+        self._sift_up(i)
+        
+        return True
+    
+    def pop(self):
+        """Removes and returns the (item, priority) pair with the lowest
+            priority from the structure.
+        """
+        heap = self.heap
+        
+        priority, _, item = heap[0]
+        del self.index[item]
+        
+        last = heap.pop()
+        if heap:
+            heap[0] = last
+            self.index[last[2]] = 0
+            self._sift_down(0)
+        
+        return item, priority
+    
+    def peek(self):
+        """Returns the (item, priority) pair with the lowest priority without
+            removing it from the structure.
+        """
+        priority, _, item = self.heap[0]
+        
+        return item, priority
+    
+    def priority(self, item):
+        """Returns priority of an item in the structure."""
+        return self.heap[self.index[item]][0]
+    
+    def _sift_up(self, i):
+        """Moves the entry at position i up until the heap is ordered."""
+        heap, index = self.heap, self.index
+        entry = heap[i]
+        
+        while i > 0:
+            parent = (i - 1) >> 1
+            
+            if entry < heap[parent]:
+                heap[i] = heap[parent]
+                index[heap[i][2]] = i
+                i = parent
+            else:
+                break
+        
+        heap[i] = entry
+        index[entry[2]] = i
+    
+    def _sift_down(self, i):
+        """Moves the entry at position i down until the heap is ordered."""
+        heap, index = self.heap, self.index
+        entry = heap[i]
+        n = len(heap)
+        
+        while True:
+            child = 2 * i + 1
+            
+            if child >= n:
+                break
+            
+            if child + 1 < n and heap[child + 1] < heap[child]:
+                child += 1
+            
+            if heap[child] < entry:
+                heap[i] = heap[child]
+                index[heap[i][2]] = i
+                i = child
+            else:
+                break
+        
+        heap[i] = entry
+        index[entry[2]] = i
+    
+    def __contains__(self, item):
+        """Overrides the in operation that returns whether the item is in the
+           structure.
+        """
+        return item in self.index
+    
+    def __len__(self):
+        """Overrides the len operation that returns the number of items in the
+           structure.
+        """
+        return len(self.heap)
+    
+    def __bool__(self):
+        """Overrides the bool operation that returns whether the structure is
+           not empty.
+        """
+        return bool(self.heap)
+
+
+class BucketQueue():
+    """BucketQueue class.
+
+    Implementation of addressable priority data structure with the same
+    interface as IndexedPriorityQueue for integer priorities, known as Dial's
+    structure. Items are kept in a circular array of buckets, one for every
+    priority in a window starting at a cursor, which only moves forward while
+    items are removed. When priorities of items in the structure never differ
+    by more than span, as in a uniform-cost search whose transition costs are
+    integers not greater than span, every operation takes constant time.
+    Priorities outside the window make the array grow, so any integer
+    priorities are accepted. It always returns the item with the lowest
+    priority and items with equal priorities in the order they were last
+    pushed.
+
+    Attributes:
+        peak: An integer representing the largest number of items that were
+            in the structure at the same time.
+    """
+    
+    def __init__(self, span=0):
+        """Initializes the empty structure with a window of at least span + 1
+        priorities."""
+        n = 1
+        while n <= span:
+            n *= 2
+        
+        self.buckets = [OrderedDict() for _ in range(n)]
+        self.mask = n - 1
+        self.cursor = 0
+        self.high = 0
+        self.index = {}
+        self.peak = 0
+    
+    def push(self, item, priority):
+        """Adds new item or decreases priority of an item in the structure.
+
+        Returns:
+            A boolean indicating whether the item was added or its priority
+            was decreased. Pushing an item that is already in the structure
+            with lower or equal priority does not change the structure.
+
+        Raises:
+            ValueError: If the priority is not an integer.
+        
+        """
+        index = self.index
+        old = index.get(item)
+        
+        if old is not None:
+            if priority >= old:
+                return False
+            
+            del self.buckets[int(old) & self.mask][item]
+        
+        p = int(priority)
+        if p != priority:
+            raise ValueError('BucketQueue needs integer priorities.')
+        
+        if not index:
+            self.cursor = self.high = p
+        elif p < self.cursor and self.high - p <= self.mask:
+            # buckets do not depend on the cursor, it can move back
+            self.cursor = p
+        elif not 0 <= p - self.cursor <= self.mask:
+            self._resize(p)
+        
+        if p > self.high:
+            self.high = p
+        
+        self.buckets[p & self.mask][item] = None
+        index[item] = priority
+        
+        if len(index) > self.peak:
+            self.peak = len(index)
+        
+        return True
+    
+    def pop(self):
+        """Removes and returns the (item, priority) pair with the lowest
+            priority from the structure.
+        """
+        item, _ = self._first().popitem(last=False)
+        
+        return item, self.index.pop(item)
+    
+    def peek(self):
+        """Returns the (item, priority) pair with the lowest priority without
+            removing it from the structure.
+        """
+        item = next(iter(self._first()))
+        
+        return item, self.index[item]
+    
+    def _first(self):
+        """Moves the cursor to the lowest priority in the structure and
+        returns its bucket."""
+        buckets, mask = self.buckets, self.mask
+        cursor = self.cursor
+        
+        while not buckets[cursor & mask]:
+            cursor += 1
+        
+        self.cursor = cursor
+        
+        return buckets[cursor & mask]
+    
+    def _resize(self, p):
+        """Rebuilds the array so that the window covers priority p and all
+        priorities in the structure, keeping the order of items."""
+        old = self.buckets
+        
+        # the cursor and high bound priorities in the structure
+        low = min(p, self.cursor)
+        high = max(p, self.high)
+        
+        n = len(old)
+        while n <= high - low:
+            n *= 2
+        
+        self.buckets = [OrderedDict() for _ in range(n)]
+        self.mask = n - 1
+        self.cursor = low
+        
+        # buckets of the old window hold one priority each
+        for bucket in old:
+            for item in bucket:
+                self.buckets[int(self.index[item]) & self.mask][item] = None
+    
+    def priority(self, item):
+        """Returns priority of an item in the structure."""
+        return self.index[item]
+    
+    def __contains__(self, item):
+        """Overrides the in operation that returns whether the item is in the
+           structure.
+        """
+        return item in self.index
+    
+    def __len__(self):
+        """Overrides the len operation that returns the number of items in the
+           structure.
+        """
+        return len(self.index)
+    
+    def __bool__(self):
+        """Overrides the bool operation that returns whether the structure is
+           not empty.
+        """
+        return bool(self.index)
+
+
+class Transitions(dict):
+    """Transitions class.
+
+    A dictionary containing list of possible transitions and their costs for
+    each key that represents the state name, which also remembers whether
+    costs are small integers that bound priorities of a BucketQueue.
+
+    Attributes:
+        cost_bound: The largest transition cost if all costs are non-negative
+            integers not greater than BUCKET_COST_LIMIT, else None.
+    """
+    
+    cost_bound = None
+
+
+def integer_cost_bound(costs, limit=BUCKET_COST_LIMIT):
+    """Checks whether costs are small non-negative integers.
+
+    Args:
+        costs: An iterable of transition costs.
+        limit: A number representing the largest allowed cost.
+
+    Returns:
+        The largest cost if all costs are non-negative integers not greater
+        than limit, else None.
+    
+    """
+    bound = 0
+    
+    for c in costs:
+        if not 0 <= c <= limit or c != int(c):
+            return None
+        
+        if c > bound:
+            bound = c
+    
+    return bound
+
+
+def priority_queue(trans, queue=None, h=None):
+    """Creates an addressable priority queue suitable for a search.
+
+    Priorities are costs of paths, plus heuristic values if h is given. They
+    are bounded integers if the state space has small non-negative integer
+    costs and the heuristic, if any, has integer values that change by at
+    most the transition cost between neighboring states, as indicated by its
+    integer_steps attribute. Then priorities of waiting states differ by at
+    most the largest cost, or twice that with the heuristic.
+
+    Args:
+        trans: A state space whose cost_bound attribute, if present and not
+            None, indicates small non-negative integer costs, or None if
+            priorities are not bounded by transition costs.
+        queue: String 'heap' or 'bucket' selecting the structure, or None to
+            select BucketQueue for bounded integer priorities and
+            IndexedPriorityQueue otherwise.
+        h: Heuristic function added to costs in priorities, or None.
+
+    Returns:
+        An empty IndexedPriorityQueue or BucketQueue.
+    
+    """
+    span = getattr(trans, 'cost_bound', None)
+    
+    if span is not None and h is not None:
+        span = 2 * span if getattr(h, 'integer_steps', False) else None
+    
+    if queue is None:
+        queue = 'heap' if span is None else 'bucket'
+    
+    if queue == 'bucket':
+        return BucketQueue(span or 0)
+    
+    if queue == 'heap':
+        return IndexedPriorityQueue()
+    
+    raise ValueError('Unknown priority queue {}.'.format(queue))
+
+
+def path_cost(trans, path):
+    """Returns the total cost of a path of state names in a state space.
+
+    Uses the cheapest transition between each pair of consecutive states.
+    State spaces with an index of names, like graph.Graph, are looked up by
+    state id.
+
+    """
+    index = getattr(trans, 'index', None)
+    if index is not None:
+        path = [index[s] for s in path]
+    
+    return sum(min(c for m, c in trans.get(s, []) if m == t)
+               for s, t in zip(path, path[1:]))
+
+
 def flip_transitions(trans):
     """Flips transitions in a state space.
 
@@ -97,15 +510,19 @@ def flip_transitions(trans):
 
     Args:
         trans: A dictionary containing list of possible transitions and their
-            costs for each key that represents the state name.
+            costs for each key that represents the state name, or a Graph.
 
     Returns:
         A dictionary representing the reversed transitions as given in the
-        input args parameter.
+        input args parameter, or a reversed Graph if a Graph was given.
     
     """
     
-    reverse = {}
+    if hasattr(trans, 'reversed'):
+        return trans.reversed()
+    
+    reverse = Transitions()
+    reverse.cost_bound = getattr(trans, 'cost_bound', None)
     
     for s1 in trans:
         for s2, c in trans[s1]: